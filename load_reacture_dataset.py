@@ -21,11 +21,44 @@ Usage:
 
 import json
 import base64
+import time
+import threading
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Iterator, Optional, Tuple
+from typing import Dict, List, Iterator, Optional, Tuple, Union
 import warnings
 
+from reacture_align import (DEFAULT_TOLERANCE_MS, align_frames, frame_alignment_params,
+                            resample_columns, resample_params)
+from reacture_columns import (SessionColumns, columns_dir_for, find_jsonl, frame_index_from_path,
+                              iter_column_batches, iter_jsonl, load_columns, load_or_compile_columns)
+from reacture_events import EventIndex, StratifiedSampler, load_event_index
+from reacture_frames import CompressedFrameStore, FrameStore, open_session_frames
+from reacture_index import TimeIndex, RowSelector
+from reacture_ingest import find_frames_manifest, ingest_frames_json
+from reacture_instrument import LoadStats, info, log_to_stdout, logger, timing_enabled
+from reacture_query import select_columns
+from reacture_ragged import Ragged, nearest_k
+from reacture_records import RecordSource, SampleRecord
+from reacture_spatial import DEFAULT_CELL_SIZE, SpatialIndex
+
+
+# 'dict': samples are nested dicts; 'view': compact column-backed SampleRecords
+RECORD_MODES = ('dict', 'view')
+
+# Frame shape assumed when a session has no frames file and no metadata hint
+DEFAULT_FRAME_SHAPE = (128, 128, 3)
+
+# Batch field -> (column group, columns kept); every field is returned as float32
+BATCH_FIELDS = {
+    'keys': ('key_presses', slice(0, 6)),        # W, A, S, D, inspect, destroy
+    'position': ('robot.position', None),
+    'velocity': ('robot.velocity', None),
+    'accelerometer': ('accelerometer', None),
+    'battery': ('battery', None),
+    'damage': ('damage', None),
+}
+
 
 class ReActureDataset:
     """
@@ -33,124 +66,672 @@ class ReActureDataset:
     
     Attributes:
         metadata: Session metadata dictionary
-        samples: List of all data samples (10Hz)
-        frames: Dictionary mapping frame paths to NumPy arrays
+        columns: Columnar (struct-of-arrays) view of every JSONL row
+        samples: List of all data samples (10Hz), parsed on first access
+        frame_store: Lazy frame backend (a FrameStore) or None
+        frames_array: Memory-mapped (or chunk-decoded) frames (N, H, W, 3) or None
+        load_stats: Phase timings, bytes read, cache hits and fetch latencies
+            (see ``reacture_instrument``)
     """
     
-    def __init__(self, metadata_path: str):
+    def __init__(self, metadata_path: str, use_cache: bool = True, lazy_frames: bool = True,
+                 frame_tolerance_ms: Optional[float] = DEFAULT_TOLERANCE_MS,
+                 record_mode: str = 'dict'):
         """
         Load a ReActure dataset from metadata file.
         
         Args:
             metadata_path: Path to session_metadata.json file
+            use_cache: Read/write the compiled column cache next to the
+                metadata file (``<session>_columns/``)
+            lazy_frames: Memory-map ``_frames.npy`` instead of reading it
+                into RAM; frames are paged in only when indexed
+            frame_tolerance_ms: Maximum distance when matching samples
+                without a ``visual_frame_path`` to the nearest frame timestamp
+            record_mode: 'dict' returns samples as nested dicts (the parsed
+                JSONL once ``samples`` is loaded); 'view' returns compact
+                ``reacture_records.SampleRecord`` views over the columns
         """
+        if record_mode not in RECORD_MODES:
+            raise ValueError(f"record_mode must be one of {RECORD_MODES}, got {record_mode!r}")
         self.base_path = Path(metadata_path).parent
         self.session_id = Path(metadata_path).stem.replace('_metadata', '')
+        self.load_stats = LoadStats(self.session_id)
         
         # Load metadata
-        with open(metadata_path, 'r') as f:
-            self.metadata = json.load(f)
+        with self.load_stats.phase('metadata'):
+            self.jsonl_path = (find_jsonl(self.base_path, self.session_id)
+                               or self.base_path / f"{self.session_id}_data.jsonl")
+            with open(metadata_path, 'rb') as f:
+                raw = f.read()
+            self.metadata = json.loads(raw)
+            self.load_stats.add_bytes('metadata', len(raw))
+        
+        info(f"📁 Loading dataset: {self.metadata['session_id']}")
+        info(f"⏱️  Duration: {self.metadata['duration_s']:.1f}s")
+        info(f"📊 Sampling rate: {self.metadata['sampling_rate_hz']} Hz")
+        
+        # Load JSONL data as typed columns (compiled once, then memory-mapped)
+        with self.load_stats.phase('columns'):
+            columns = self._load_columns(use_cache)
+        
+        # Map frames (pages are read on access, reopened per worker process)
+        with self.load_stats.phase('frames'):
+            frame_store = self._load_frames(lazy_frames)
+        self._init_state(columns, frame_store, frame_tolerance_ms)
+        self.record_mode = record_mode
+        
+        info(f"✅ Loaded {len(self)} samples")
+        if self.frame_store is not None:
+            info(f"✅ Mapped frames array with shape: {self.frame_store.shape}")
+        self.load_stats.loaded()
+    
+    def _init_state(self, columns: SessionColumns, frame_store: Optional[FrameStore],
+                    frame_tolerance_ms: Optional[float]):
+        self.columns = columns
+        self.frame_store = frame_store
+        self.frame_tolerance_ms = frame_tolerance_ms
+        self._samples = None
+        self._robot_state_rows = None
+        self._time_indexes = {}
+        self._spatial_indexes = {}
+        self._event_index = None
+        self._sample_frame_index = None
+        self.record_mode = 'dict'
+        self._record_source = None
+        # Lazily built state (samples, frame alignment, ...) may be requested by
+        # several prefetch reader threads at once
+        self._lazy_lock = threading.RLock()
+    
+    @classmethod
+    def _from_parts(cls, metadata: Dict, session_id: str, columns: SessionColumns,
+                    frame_store: Optional[FrameStore], base_path: Optional[Path] = None,
+                    sample_frame_index: Optional[np.ndarray] = None,
+                    frame_tolerance_ms: Optional[float] = DEFAULT_TOLERANCE_MS) -> 'ReActureDataset':
+        """Build a dataset from already-opened storage (no JSONL file behind it)."""
+        dataset = cls.__new__(cls)
+        dataset.base_path = base_path
+        dataset.session_id = session_id
+        dataset.jsonl_path = None
+        dataset.metadata = metadata
+        dataset.load_stats = LoadStats(session_id)
+        dataset._init_state(columns, frame_store, frame_tolerance_ms)
+        dataset._sample_frame_index = sample_frame_index
+        return dataset
+    
+    @classmethod
+    def from_pack(cls, pack, session, frame_tolerance_ms: Optional[float] = DEFAULT_TOLERANCE_MS
+                  ) -> 'ReActureDataset':
+        """
+        Open one session from a packed shard directory (see ``reacture_pack``).
+        
+        Args:
+            pack: Pack directory or an open ``reacture_pack.PackReader``
+            session: Session id or position within the pack
+            frame_tolerance_ms: Tolerance used if alignment must be recomputed
+            
+        Returns:
+            ReActureDataset backed by views into the shard files
+        """
+        from reacture_pack import PackReader
+        
+        reader = pack if isinstance(pack, PackReader) else PackReader(pack)
+        return reader.open_session(session, frame_tolerance_ms=frame_tolerance_ms)
+    
+    @classmethod
+    def follow(cls, metadata_path: str, state: Optional[Dict] = None, poll: bool = True, **kwargs):
+        """
+        Follow a session that is still being recorded (see ``reacture_follow``).
+        
+        Args:
+            metadata_path: Path to session_metadata.json (may not exist yet)
+            state: Resume point saved from ``follower.state()``
+            poll: Read what is already on disk before returning
+            **kwargs: Passed to ``SessionFollower``
+        
+        Returns:
+            reacture_follow.SessionFollower; its ``dataset`` grows on every poll
+        """
+        from reacture_follow import SessionFollower
+        
+        follower = SessionFollower(metadata_path, **(state or {}), **kwargs)
+        if poll:
+            follower.poll()
+        return follower
+    
+    @property
+    def frames_array(self) -> Optional[np.ndarray]:
+        """Frame array (N, H, W, 3), memory-mapped unless lazy_frames=False."""
+        return self.frame_store.array if self.frame_store is not None else None
+    
+    @property
+    def frame_timestamps(self) -> Optional[np.ndarray]:
+        """Per-frame timestamps in ms from ``_timestamps.npy`` (or synthesised at 10 Hz)."""
+        return self.frame_store.timestamps if self.frame_store is not None else None
+    
+    @property
+    def sample_frame_index(self) -> np.ndarray:
+        """
+        Frame index for every sample (-1 where a sample has no frame).
         
-        print(f"📁 Loading dataset: {self.metadata['session_id']}")
-        print(f"⏱️  Duration: {self.metadata['duration_s']:.1f}s")
-        print(f"📊 Sampling rate: {self.metadata['sampling_rate_hz']} Hz")
+        Built by ``align_frames`` on first use and cached beside the columns.
+        """
+        if self._sample_frame_index is None:
+            with self._lazy_lock:
+                if self._sample_frame_index is None:
+                    self._sample_frame_index = self.align_frames(self.frame_tolerance_ms)
+        return self._sample_frame_index
+    
+    def _frames_fingerprint(self) -> Dict:
+        return self.frame_store.fingerprint() if self.frame_store is not None else {}
+    
+    def align_frames(self, tolerance_ms: Optional[float] = DEFAULT_TOLERANCE_MS,
+                     match_events: bool = True) -> np.ndarray:
+        """
+        Join samples to frames by ``visual_frame_path``, then by nearest timestamp.
+        
+        Args:
+            tolerance_ms: Maximum |sample time - frame time| for timestamp matches
+            match_events: Give event rows (no frame path) the nearest frame
+            
+        Returns:
+            int32 array of shape (N,) with frame indices (-1 for no frame)
+        """
+        store = self.frame_store
+        params = frame_alignment_params(self._frames_fingerprint(), tolerance_ms, match_events)
+        with self.load_stats.phase('alignment'):
+            cached = self.columns.load_derived('frame_alignment', params)
+            self.load_stats.cache_result('frame_alignment', cached is not None)
+            if cached is not None:
+                return cached['frame_index']
+            
+            frame_index = align_frames(
+                self.columns,
+                store.timestamps if store is not None else None,
+                len(store) if store is not None else 0,
+                tolerance_ms=tolerance_ms,
+                match_events=match_events,
+            )
+            self.columns.save_derived('frame_alignment', params, {'frame_index': frame_index})
+        return frame_index
+    
+    def resample(self, rate_hz: Optional[float] = None, start_s: Optional[float] = None,
+                 end_s: Optional[float] = None, groups: Optional[List[str]] = None,
+                 robot_state_only: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Resample telemetry onto an exact fixed-rate time grid.
         
-        # Load JSONL data
-        self.samples = self._load_jsonl()
+        Float fields are linearly interpolated; flags, counts and categorical
+        codes are forward-filled. Each grid point also gets its nearest frame
+        (``frame_index``). Results are cached beside the columns.
         
-        # Load frames (NumPy array)
-        self.frames_array = self._load_frames()
-        self.frame_timestamps = getattr(self, 'frame_timestamps', None)
+        Args:
+            rate_hz: Grid rate (default: metadata sampling rate)
+            start_s: Grid start (default: first sample)
+            end_s: Grid end, inclusive (default: last sample)
+            groups: Column groups to include (default: all)
+            robot_state_only: Resample only 'robot_state' rows
+            
+        Returns:
+            Dictionary with 'time_s', 'frame_index' and one array per group
+        """
+        if rate_hz is None:
+            rate_hz = float(self.metadata.get('sampling_rate_hz', 10))
+        params = resample_params(rate_hz, start_s, end_s, groups, robot_state_only,
+                                 self._frames_fingerprint())
+        name = f"resampled_{rate_hz:g}hz"
+        cached = self.columns.load_derived(name, params)
+        if cached is not None:
+            return cached
         
-        print(f"✅ Loaded {len(self.samples)} samples")
-        if self.frames_array is not None:
-            print(f"✅ Loaded frames array with shape: {self.frames_array.shape}")
+        store = self.frame_store
+        grid = resample_columns(
+            self.columns, rate_hz, start_s=start_s, end_s=end_s, groups=groups,
+            rows=self._robot_state_selection() if robot_state_only else None,
+            frame_timestamps_ms=store.timestamps if store is not None else None,
+            tolerance_ms=self.frame_tolerance_ms,
+        )
+        self.columns.save_derived(name, params, grid)
+        return grid
+    
+    def __getstate__(self):
+        # Pickled into DataLoader workers: ship paths, not arrays. Column and
+        # frame maps are reopened inside each worker; parsed samples are dropped.
+        state = self.__dict__.copy()
+        state['_samples'] = None
+        state['_lazy_lock'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lazy_lock = threading.RLock()
+    
+    @property
+    def samples(self) -> List[Dict]:
+        """All JSONL records as dictionaries (parsed lazily on first access)."""
+        if self._samples is None:
+            with self._lazy_lock:
+                if self._samples is None:
+                    with self.load_stats.phase('jsonl_parse'):
+                        self._samples = self._load_jsonl()
+        return self._samples
+    
+    @property
+    def record_source(self) -> RecordSource:
+        """Column views the 'view' mode records read from (built on first use)."""
+        if self._record_source is None:
+            with self._lazy_lock:
+                if self._record_source is None:
+                    self._record_source = RecordSource(self.columns)
+        return self._record_source
+    
+    def _load_columns(self, use_cache: bool) -> SessionColumns:
+        """Load the column cache, compiling it from JSONL if missing or stale."""
+        if not self.jsonl_path.exists():
+            # Imported sessions (see reacture_import) only have their columns
+            columns = load_columns(columns_dir_for(self.jsonl_path))
+            if columns is None:
+                raise FileNotFoundError(f"JSONL file not found: {self.jsonl_path}")
+            self.load_stats.cache_result('columns', True)
+            info(f"⚡ Using imported columns ({len(columns)} rows, no JSONL)")
+            self.jsonl_path = None
+            return columns
+        
+        columns, cache_hit = load_or_compile_columns(self.jsonl_path, cache=use_cache)
+        self.load_stats.cache_result('columns', cache_hit)
+        if cache_hit:
+            info(f"⚡ Using column cache ({len(columns)} rows)")
+        else:
+            self.load_stats.add_bytes('jsonl', self.jsonl_path.stat().st_size)
+        return columns
+    
+    def column(self, path: str) -> np.ndarray:
+        """
+        Get one telemetry field for every sample.
+        
+        Args:
+            path: Dotted field path (e.g. 'robot.position.x', 'battery')
+            
+        Returns:
+            NumPy array of shape (N,); missing values are NaN / False / -1
+        """
+        return self.columns.field(path)
+    
+    def _robot_state_selection(self):
+        """Row selector for 'robot_state' samples (a slice when every row qualifies)."""
+        if self._robot_state_rows is None:
+            with self._lazy_lock:
+                if self._robot_state_rows is None:
+                    code = self.columns.code_of('type', 'robot_state')
+                    mask = np.asarray(self.columns.group('type')) == code
+                    self._robot_state_rows = slice(None) if mask.all() else np.flatnonzero(mask)
+        return self._robot_state_rows
     
     def _load_jsonl(self) -> List[Dict]:
         """Load JSONL data file."""
-        jsonl_path = self.base_path / f"{self.session_id}_data.jsonl"
+        jsonl_path = self.jsonl_path
+        
+        if jsonl_path is None:
+            # Packed sessions have no JSONL; rebuild records from the columns
+            return [self.columns.row_dict(i) for i in range(len(self))]
         
         if not jsonl_path.exists():
             raise FileNotFoundError(f"JSONL file not found: {jsonl_path}")
         
-        samples = []
-        with open(jsonl_path, 'r') as f:
-            for line in f:
-                if line.strip():
-                    samples.append(json.loads(line))
-        
-        return samples
+        self.load_stats.add_bytes('jsonl', jsonl_path.stat().st_size)
+        return list(iter_jsonl(jsonl_path))
     
-    def _load_frames(self) -> np.ndarray:
-        """Load visual frames from NumPy .npy file."""
-        # Try loading consolidated frames.npy file
-        frames_path = self.base_path / f"{self.session_id}_frames.npy"
-        timestamps_path = self.base_path / f"{self.session_id}_timestamps.npy"
+    def _load_frames(self, lazy: bool = True) -> Optional[FrameStore]:
+        """Open visual frames from the NumPy .npy file (or its compressed .rfz form)."""
+        store = open_session_frames(self.base_path, self.session_id, lazy)
+        if store is None:
+            store = self._ingest_legacy_frames(lazy)
+        if store is None:
+            # Sessions recorded (or imported) without frames say so in their metadata
+            if self.metadata.get('data_stats', {}).get('total_frames') != 0:
+                warnings.warn(f"Frames file not found: {self.base_path / f'{self.session_id}_frames.npy'}")
+            return None
         
-        if frames_path.exists():
-            print(f"📷 Loading frames from {frames_path.name}...")
-            frames_array = np.load(frames_path)
-            
-            # Load timestamps if available
-            if timestamps_path.exists():
-                self.frame_timestamps = np.load(timestamps_path)
-                print(f"⏱️  Loaded {len(self.frame_timestamps)} timestamps")
-            else:
-                # Generate timestamps (10 Hz = 100ms intervals)
-                self.frame_timestamps = np.arange(len(frames_array)) * 100.0
-                print(f"⏱️  Generated timestamps (10 Hz)")
-            
-            print(f"✅ Loaded frames with shape: {frames_array.shape}")
-            return frames_array
+        if isinstance(store, CompressedFrameStore):
+            info(f"📷 Opening compressed frames from {store.path.name}...")
         else:
-            warnings.warn(f"Frames file not found: {frames_path}")
+            info(f"📷 Mapping frames from {store.frames_path.name}...")
+        if store.has_timestamps_file:
+            info(f"⏱️  Found timestamps in {store.timestamps_path.name}")
+        else:
+            # Timestamps are generated at 10 Hz (100ms intervals)
+            info(f"⏱️  Generated timestamps (10 Hz)")
+        
+        return store
+    
+    def _ingest_legacy_frames(self, lazy: bool = True) -> Optional[FrameStore]:
+        """Convert a legacy base64 ``_frames.json`` manifest to ``_frames.npy`` and open it."""
+        manifest = find_frames_manifest(self.base_path, self.session_id)
+        if manifest is None:
+            return None
+        
+        info(f"🗃️  Converting legacy {manifest.name} to {self.session_id}_frames.npy...")
+        try:
+            ingest_frames_json(manifest)
+        except (OSError, ValueError) as e:
+            warnings.warn(f"Could not convert {manifest}: {e}")
             return None
+        self.load_stats.add_bytes('frames_json', manifest.stat().st_size)
+        return open_session_frames(self.base_path, self.session_id, lazy)
     
     def __len__(self) -> int:
         """Number of samples in dataset."""
-        return len(self.samples)
+        return len(self.columns)
     
     def __getitem__(self, idx: int) -> Dict:
         """
         Get a single sample with its associated frame.
         
         Returns:
-            Dictionary with all sample data plus 'frame' as NumPy array
+            Dictionary (or SampleRecord in 'view' mode) with all sample
+            data plus 'frame' as NumPy array
         """
-        sample = self.samples[idx].copy()
+        return self.get_sample(idx)
+    
+    def get_sample(self, idx: int, parse_jsonl: bool = True) -> Dict:
+        """
+        ``dataset[idx]``, optionally without parsing the whole JSONL.
         
-        # Add frame from frames array if available
-        if self.frames_array is not None and idx < len(self.frames_array):
-            sample['frame'] = self.frames_array[idx]
-            if self.frame_timestamps is not None and idx < len(self.frame_timestamps):
-                sample['frame_timestamp_ms'] = self.frame_timestamps[idx]
+        Args:
+            idx: Sample index
+            parse_jsonl: Serve dict samples from ``samples`` (parsing the
+                JSONL on first use); False rebuilds them from the columns
+                unless ``samples`` is already parsed, like iteration does
+        """
+        start = time.perf_counter() if timing_enabled() else None
+        if self.record_mode == 'view':
+            n = len(self)
+            if not -n <= idx < n:
+                raise IndexError(f"Sample index {idx} out of range for {n} samples")
+            sample = SampleRecord(self.record_source, int(idx) % n)
+        elif self._samples is None and (self.jsonl_path is None or not parse_jsonl):
+            sample = self.columns.row_dict(idx)
         else:
-            sample['frame'] = None
+            sample = self.samples[idx].copy()
         
+        store = self.frame_store
+        frame_idx = int(self.sample_frame_index[idx]) if store is not None else -1
+        self._attach_frame(sample, frame_idx)
+        if start is not None:
+            self.load_stats.record_fetch('getitem', time.perf_counter() - start, 1)
         return sample
     
+    def _attach_frame(self, sample: Dict, frame_idx: int):
+        """Add the aligned frame if available (touches only this frame's pages)."""
+        store = self.frame_store
+        if isinstance(sample, SampleRecord):
+            sample.attach_frame(store, frame_idx)
+            return
+        if frame_idx >= 0:
+            sample['frame'] = store[frame_idx]
+            timestamps = store.timestamps
+            if frame_idx < len(timestamps):
+                sample['frame_timestamp_ms'] = timestamps[frame_idx]
+        else:
+            sample['frame'] = None
+    
     def __iter__(self) -> Iterator[Dict]:
-        """Iterate through all samples."""
-        for i in range(len(self)):
-            yield self[i]
+        """
+        Iterate through all samples.
+        
+        Unless ``samples`` has already been parsed, records are decoded from
+        the JSONL as they are yielded, so memory use stays constant.
+        """
+        if self.record_mode == 'view':
+            source = self.record_source
+            records = (SampleRecord(source, i) for i in range(len(self)))
+        elif self._samples is not None:
+            records = (sample.copy() for sample in self._samples)
+        elif self.jsonl_path is not None:
+            records = iter_jsonl(self.jsonl_path)
+        else:
+            records = (self.columns.row_dict(i) for i in range(len(self)))
+        
+        frame_index = self.sample_frame_index if self.frame_store is not None else None
+        for i, sample in enumerate(records):
+            self._attach_frame(sample, int(frame_index[i]) if frame_index is not None else -1)
+            yield sample
+    
+    @classmethod
+    def stream(cls, metadata_path: str, events: Optional[List[str]] = None,
+               types: Optional[List[str]] = None, batch_size: Optional[int] = None,
+               include_frames: bool = False) -> Iterator:
+        """
+        Stream a session straight from its JSONL without loading it.
+        
+        Nothing is compiled or cached; the file (plain or ``.gz``/``.bz2``/
+        ``.xz``) is read in large blocks and records are yielded as they are
+        decoded, so peak memory does not grow with session length.
+        
+        Args:
+            metadata_path: Path to session_metadata.json file
+            events: Only keep records with one of these 'event' values
+                (non-matching lines are skipped before JSON parsing)
+            types: Only keep records with one of these 'type' values
+            batch_size: Yield ``SessionColumns`` batches of this many rows
+                instead of one dictionary per record
+            include_frames: Attach 'frame' to records by ``visual_frame_path``
+                (record mode only)
+            
+        Yields:
+            Sample dictionaries, or SessionColumns batches
+        """
+        base_path = Path(metadata_path).parent
+        session_id = Path(metadata_path).stem.replace('_metadata', '')
+        jsonl_path = find_jsonl(base_path, session_id)
+        if jsonl_path is None:
+            raise FileNotFoundError(f"JSONL file not found: {base_path / f'{session_id}_data.jsonl'}")
+        
+        records = iter_jsonl(jsonl_path, events=events, types=types)
+        if batch_size is not None:
+            yield from iter_column_batches(records, batch_size)
+            return
+        
+        store = open_session_frames(base_path, session_id) if include_frames else None
+        for record in records:
+            if store is not None:
+                frame_idx = frame_index_from_path(record.get('visual_frame_path'))
+                record['frame'] = store[frame_idx] if 0 <= frame_idx < len(store) else None
+            yield record
+    
+    def time_index(self, unit: str = 's') -> TimeIndex:
+        """
+        Sorted time index over all samples (built once, then cached).
+        
+        Args:
+            unit: 's' indexes ``time_elapsed_s``, 'ms' indexes ``timestamp_ms``
+        """
+        if unit not in ('s', 'ms'):
+            raise ValueError(f"unit must be 's' or 'ms', got {unit!r}")
+        if unit not in self._time_indexes:
+            column = 'time_elapsed_s' if unit == 's' else 'timestamp_ms'
+            with self.load_stats.phase('time_index'):
+                self._time_indexes[unit] = TimeIndex(self.columns.group(column))
+        return self._time_indexes[unit]
     
-    def get_sample_at_time(self, time_s: float) -> Optional[Dict]:
+    def find_indices(self, times, mode: str = 'nearest', unit: str = 's',
+                     tolerance: Optional[float] = None) -> np.ndarray:
+        """
+        Match an array of query times to sample indices.
+        
+        Args:
+            times: Scalar or array of query times
+            mode: 'nearest', 'floor' or 'ceil'
+            unit: 's' (time_elapsed_s) or 'ms' (timestamp_ms)
+            tolerance: Maximum allowed distance to the matched sample
+            
+        Returns:
+            int64 array of sample indices (-1 where nothing matches)
+        """
+        return self.time_index(unit).lookup(times, mode=mode, tolerance=tolerance)
+    
+    def get_sample_at_time(self, time_s: float, mode: str = 'nearest') -> Optional[Dict]:
         """Get sample closest to specified time."""
-        if not self.samples:
+        idx = int(self.find_indices(time_s, mode=mode))
+        if idx < 0:
             return None
         
-        # Find closest sample
-        closest_idx = min(range(len(self.samples)), 
-                         key=lambda i: abs(self.samples[i]['time_elapsed_s'] - time_s))
+        return self[idx]
+    
+    def time_range_indices(self, start_s: float, end_s: float) -> RowSelector:
+        """
+        Sample selector for ``start_s <= time_elapsed_s <= end_s``.
         
-        return self[closest_idx]
+        Returns:
+            A slice (zero-copy on columns) or a sorted index array
+        """
+        return self.time_index('s').range_rows(start_s, end_s)
+    
+    def time_ranges(self, ranges, unit: str = 's') -> List[RowSelector]:
+        """
+        Batched range lookup.
+        
+        Args:
+            ranges: Array-like of shape (M, 2) with (start, end) pairs
+            unit: 's' or 'ms'
+            
+        Returns:
+            List of M selectors (slices when samples are time-ordered)
+        """
+        return self.time_index(unit).ranges(ranges)
+    
+    def get_time_range_columns(self, start_s: float, end_s: float,
+                               groups: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Column arrays for a time range (views, not copies, when time-ordered).
+        
+        Args:
+            start_s: Range start in seconds
+            end_s: Range end in seconds (inclusive)
+            groups: Column groups to return (default: all)
+            
+        Returns:
+            Dictionary mapping group name to array slice
+        """
+        rows = self.time_range_indices(start_s, end_s)
+        groups = groups or self.columns.group_names
+        return {name: self.columns.group(name)[rows] for name in groups}
+    
+    def select(self, fields: Optional[List[str]] = None, where: Optional[Dict] = None,
+               type: Optional[Union[str, List[str]]] = None,
+               event: Optional[Union[str, List[str]]] = None,
+               zone: Optional[Union[str, List[str]]] = None,
+               time_range: Optional[Tuple[float, float]] = None,
+               decode: bool = True, return_index: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Query telemetry columns: only the requested fields, only matching rows.
+        
+        Filters run on the columnar layer (time range by binary search,
+        categories on integer codes, then the remaining predicates on the
+        surviving rows only), so a narrow query touches only the columns
+        it names.
+        
+        Args:
+            fields: Group names or dotted leaf paths, e.g. ``['robot.position',
+                'key_presses.W']`` (default: every group)
+            where: Field path -> value, list of values, or callable returning
+                a boolean mask, e.g. ``{'battery': lambda b: b < 20}``
+            type: Keep rows with this 'type' (or any of a list)
+            event: Keep rows with this 'event' (or any of a list)
+            zone: Keep rows with this 'zone' (or any of a list)
+            time_range: (start_s, end_s) on ``time_elapsed_s``, inclusive
+            decode: Return categorical fields as strings instead of codes
+            return_index: Add 'index' with the matching sample indices
+            
+        Returns:
+            Dictionary mapping each requested field to a NumPy array
+        """
+        where = dict(where or {})
+        for path, value in (('type', type), ('event', event), ('zone', zone)):
+            if value is not None:
+                where[path] = value
+        rows = self.time_range_indices(*time_range) if time_range is not None else slice(None)
+        return select_columns(self.columns, fields, where, rows=rows, decode=decode,
+                              return_index=return_index)
     
     def get_time_range(self, start_s: float, end_s: float) -> List[Dict]:
         """Get all samples within time range."""
-        return [
-            self[i] for i in range(len(self))
-            if start_s <= self.samples[i]['time_elapsed_s'] <= end_s
-        ]
+        rows = np.arange(len(self))[self.time_range_indices(start_s, end_s)]
+        return [self[int(i)] for i in rows]
+    
+    def event_index(self, use_cache: bool = True) -> EventIndex:
+        """
+        Inverted index from event / type / zone / key combination to sample indices.
+        
+        Stored with the column cache, so it is built once per JSONL version.
+        
+        Args:
+            use_cache: Read/write the index bundle in the column cache
+        """
+        if self._event_index is None:
+            with self.load_stats.phase('event_index'):
+                self._event_index = load_event_index(self.columns, use_cache=use_cache)
+        return self._event_index
+    
+    def stratified_sampler(self, strata='event', weights=None, batch_size: int = 32,
+                           **kwargs) -> StratifiedSampler:
+        """
+        Balanced (or weighted) batch sampler over event strata.
+        
+        Args:
+            strata: Facet name or list of 'facet:value' strata (see ``reacture_events``)
+            weights: None (balanced), 'proportional' or per-stratum weights
+            batch_size: Draws per batch
+            **kwargs: ``num_batches``, ``context`` and ``seed`` for ``StratifiedSampler``
+            
+        Returns:
+            StratifiedSampler; pass it as ``batch_sampler`` to ``to_pytorch_dataloader``
+        """
+        return StratifiedSampler(self.event_index(), strata, weights=weights,
+                                 batch_size=batch_size, **kwargs)
+    
+    def spatial_index(self, cell_size: float = DEFAULT_CELL_SIZE) -> SpatialIndex:
+        """
+        Grid index over ``robot.position`` of every sample (built once, then cached).
+        
+        Args:
+            cell_size: Grid cell edge length in metres
+        """
+        if cell_size not in self._spatial_indexes:
+            with self.load_stats.phase('spatial_index'):
+                index = SpatialIndex(cell_size)
+                index.add(self.session_id, self.columns.group('robot.position'))
+                self._spatial_indexes[cell_size] = index
+        return self._spatial_indexes[cell_size]
+    
+    def samples_near(self, center, radius: float) -> np.ndarray:
+        """
+        Indices of samples whose position is within ``radius`` of ``center``.
+        
+        Returns:
+            Sorted int64 array of sample indices
+        """
+        return self.spatial_index().radius(center, radius)[1]
+    
+    def samples_in_box(self, lo, hi) -> np.ndarray:
+        """
+        Indices of samples with ``lo <= position <= hi`` on every axis.
+        
+        Returns:
+            Sorted int64 array of sample indices
+        """
+        return self.spatial_index().box(lo, hi)[1]
+    
+    def nearest_samples(self, point, k: int = 1,
+                        max_distance: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The ``k`` samples closest to ``point``.
+        
+        Returns:
+            Tuple of (sample indices, distances), nearest first
+        """
+        _, rows, distance = self.spatial_index().nearest(point, k=k, max_distance=max_distance)
+        return rows, distance
     
     def extract_trajectory(self) -> np.ndarray:
         """
@@ -159,13 +740,7 @@ class ReActureDataset:
         Returns:
             NumPy array of shape (N, 3) with x, y, z positions
         """
-        positions = []
-        for sample in self.samples:
-            if sample['type'] == 'robot_state':
-                pos = sample['robot']['position']
-                positions.append([pos['x'], pos['y'], pos['z']])
-        
-        return np.array(positions)
+        return self.columns.group('robot.position')[self._robot_state_selection()]
     
     def extract_key_presses(self) -> np.ndarray:
         """
@@ -174,20 +749,8 @@ class ReActureDataset:
         Returns:
             NumPy array of shape (N, 6) for [W, A, S, D, inspect, destroy]
         """
-        keys = []
-        for sample in self.samples:
-            if sample['type'] == 'robot_state':
-                kp = sample['key_presses']
-                keys.append([
-                    int(kp['W']),
-                    int(kp['A']),
-                    int(kp['S']),
-                    int(kp['D']),
-                    int(kp['inspect']),
-                    int(kp['destroy'])
-                ])
-        
-        return np.array(keys)
+        keys = self.columns.group('key_presses')[self._robot_state_selection(), :6]
+        return keys.view(np.uint8)
     
     def extract_accelerometer(self) -> np.ndarray:
         """
@@ -196,13 +759,7 @@ class ReActureDataset:
         Returns:
             NumPy array of shape (N, 3) with x, y, z acceleration
         """
-        accel = []
-        for sample in self.samples:
-            if sample['type'] == 'robot_state':
-                acc = sample['accelerometer']
-                accel.append([acc['x'], acc['y'], acc['z']])
-        
-        return np.array(accel)
+        return self.columns.group('accelerometer')[self._robot_state_selection()]
     
     def extract_battery_damage(self) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -211,15 +768,8 @@ class ReActureDataset:
         Returns:
             Tuple of (battery_array, damage_array)
         """
-        battery = []
-        damage = []
-        
-        for sample in self.samples:
-            if sample['type'] == 'robot_state':
-                battery.append(sample['battery'])
-                damage.append(sample['damage'])
-        
-        return np.array(battery), np.array(damage)
+        rows = self._robot_state_selection()
+        return self.columns.group('battery')[rows], self.columns.group('damage')[rows]
     
     def get_frames_as_array(self) -> Optional[np.ndarray]:
         """
@@ -228,223 +778,238 @@ class ReActureDataset:
         Returns:
             NumPy array of shape (N, H, W, 3) or None
         """
-        return self.frames_array
+        frames = self.frames_array
+        return np.asarray(frames) if frames is not None else None
+    
+    @property
+    def frame_shape(self) -> Tuple[int, ...]:
+        """Shape of one frame (H, W, C): from the frames file, else metadata, else 128x128x3."""
+        if self.frame_store is not None:
+            return tuple(self.frame_store.shape[1:])
+        return tuple(self.metadata.get('frame_shape', DEFAULT_FRAME_SHAPE))
     
-    def to_pytorch_dataloader(self, batch_size: int = 32, shuffle: bool = True):
+    def victims(self, indices=None) -> Ragged:
+        """
+        ``sensors.victims`` as a ragged array (offsets plus flat value arrays).
+        
+        Args:
+            indices: Sample indices to take (default: every sample, zero-copy)
+            
+        Returns:
+            reacture_ragged.Ragged with 'distance', 'angle' and 'health'
+        """
+        victims = self.columns.ragged('sensors.victims')
+        return victims if indices is None else victims.take(indices)
+    
+    def nearest_victims(self, indices, k: int = 4) -> Dict[str, np.ndarray]:
+        """
+        The ``k`` nearest detected victims per sample, padded to a fixed size.
+        
+        Returns:
+            Dictionary with 'distance'/'angle'/'health' (B, k) float32,
+            'mask' (B, k) bool and 'count' (B,) victims before truncation
+        """
+        return nearest_k(self.victims(), indices, k, key='distance')
+    
+    def get_batch(self, indices, fields: Optional[List[str]] = None,
+                  include_frames: bool = True, victims_k: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Gather a batch of samples as contiguous arrays.
+        
+        Columns are gathered with one fancy-indexing operation per field and
+        frames with one sorted read from the memory map; nothing is built per
+        sample.
+        
+        Args:
+            indices: Sample indices (sequence, array or slice)
+            fields: Subset of BATCH_FIELDS to return (default: all)
+            include_frames: Include 'frame' (uint8) and 'has_frame'
+            victims_k: Include the nearest ``victims_k`` victims as 'victims'
+                (B, k, 3) [distance, angle, health] and 'victims_mask' (B, k)
+            
+        Returns:
+            Dictionary with 'frame' (B, H, W, 3) uint8, 'has_frame' (B,) bool,
+            'keys' (B, 6), 'position'/'velocity'/'accelerometer' (B, 3),
+            'battery'/'damage' (B, 1) float32 and 'timestamp' (B,) float64 ms
+        """
+        start = time.perf_counter() if timing_enabled() else None
+        if isinstance(indices, slice):
+            indices = np.arange(len(self))[indices]
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if len(indices) and (indices.min() < -len(self) or indices.max() >= len(self)):
+            raise IndexError(f"Batch indices out of range for {len(self)} samples")
+        indices = np.where(indices < 0, indices + len(self), indices)
+        
+        batch = {}
+        for name in (fields or BATCH_FIELDS):
+            group, cols = BATCH_FIELDS[name]
+            array = self.columns.group(group)
+            values = array[indices] if cols is None else array[indices, cols]
+            values = values.astype(np.float32, copy=False)
+            batch[name] = values.reshape(len(indices), -1)
+        batch['timestamp'] = np.asarray(self.columns.group('timestamp_ms')[indices])
+        if victims_k is not None:
+            near = self.nearest_victims(indices, victims_k)
+            batch['victims'] = np.stack([near['distance'], near['angle'], near['health']], axis=-1)
+            batch['victims_mask'] = near['mask']
+        
+        if include_frames:
+            frames = np.zeros((len(indices),) + self.frame_shape, dtype=np.uint8)
+            if self.frame_store is not None:
+                frame_idx = self.sample_frame_index[indices]
+                has_frame = frame_idx >= 0
+                frames[has_frame] = self.frame_store.take(frame_idx[has_frame])
+            else:
+                has_frame = np.zeros(len(indices), dtype=bool)
+            batch['frame'] = frames
+            batch['has_frame'] = has_frame
+        
+        if start is not None:
+            self.load_stats.record_fetch('get_batch', time.perf_counter() - start, len(indices),
+                                         batch['frame'].nbytes if include_frames else 0)
+        return batch
+    
+    def sequences(self, length: int, stride: int = 1, dilation: int = 1, **kwargs):
+        """
+        Sliding windows of ``length`` steps (see ``reacture_sequences.SequenceView``).
+        
+        Windows stay inside one episode (game_start/game_end) and are strided
+        views of the column and frame maps rather than copies.
+        
+        Args:
+            length: Steps per window
+            stride: Samples between window starts
+            dilation: Samples between steps within a window
+            **kwargs: fields, include_frames, boundary ('drop'/'pad'),
+                padding ('edge'/'zero'), robot_state_only, split_episodes
+            
+        Returns:
+            SequenceView
+        """
+        from reacture_sequences import SequenceView
+        
+        return SequenceView(self, length, stride=stride, dilation=dilation, **kwargs)
+    
+    def prefetch(self, batch_size: Optional[int] = None, workers: int = 2, **kwargs) -> Iterator:
+        """
+        Iterate with frames read ahead on background threads (see ``reacture_prefetch``).
+        
+        Args:
+            batch_size: Yield ``get_batch`` dictionaries; None yields sample
+                dictionaries like ``for sample in dataset``
+            workers: Reader threads
+            **kwargs: indices, chunk_size, depth, max_bytes, or ``get_batch`` options
+            
+        Returns:
+            Iterator over samples or batches
+        """
+        from reacture_prefetch import prefetch
+        
+        return prefetch(self, batch_size=batch_size, workers=workers, **kwargs)
+    
+    def to_pytorch_dataloader(self, batch_size: int = 32, shuffle: bool = True,
+                              num_workers: int = 0, pin_memory: bool = False,
+                              normalize: bool = True, **kwargs):
         """
         Create PyTorch DataLoader from dataset.
         
+        Each DataLoader fetch gathers a whole batch through ``get_batch``;
+        frames are converted to float once per batch.
+        
         Args:
             batch_size: Batch size
             shuffle: Whether to shuffle data
+            num_workers: Worker processes (each reopens the memory maps)
+            pin_memory: Return pinned tensors for faster GPU transfer
+            normalize: Frames as float32 (B, 3, H, W) in [0, 1]; False keeps
+                uint8 (B, H, W, 3) for ``reacture_torch.normalize_frames`` on device
+            **kwargs: Passed to ``reacture_torch.make_dataloader``
             
         Returns:
             PyTorch DataLoader
         """
         try:
-            import torch
-            from torch.utils.data import Dataset, DataLoader
-            
-            class ReActurePyTorchDataset(Dataset):
-                def __init__(self, reacture_dataset):
-                    self.dataset = reacture_dataset
-                
-                def __len__(self):
-                    return len(self.dataset)
-                
-                def __getitem__(self, idx):
-                    sample = self.dataset[idx]
-                    
-                    # Convert to tensors
-                    frame = sample['frame']
-                    if frame is not None:
-                        frame = torch.from_numpy(frame).float() / 255.0
-                        frame = frame.permute(2, 0, 1)  # HWC to CHW
-                    else:
-                        frame = torch.zeros(3, 128, 128)
-                    
-                    # Key presses
-                    kp = sample['key_presses']
-                    keys = torch.tensor([
-                        float(kp['W']),
-                        float(kp['A']),
-                        float(kp['S']),
-                        float(kp['D']),
-                        float(kp['inspect']),
-                        float(kp['destroy'])
-                    ])
-                    
-                    # Robot state
-                    pos = sample['robot']['position']
-                    position = torch.tensor([pos['x'], pos['y'], pos['z']])
-                    
-                    vel = sample['robot']['velocity']
-                    velocity = torch.tensor([vel['x'], vel['y'], vel['z']])
-                    
-                    # Accelerometer
-                    acc = sample['accelerometer']
-                    accelerometer = torch.tensor([acc['x'], acc['y'], acc['z']])
-                    
-                    # Scalars
-                    battery = torch.tensor([sample['battery']])
-                    damage = torch.tensor([sample['damage']])
-                    
-                    return {
-                        'frame': frame,
-                        'keys': keys,
-                        'position': position,
-                        'velocity': velocity,
-                        'accelerometer': accelerometer,
-                        'battery': battery,
-                        'damage': damage,
-                        'timestamp': sample['timestamp_ms']
-                    }
-            
-            torch_dataset = ReActurePyTorchDataset(self)
-            return DataLoader(torch_dataset, batch_size=batch_size, shuffle=shuffle)
-        
+            from reacture_torch import make_dataloader
         except ImportError:
             raise ImportError("PyTorch not installed. Install with: pip install torch")
+        
+        return make_dataloader(self, batch_size=batch_size, shuffle=shuffle,
+                               num_workers=num_workers, pin_memory=pin_memory,
+                               normalize=normalize, **kwargs)
     
-    def to_tensorflow_dataset(self, batch_size: int = 32, shuffle: bool = True):
+    def to_tensorflow_dataset(self, batch_size: int = 32, shuffle: bool = True,
+                              seed: Optional[int] = None, normalize: bool = True, **kwargs):
         """
         Create TensorFlow Dataset.
         
+        Built from the column arrays with ``tf.data`` ops (no Python
+        generator); frame shape comes from the frames file or metadata.
+        
         Args:
             batch_size: Batch size
-            shuffle: Whether to shuffle
+            shuffle: Whether to shuffle (over sample indices, not decoded frames)
+            seed: Shuffle seed
+            normalize: Frames as float32 in [0, 1]; False keeps uint8
+            **kwargs: Passed to ``reacture_tf.make_tf_dataset``
             
         Returns:
             TensorFlow Dataset
         """
         try:
-            import tensorflow as tf
-            
-            def generator():
-                for sample in self:
-                    frame = sample['frame']
-                    if frame is None:
-                        frame = np.zeros((128, 128, 3), dtype=np.uint8)
-                    
-                    frame = frame.astype(np.float32) / 255.0
-                    
-                    kp = sample['key_presses']
-                    keys = np.array([
-                        float(kp['W']),
-                        float(kp['A']),
-                        float(kp['S']),
-                        float(kp['D']),
-                        float(kp['inspect']),
-                        float(kp['destroy'])
-                    ], dtype=np.float32)
-                    
-                    pos = sample['robot']['position']
-                    position = np.array([pos['x'], pos['y'], pos['z']], dtype=np.float32)
-                    
-                    vel = sample['robot']['velocity']
-                    velocity = np.array([vel['x'], vel['y'], vel['z']], dtype=np.float32)
-                    
-                    acc = sample['accelerometer']
-                    accelerometer = np.array([acc['x'], acc['y'], acc['z']], dtype=np.float32)
-                    
-                    battery = np.array([sample['battery']], dtype=np.float32)
-                    damage = np.array([sample['damage']], dtype=np.float32)
-                    
-                    yield {
-                        'frame': frame,
-                        'keys': keys,
-                        'position': position,
-                        'velocity': velocity,
-                        'accelerometer': accelerometer,
-                        'battery': battery,
-                        'damage': damage
-                    }
-            
-            output_signature = {
-                'frame': tf.TensorSpec(shape=(128, 128, 3), dtype=tf.float32),
-                'keys': tf.TensorSpec(shape=(6,), dtype=tf.float32),
-                'position': tf.TensorSpec(shape=(3,), dtype=tf.float32),
-                'velocity': tf.TensorSpec(shape=(3,), dtype=tf.float32),
-                'accelerometer': tf.TensorSpec(shape=(3,), dtype=tf.float32),
-                'battery': tf.TensorSpec(shape=(1,), dtype=tf.float32),
-                'damage': tf.TensorSpec(shape=(1,), dtype=tf.float32)
-            }
-            
-            dataset = tf.data.Dataset.from_generator(generator, output_signature=output_signature)
-            
-            if shuffle:
-                dataset = dataset.shuffle(buffer_size=1000)
-            
-            dataset = dataset.batch(batch_size)
-            dataset = dataset.prefetch(tf.data.AUTOTUNE)
-            
-            return dataset
-        
+            from reacture_tf import make_tf_dataset
         except ImportError:
             raise ImportError("TensorFlow not installed. Install with: pip install tensorflow")
+        
+        return make_tf_dataset([self], batch_size=batch_size, shuffle=shuffle,
+                               seed=seed, normalize=normalize, **kwargs)
+    
+    def compute_statistics(self, include_frames: bool = True, use_cache: bool = True):
+        """
+        Single-pass, mergeable statistics for this session (see ``reacture_stats``).
+        
+        Cached as ``<session>_stats.json`` (``_stats_noframes.json`` when
+        ``include_frames`` is False) beside the metadata.
+        
+        Args:
+            include_frames: Include per-channel pixel statistics
+            use_cache: Read/write the stats cache
+            
+        Returns:
+            reacture_stats.DatasetStatistics
+        """
+        from reacture_stats import load_session_statistics
+        
+        return load_session_statistics(self, include_frames=include_frames, use_cache=use_cache)
+    
+    def get_statistics(self, include_frames: bool = True) -> Dict:
+        """Get dataset statistics (JSON-serialisable summary)."""
+        return self.compute_statistics(include_frames=include_frames).summary()
     
-    def get_statistics(self) -> Dict:
-        """Get dataset statistics."""
-        trajectory = self.extract_trajectory()
-        keys = self.extract_key_presses()
-        battery, damage = self.extract_battery_damage()
-        
-        return {
-            'num_samples': len(self.samples),
-            'num_frames': len(self.frames),
-            'duration_s': self.metadata['duration_s'],
-            'sampling_rate': self.metadata['sampling_rate_hz'],
-            'trajectory_stats': {
-                'mean_position': trajectory.mean(axis=0).tolist(),
-                'std_position': trajectory.std(axis=0).tolist(),
-                'min_position': trajectory.min(axis=0).tolist(),
-                'max_position': trajectory.max(axis=0).tolist()
-            },
-            'key_press_frequency': {
-                'W': keys[:, 0].mean(),
-                'A': keys[:, 1].mean(),
-                'S': keys[:, 2].mean(),
-                'D': keys[:, 3].mean(),
-                'inspect': keys[:, 4].mean(),
-                'destroy': keys[:, 5].mean()
-            },
-            'battery_stats': {
-                'mean': battery.mean(),
-                'std': battery.std(),
-                'min': battery.min(),
-                'max': battery.max()
-            },
-            'damage_stats': {
-                'mean': damage.mean(),
-                'std': damage.std(),
-                'min': damage.min(),
-                'max': damage.max()
-            }
-        }
-    
-    def save_frames_as_individual_npy(self, output_dir: str = 'frames'):
+    def save_frames_as_individual_npy(self, output_dir: str = 'frames', overwrite: bool = True,
+                                      resume: bool = False, limit: Optional[int] = None,
+                                      workers: Optional[int] = None):
         """
         Save frames as individual .npy files (one per frame).
         
+        Writes run on a thread pool (see ``npyExtracter.write_frames``).
+        
         Args:
             output_dir: Directory to save frames
+            overwrite: Replace existing frame files
+            resume: Skip frames already written completely
+            limit: Only write the first N frames
+            workers: Writer threads
         """
-        if self.frames_array is None:
-            print("⚠️  No frames to save")
+        if self.frame_store is None:
+            logger.warning("⚠️  No frames to save")
             return
         
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
-        
-        for i, frame in enumerate(self.frames_array):
-            filename = f"frame_{str(i).zfill(6)}.npy"
-            output_file = output_path / filename
-            np.save(output_file, frame)
-            
-            if i % 100 == 0:
-                print(f"💾 Saved {i+1}/{len(self.frames_array)} frames...")
+        from npyExtracter import write_frames
         
-        print(f"✅ Saved {len(self.frames_array)} frames to {output_dir}/")
+        result = write_frames(self.frames_array, output_dir, overwrite=overwrite and not resume,
+                              limit=limit, resume=resume, workers=workers)
+        info(f"✅ Saved {result['written']} frames to {output_dir}/"
+              + (f" ({result['skipped']} already complete)" if result['skipped'] else ""))
     
     def visualize_trajectory(self, save_path: Optional[str] = None):
         """
@@ -486,23 +1051,28 @@ class ReActureDataset:
             print("Matplotlib not installed. Install with: pip install matplotlib")
 
 
-def load_multiple_sessions(metadata_paths: List[str]) -> List[ReActureDataset]:
+def load_multiple_sessions(metadata_paths: List[str], processes: Optional[int] = None,
+                           **dataset_kwargs) -> List[ReActureDataset]:
     """
     Load multiple dataset sessions.
     
+    Session caches are compiled in a process pool; see
+    ``reacture_multi.MultiSessionDataset`` for a global index across sessions
+    and a structured report of failures.
+    
     Args:
         metadata_paths: List of paths to metadata files
+        processes: Worker processes for compilation (None: CPU count, 0: serial)
+        **dataset_kwargs: Passed to ReActureDataset
         
     Returns:
         List of ReActureDataset objects
     """
-    datasets = []
-    for path in metadata_paths:
-        try:
-            dataset = ReActureDataset(path)
-            datasets.append(dataset)
-        except Exception as e:
-            print(f"⚠️  Failed to load {path}: {e}")
+    from reacture_multi import load_sessions
+    
+    datasets, report = load_sessions(metadata_paths, processes=processes, **dataset_kwargs)
+    for failure in report.failed:
+        logger.warning(f"⚠️  Failed to load {failure.path}: {failure.error}")
     
     return datasets
 
@@ -514,6 +1084,8 @@ def load_multiple_sessions(metadata_paths: List[str]) -> List[ReActureDataset]:
 if __name__ == "__main__":
     import sys
     
+    log_to_stdout()
+    
     if len(sys.argv) < 2:
         print("Usage: python load_reacture_dataset.py <metadata_file.json>")
         print("\nExample:")
@@ -592,10 +1164,10 @@ if __name__ == "__main__":
     print("Export Frames as .npy")
     print("="*70)
     
-    if dataset.frames:
+    if dataset.frame_store is not None:
         save_option = input("Save frames as individual .npy files? (y/n): ")
         if save_option.lower() == 'y':
-            dataset.save_frames_as_npy('frames_npy')
+            dataset.save_frames_as_individual_npy('frames_npy')
     
     print("\n✅ Dataset loading complete!")
     print("="*70)
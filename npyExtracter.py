@@ -1,41 +1,211 @@
-#!/usr/bin/env python3
-import argparse
-from pathlib import Path
-import numpy as np
-
-def split_frames(frames_path, out_dir, start=0, pad=6, overwrite=False, limit=None):
-    frames_path = Path(frames_path)
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    # Load without pulling all data into RAM
-    arr = np.load(frames_path, mmap_mode="r")
-
-    if arr.ndim not in (3, 4):
-        raise ValueError(f"Expected (N,H,W,3) or (N,H,W); got shape {arr.shape}")
-
-    n_total = arr.shape[0]
-    n = n_total if limit is None else min(limit, n_total)
-
-    written = 0
-    for i in range(n):
-        frame = arr[i]  # (H,W,3) uint8 in your dataset
-        out_path = out_dir / f"frame_{start + i:0{pad}d}.npy"
-        if out_path.exists() and not overwrite:
-            raise FileExistsError(f"{out_path} exists (use --overwrite to replace).")
-        np.save(out_path, frame, allow_pickle=False)
-        written += 1
-
-    print(f"Wrote {written} frames to {out_dir} (from {frames_path})")
-
-if __name__ == "__main__":
-    p = argparse.ArgumentParser(description="Split frames.npy into per-frame .npy files.")
-    p.add_argument("frames_path", help="Path to frames.npy")
-    p.add_argument("out_dir", help="Output directory for per-frame .npy files")
-    p.add_argument("--start", type=int, default=0, help="Starting index (default: 0)")
-    p.add_argument("--pad", type=int, default=6, help="Zero padding (default: 6 => 000000)")
-    p.add_argument("--overwrite", action="store_true", help="Allow overwriting existing files")
-    p.add_argument("--limit", type=int, default=None, help="Only write first N frames")
-    args = p.parse_args()
-
-    split_frames(args.frames_path, args.out_dir, args.start, args.pad, args.overwrite, args.limit)
+#!/usr/bin/env python3
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+import numpy as np
+
+from reacture_instrument import info, log_to_stdout
+
+FRAME_NAME = re.compile(r"frame_(\d+)\.npy$")
+
+
+def _npy_header(path):
+    """(shape, dtype, fortran_order, data_offset) of an .npy file."""
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        return shape, dtype, fortran_order, f.tell()
+
+
+def _is_complete(path, shape, dtype):
+    """True if path is a fully written .npy holding one frame of this shape/dtype."""
+    try:
+        file_shape, file_dtype, _, offset = _npy_header(path)
+    except (OSError, ValueError):
+        return False
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return (tuple(file_shape) == tuple(shape) and file_dtype == dtype
+            and os.path.getsize(path) == offset + nbytes)
+
+
+def _write_frame(out_path, frame):
+    # Write to a temporary name first so an interrupted run never leaves a
+    # truncated file under the final name
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(frame), allow_pickle=False)
+    os.replace(tmp_path, out_path)
+    return frame.nbytes
+
+
+class _Progress:
+    def __init__(self, total, label, every_s=2.0):
+        self.total, self.label, self.every_s = total, label, every_s
+        self.done = self.bytes = 0
+        self.start = self.last = time.perf_counter()
+
+    def update(self, n=1, nbytes=0, force=False):
+        self.done += n
+        self.bytes += nbytes
+        now = time.perf_counter()
+        if force or now - self.last >= self.every_s:
+            self.last = now
+            elapsed = max(now - self.start, 1e-9)
+            info(f"💾 {self.label} {self.done}/{self.total} frames "
+                  f"({self.done / elapsed:.0f} frames/s, {self.bytes / 1e6 / elapsed:.1f} MB/s)")
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+def write_frames(frames, out_dir, start=0, pad=6, overwrite=False, limit=None, resume=False,
+                 workers=None, max_in_flight=None, progress_every=2.0):
+    """
+    Write each frame of an (N,H,W,3) array-like to out_dir/frame_XXXXXX.npy.
+
+    Writes run on a thread pool with at most max_in_flight frames queued, so
+    memory stays bounded while the syscalls overlap. With resume=True, frames
+    whose file already exists with a matching header and size are skipped.
+
+    Returns:
+        Dict with 'written', 'skipped' and 'elapsed_s'
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if frames.ndim not in (3, 4):
+        raise ValueError(f"Expected (N,H,W,3) or (N,H,W); got shape {frames.shape}")
+
+    n_total = frames.shape[0]
+    n = n_total if limit is None else min(limit, n_total)
+    frame_shape, dtype = tuple(frames.shape[1:]), np.dtype(frames.dtype)
+    workers = workers or min(8, (os.cpu_count() or 1) * 2)
+    max_in_flight = max_in_flight or workers * 4
+
+    written = skipped = 0
+    progress = _Progress(n, "Wrote", progress_every)
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(n):
+            out_path = out_dir / f"frame_{start + i:0{pad}d}.npy"
+            if out_path.exists() and not overwrite:
+                if resume and _is_complete(out_path, frame_shape, dtype):
+                    skipped += 1
+                    progress.update()
+                    continue
+                if not resume:
+                    raise FileExistsError(f"{out_path} exists (use --overwrite to replace).")
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    progress.update(nbytes=future.result())
+                    written += 1
+            pending.add(pool.submit(_write_frame, out_path, frames[i]))
+        for future in pending:
+            progress.update(nbytes=future.result())
+            written += 1
+
+    progress.update(0, force=True)
+    return {"written": written, "skipped": skipped, "elapsed_s": progress.elapsed}
+
+
+def split_frames(frames_path, out_dir, start=0, pad=6, overwrite=False, limit=None, resume=False,
+                 workers=None, max_in_flight=None):
+    frames_path = Path(frames_path)
+
+    # Load without pulling all data into RAM
+    arr = np.load(frames_path, mmap_mode="r")
+    result = write_frames(arr, out_dir, start, pad, overwrite, limit, resume, workers, max_in_flight)
+
+    print(f"Wrote {result['written']} frames to {out_dir} (from {frames_path})"
+          + (f", skipped {result['skipped']} complete" if result["skipped"] else ""))
+    return result
+
+
+def consolidate_frames(frames_dir, out_path, chunk_frames=256, overwrite=False, workers=None):
+    """
+    Stream frames_dir/frame_*.npy back into one (N,H,W,3) .npy file.
+
+    Every header is validated first (same shape and dtype, contiguous
+    indices); the output is preallocated and filled one chunk at a time.
+
+    Returns:
+        Shape of the consolidated array
+    """
+    frames_dir, out_path = Path(frames_dir), Path(out_path)
+    if out_path.exists() and not overwrite:
+        raise FileExistsError(f"{out_path} exists (use --overwrite to replace).")
+
+    files = sorted((int(m.group(1)), path) for path in frames_dir.iterdir()
+                   if (m := FRAME_NAME.search(path.name)))
+    if not files:
+        raise FileNotFoundError(f"No frame_*.npy files in {frames_dir}")
+    indices = np.array([i for i, _ in files])
+    gaps = np.flatnonzero(np.diff(indices) != 1)
+    if len(gaps):
+        raise ValueError(f"Frame indices are not contiguous after frame {indices[gaps[0]]}")
+
+    frame_shape, dtype, _, _ = _npy_header(files[0][1])
+    for _, path in files:
+        shape, file_dtype, fortran_order, offset = _npy_header(path)
+        if tuple(shape) != tuple(frame_shape) or file_dtype != dtype or fortran_order:
+            raise ValueError(f"{path.name}: shape {shape} {file_dtype} does not match "
+                             f"{frame_shape} {dtype}")
+        if os.path.getsize(path) != offset + int(np.prod(shape)) * dtype.itemsize:
+            raise ValueError(f"{path.name} is truncated")
+
+    shape = (len(files),) + tuple(frame_shape)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+
+    progress = _Progress(len(files), "Consolidated")
+    workers = workers or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for lo in range(0, len(files), chunk_frames):
+            chunk = files[lo:lo + chunk_frames]
+            frames = list(pool.map(lambda item: np.load(item[1], allow_pickle=False), chunk))
+            out[lo:lo + len(chunk)] = frames
+            progress.update(len(chunk), len(chunk) * out[0].nbytes)
+    out.flush()
+    del out
+    os.replace(tmp_path, out_path)
+
+    progress.update(0, force=True)
+    print(f"Consolidated {shape[0]} frames into {out_path} (shape {shape})")
+    return shape
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Split frames.npy into per-frame .npy files (or back).")
+    p.add_argument("frames_path", help="Path to frames.npy (with --consolidate: frames/ directory)")
+    p.add_argument("out_dir", help="Output directory for per-frame .npy files "
+                                   "(with --consolidate: output .npy path)")
+    p.add_argument("--start", type=int, default=0, help="Starting index (default: 0)")
+    p.add_argument("--pad", type=int, default=6, help="Zero padding (default: 6 => 000000)")
+    p.add_argument("--overwrite", action="store_true", help="Allow overwriting existing files")
+    p.add_argument("--limit", type=int, default=None, help="Only write first N frames")
+    p.add_argument("--resume", action="store_true",
+                   help="Skip frames already written completely (header and size verified)")
+    p.add_argument("--workers", type=int, default=None, help="Writer threads (default: 2x CPUs, max 8)")
+    p.add_argument("--max-in-flight", type=int, default=None,
+                   help="Frames queued for writing at once (default: 4x workers)")
+    p.add_argument("--consolidate", action="store_true",
+                   help="Merge a frames/ directory back into one (N,H,W,3) .npy")
+    p.add_argument("--chunk-frames", type=int, default=256,
+                   help="Frames per chunk when consolidating (default: 256)")
+    args = p.parse_args()
+    log_to_stdout()
+
+    if args.consolidate:
+        consolidate_frames(args.frames_path, args.out_dir, args.chunk_frames, args.overwrite,
+                           args.workers)
+    else:
+        split_frames(args.frames_path, args.out_dir, args.start, args.pad, args.overwrite,
+                     args.limit, args.resume, args.workers, args.max_in_flight)
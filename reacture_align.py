@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+ReActure Frame Alignment & Resampling
+=====================================
+
+The JSONL interleaves ``periodic_update_10hz`` rows (one frame each) with
+event rows (``inspect``, ``zone_change``, ``player_action`` ...) that have
+no frame, so row ``i`` is generally *not* frame ``i``. This module joins
+samples to frames and resamples irregular telemetry onto a fixed grid,
+all with vectorised NumPy.
+
+Usage:
+    from reacture_align import align_frames, resample_columns
+
+    frame_idx = align_frames(columns, frame_timestamps_ms, tolerance_ms=50)
+    grid = resample_columns(columns, rate_hz=10)
+    grid['time_s'], grid['robot.position'], grid['zone']
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from reacture_columns import SessionColumns
+from reacture_index import TimeIndex
+
+# Default maximum |sample time - frame time| for timestamp matching (half a 10 Hz tick)
+DEFAULT_TOLERANCE_MS = 50.0
+
+
+def align_frames(columns: SessionColumns, frame_timestamps_ms: Optional[np.ndarray],
+                 num_frames: int, tolerance_ms: Optional[float] = DEFAULT_TOLERANCE_MS,
+                 match_events: bool = True) -> np.ndarray:
+    """
+    Map every sample row to a frame index.
+
+    Rows recorded with a ``visual_frame_path`` use the frame number encoded
+    in the path. Remaining rows (events) are matched to the nearest frame
+    timestamp within ``tolerance_ms``.
+
+    Args:
+        columns: Session columns
+        frame_timestamps_ms: Timestamp (ms) of each frame, or None
+        num_frames: Number of frames available
+        tolerance_ms: Maximum time difference for timestamp matches
+            (None accepts any distance)
+        match_events: Also match rows without a frame path by timestamp
+
+    Returns:
+        int32 array of shape (N,), -1 where a sample has no frame
+    """
+    frame_idx = np.asarray(columns.group('visual_frame_index')).astype(np.int32)
+    frame_idx[(frame_idx < 0) | (frame_idx >= num_frames)] = -1
+
+    if not match_events or frame_timestamps_ms is None or num_frames == 0:
+        return frame_idx
+
+    frame_times = np.asarray(frame_timestamps_ms[:num_frames], dtype=np.float64)
+    pending = np.flatnonzero(frame_idx < 0)
+    if pending.size == 0:
+        return frame_idx
+
+    index = TimeIndex(frame_times)
+    sample_times = np.asarray(columns.group('timestamp_ms'))[pending]
+    frame_idx[pending] = index.lookup(sample_times, mode='nearest', tolerance=tolerance_ms)
+    return frame_idx
+
+
+def _interp_column(times: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.full(grid.shape, np.nan, dtype=values.dtype)
+    return np.interp(grid, times[valid], values[valid]).astype(values.dtype)
+
+
+def resample_columns(columns: SessionColumns, rate_hz: float = 10.0,
+                     start_s: Optional[float] = None, end_s: Optional[float] = None,
+                     groups: Optional[Sequence[str]] = None,
+                     rows=None, frame_timestamps_ms: Optional[np.ndarray] = None,
+                     tolerance_ms: Optional[float] = DEFAULT_TOLERANCE_MS) -> Dict[str, np.ndarray]:
+    """
+    Resample telemetry onto an exact fixed-rate grid.
+
+    Continuous (float) groups are linearly interpolated; discrete groups
+    (flags, integer fields and categorical codes) are forward-filled from the
+    last sample at or before each grid point; grid points before the first
+    sample take its value.
+
+    Args:
+        columns: Session columns
+        rate_hz: Output rate; grid points are ``start_s + k / rate_hz``
+        start_s: Grid start (default: first sample time)
+        end_s: Grid end, inclusive (default: last sample time)
+        groups: Column groups to resample (default: all except time columns)
+        rows: Row selector restricting the source rows (e.g. robot_state rows)
+        frame_timestamps_ms: Optional frame timestamps; each grid point is
+            matched to its nearest frame as ``frame_index`` (-1 beyond tolerance)
+        tolerance_ms: Maximum grid-to-frame distance for ``frame_index``
+
+    Returns:
+        Dictionary with ``time_s`` (grid) plus one array per requested group
+    """
+    if rate_hz <= 0:
+        raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+
+    if rows is None:
+        rows = slice(None)
+    times = np.asarray(columns.group('time_elapsed_s'))[rows]
+    keep = ~np.isnan(times)
+    if not keep.all():
+        rows = np.arange(len(columns))[rows][keep]
+        times = times[keep]
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+
+    if start_s is None:
+        start_s = float(times[0]) if len(times) else 0.0
+    if end_s is None:
+        end_s = float(times[-1]) if len(times) else start_s
+    count = max(int(np.floor((end_s - start_s) * rate_hz + 1e-9)) + 1, 0)
+    grid = start_s + np.arange(count, dtype=np.float64) / rate_hz
+
+    # Forward-fill source row for each grid point (clamped to the first row)
+    ffill = np.clip(np.searchsorted(times, grid, side='right') - 1, 0, max(len(times) - 1, 0))
+
+    if groups is None:
+        groups = [name for name in columns.group_names if name not in ('time_elapsed_s', 'timestamp_ms')]
+
+    result = {'time_s': grid}
+    for name in groups:
+        source = np.asarray(columns.group(name))[rows][order]
+        if len(times) == 0:
+            result[name] = np.empty((count,) + source.shape[1:], dtype=source.dtype)
+        elif source.dtype.kind == 'f':
+            if source.ndim == 1:
+                result[name] = _interp_column(times, source, grid)
+            else:
+                result[name] = np.stack(
+                    [_interp_column(times, source[:, k], grid) for k in range(source.shape[1])],
+                    axis=1,
+                )
+        else:
+            result[name] = source[ffill]
+
+    if frame_timestamps_ms is not None:
+        index = TimeIndex(frame_timestamps_ms)
+        result['frame_index'] = index.lookup(grid * 1000.0, mode='nearest',
+                                             tolerance=tolerance_ms).astype(np.int32)
+
+    return result
+
+
+def frame_alignment_params(frames_fingerprint: Dict, tolerance_ms: Optional[float],
+                           match_events: bool) -> Dict:
+    """Cache key for a session's frame alignment."""
+    return {
+        'frames': frames_fingerprint,
+        'tolerance_ms': tolerance_ms,
+        'match_events': match_events,
+    }
+
+
+def resample_params(rate_hz: float, start_s, end_s, groups: Optional[List[str]],
+                    robot_state_only: bool, alignment: Dict) -> Dict:
+    """Cache key for a resampled grid."""
+    return {
+        'rate_hz': rate_hz,
+        'start_s': start_s,
+        'end_s': end_s,
+        'groups': list(groups) if groups is not None else None,
+        'robot_state_only': robot_state_only,
+        'alignment': alignment,
+    }
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+ReActure Loader Benchmarks
+==========================
+
+Repeatable performance measurements of the dataset loader, written to JSON
+so runs from different versions can be compared.
+
+For every session it measures:
+
+- construction time, cold (column cache removed, so JSONL is compiled) and
+  warm (cache hit), each with its peak RSS, in a fresh process (cold only
+  when the session has a JSONL to rebuild the cache from)
+- ``__getitem__`` latency for sequential and random access (p50/p95/p99)
+- ``extract_*`` times
+- ``get_time_range`` and ``get_time_range_columns`` throughput
+- ``get_batch`` and PyTorch DataLoader samples/s (DataLoader only when
+  torch is installed)
+
+Metric names end in their unit: ``_s``, ``_us`` and ``_mb`` are lower-is-
+better, ``_per_s`` is higher-is-better; ``compare_reports`` uses this to
+flag regressions.
+
+Usage:
+    python reacture_synth.py bench_data/ --sessions 2 --duration 600
+    python reacture_bench.py run bench_data/ --output bench_new.json
+    python reacture_bench.py compare bench_old.json bench_new.json --tolerance 0.15
+"""
+
+import json
+import multiprocessing
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from load_reacture_dataset import ReActureDataset
+from reacture_columns import columns_dir_for, find_jsonl
+from reacture_instrument import info, log_to_stdout, quiet
+
+REPORT_VERSION = 1
+LOWER_IS_BETTER = ('_s', '_us', '_mb')
+HIGHER_IS_BETTER = ('_per_s',)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _open(metadata_path) -> ReActureDataset:
+    with quiet():
+        return ReActureDataset(str(metadata_path))
+
+
+def _percentiles(seconds: Sequence[float], prefix: str) -> Dict[str, float]:
+    us = np.asarray(seconds) * 1e6
+    return {f"{prefix}_p50_us": float(np.percentile(us, 50)),
+            f"{prefix}_p95_us": float(np.percentile(us, 95)),
+            f"{prefix}_p99_us": float(np.percentile(us, 99)),
+            f"{prefix}_mean_us": float(us.mean())}
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    """Fastest of ``repeat`` runs, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _construct(metadata_path: str, jsonl_path: Optional[str]) -> Dict[str, float]:
+    """Worker: open a session in a fresh process and report its time and peak RSS.
+
+    When ``jsonl_path`` is given its column cache is removed first, so the
+    session is compiled from the JSONL (cold construction).
+    """
+    if jsonl_path is not None:
+        shutil.rmtree(columns_dir_for(jsonl_path), ignore_errors=True)
+    base_rss = peak_rss_mb()
+    start = time.perf_counter()
+    dataset = _open(metadata_path)
+    dataset.sample_frame_index  # alignment is part of getting a usable session
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'peak_rss_mb': peak_rss_mb(), 'base_rss_mb': base_rss}
+
+
+def bench_construction(metadata_path) -> Dict[str, float]:
+    """Cold and warm construction, each in its own spawned process.
+
+    Sessions without a JSONL (e.g. imported ones) have nothing to rebuild
+    their columns from, so only warm construction is measured for them.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    jsonl_path = find_jsonl(Path(metadata_path).parent,
+                            Path(metadata_path).stem.replace('_metadata', ''))
+    runs = [('warm', None)]
+    if jsonl_path is None:
+        results['construct_cold'] = 'skipped: no JSONL to rebuild the columns from'
+    else:
+        runs.insert(0, ('cold', str(jsonl_path)))
+    for label, source in runs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            run = pool.submit(_construct, str(metadata_path), source).result()
+        results[f"construct_{label}_s"] = run['seconds']
+        results[f"construct_{label}_peak_rss_mb"] = run['peak_rss_mb']
+        results[f"construct_{label}_rss_delta_mb"] = run['peak_rss_mb'] - run['base_rss_mb']
+    return results
+
+
+def bench_access(dataset: ReActureDataset, samples: int = 1000,
+                 rng: Optional[np.random.Generator] = None) -> Dict[str, float]:
+    """``__getitem__`` latency, sequential and random."""
+    rng = rng or np.random.default_rng(0)
+    n = len(dataset)
+    results = {}
+    for label, order in (('getitem_seq', np.arange(min(samples, n))),
+                         ('getitem_random', rng.integers(0, n, samples))):
+        times = []
+        for i in order:
+            start = time.perf_counter()
+            sample = dataset[int(i)]
+            if sample.get('frame') is not None:
+                sample['frame'].sum()  # touch the pixels, not just the map
+            times.append(time.perf_counter() - start)
+        results.update(_percentiles(times, label))
+    return results
+
+
+def bench_extract(dataset: ReActureDataset, repeat: int = 5) -> Dict[str, float]:
+    """Best-of-``repeat`` time of each ``extract_*`` method."""
+    results = {}
+    for name in ('trajectory', 'key_presses', 'accelerometer', 'battery_damage'):
+        method = getattr(dataset, f"extract_{name}")
+        results[f"extract_{name}_s"] = _best_of(lambda: np.asarray(method()).sum(), repeat)
+    return results
+
+
+def bench_time_range(dataset: ReActureDataset, queries: int = 200, window_s: float = 5.0,
+                     rng: Optional[np.random.Generator] = None) -> Dict[str, float]:
+    """Random fixed-width time windows: row dicts and column views."""
+    rng = rng or np.random.default_rng(0)
+    duration = float(dataset.metadata.get('duration_s') or 0.0)
+    starts = rng.uniform(0.0, max(duration - window_s, 0.0), queries)
+
+    results = {}
+    start = time.perf_counter()
+    rows = sum(len(dataset.get_time_range(s, s + window_s)) for s in starts)
+    elapsed = time.perf_counter() - start
+    results['time_range_queries_per_s'] = queries / elapsed
+    results['time_range_rows_per_s'] = rows / elapsed
+
+    start = time.perf_counter()
+    for s in starts:
+        dataset.get_time_range_columns(s, s + window_s)
+    results['time_range_columns_queries_per_s'] = queries / (time.perf_counter() - start)
+    return results
+
+
+def bench_batches(dataset: ReActureDataset, batch_size: int = 64, batches: int = 50,
+                  num_workers: int = 0, rng: Optional[np.random.Generator] = None
+                  ) -> Dict[str, Union[float, str]]:
+    """``get_batch`` and (if torch is installed) DataLoader throughput."""
+    rng = rng or np.random.default_rng(0)
+    n = len(dataset)
+    results: Dict[str, Union[float, str]] = {}
+    index = [rng.integers(0, n, batch_size) for _ in range(batches)]
+    start = time.perf_counter()
+    for rows in index:
+        dataset.get_batch(rows)
+    results['get_batch_samples_per_s'] = batch_size * batches / (time.perf_counter() - start)
+
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        results['dataloader'] = 'skipped: torch not installed'
+        return results
+
+    loader = dataset.to_pytorch_dataloader(batch_size=batch_size, shuffle=True,
+                                           num_workers=num_workers, seed=0)
+    iterator = iter(loader)
+    next(iterator)  # worker start-up is not throughput
+    count, start = 0, time.perf_counter()
+    for count_batches, batch in enumerate(iterator, 1):
+        count += len(batch['timestamp'])
+        if count_batches >= batches:
+            break
+    elapsed = time.perf_counter() - start
+    results['dataloader_samples_per_s'] = count / elapsed if elapsed > 0 else float('nan')
+    return results
+
+
+def bench_session(metadata_path, samples: int = 1000, queries: int = 200,
+                  window_s: float = 5.0, batch_size: int = 64, batches: int = 50,
+                  num_workers: int = 0, construction: bool = True, seed: int = 0) -> Dict:
+    """Every benchmark for one session."""
+    rng = np.random.default_rng(seed)
+    results: Dict = {}
+    if construction:
+        results.update(bench_construction(metadata_path))
+    dataset = _open(metadata_path)
+    results['num_samples'] = len(dataset)
+    results['num_frames'] = 0 if dataset.frame_store is None else len(dataset.frame_store)
+    results.update(bench_access(dataset, samples, rng))
+    results.update(bench_extract(dataset))
+    results.update(bench_time_range(dataset, queries, window_s, rng))
+    results.update(bench_batches(dataset, batch_size, batches, num_workers, rng))
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(metadata_paths: Sequence[Union[str, Path]], **kwargs) -> Dict:
+    """
+    Benchmark sessions and build a JSON-serialisable report.
+
+    Args:
+        metadata_paths: Session metadata files
+        **kwargs: Passed to ``bench_session``
+
+    Returns:
+        Dictionary with 'environment' (versions, revision), 'config' and
+        'sessions' (session id -> metrics)
+    """
+    report = {
+        'report_version': REPORT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': multiprocessing.cpu_count(),
+        },
+        'config': kwargs,
+        'sessions': {},
+    }
+    for path in metadata_paths:
+        session_id = Path(path).stem.replace('_metadata', '')
+        info(f"⏱️  Benchmarking {session_id}...")
+        report['sessions'][session_id] = bench_session(path, **kwargs)
+    return report
+
+
+def _direction(metric: str) -> int:
+    """+1 if larger is better, -1 if smaller is better, 0 if not comparable."""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare_reports(old: Dict, new: Dict, tolerance: float = 0.1) -> List[Dict]:
+    """
+    Compare two reports metric by metric.
+
+    Args:
+        old: Baseline report
+        new: Candidate report
+        tolerance: Relative change treated as noise
+
+    Returns:
+        One entry per comparable metric present in both reports, with
+        'session', 'metric', 'old', 'new', 'change' (relative, positive =
+        better) and 'status' ('regression', 'improvement' or 'ok')
+    """
+    rows = []
+    for session, metrics in new['sessions'].items():
+        baseline = old['sessions'].get(session, {})
+        for metric, value in metrics.items():
+            direction = _direction(metric)
+            before = baseline.get(metric)
+            if not direction or not isinstance(value, (int, float)) \
+                    or not isinstance(before, (int, float)) or not before:
+                continue
+            change = direction * (value - before) / abs(before)
+            status = ('regression' if change < -tolerance else
+                      'improvement' if change > tolerance else 'ok')
+            rows.append({'session': session, 'metric': metric, 'old': before, 'new': value,
+                         'change': change, 'status': status})
+    return rows
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    lines = [f"{'session':<32} {'metric':<38} {'old':>12} {'new':>12} {'change':>8}"]
+    for row in rows:
+        marker = {'regression': '🔴', 'improvement': '🟢'}.get(row['status'], '  ')
+        lines.append(f"{row['session'][:32]:<32} {row['metric']:<38} {row['old']:>12.4g} "
+                     f"{row['new']:>12.4g} {row['change']:>+7.1%} {marker}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from reacture_multi import discover_sessions
+
+    p = argparse.ArgumentParser(description="Benchmark the ReActure loader.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Benchmark sessions and write a JSON report")
+    run.add_argument("inputs", nargs="+", help="Session metadata files or directories to search")
+    run.add_argument("--output", "-o", default="bench.json", help="Report path (default: bench.json)")
+    run.add_argument("--samples", type=int, default=1000, help="__getitem__ calls per access pattern")
+    run.add_argument("--queries", type=int, default=200, help="Time range queries")
+    run.add_argument("--window", type=float, default=5.0, help="Time range width in seconds")
+    run.add_argument("--batch-size", type=int, default=64, help="Batch size for get_batch/DataLoader")
+    run.add_argument("--batches", type=int, default=50, help="Batches timed")
+    run.add_argument("--num-workers", type=int, default=0, help="DataLoader workers")
+    run.add_argument("--no-construction", action="store_true",
+                     help="Skip cold/warm construction (keeps existing caches)")
+
+    compare = sub.add_parser("compare", help="Compare two reports")
+    compare.add_argument("old", help="Baseline report")
+    compare.add_argument("new", help="Candidate report")
+    compare.add_argument("--tolerance", type=float, default=0.1,
+                         help="Relative change treated as noise (default: 0.1)")
+    args = p.parse_args()
+    log_to_stdout()
+
+    if args.command == "run":
+        report = run_benchmarks(discover_sessions(args.inputs), samples=args.samples,
+                                queries=args.queries, window_s=args.window,
+                                batch_size=args.batch_size, batches=args.batches,
+                                num_workers=args.num_workers,
+                                construction=not args.no_construction)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Wrote {args.output}")
+    else:
+        with open(args.old) as f_old, open(args.new) as f_new:
+            rows = compare_reports(json.load(f_old), json.load(f_new), args.tolerance)
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row['status'] == 'regression']
+        print(f"\n{'🔴' if regressions else '✅'} {len(regressions)} regressions "
+              f"(tolerance {args.tolerance:.0%})")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,995 @@
+#!/usr/bin/env python3
+"""
+ReActure Columnar Session Cache
+===============================
+
+Compile a session's ``<session>_data.jsonl`` into typed, struct-of-arrays
+columns and keep them next to the metadata file so later loads are a
+handful of memory-mapped ``np.load`` calls instead of a full JSON parse.
+
+Layout on disk:
+
+    reacture_<timestamp>_columns/
+    ├── manifest.json            # schema, categories, source fingerprint
+    ├── timestamp_ms.npy         # (N,) float64
+    ├── robot.position.npy       # (N, 3) float64 [x, y, z]
+    ├── key_presses.npy          # (N, 9) bool [W, A, S, D, inspect, ...]
+    ├── ...
+    ├── present.npy              # (N,) uint32 bits: which flags/timestamps a row had
+    └── extras.{offsets,data}.npy  # per-row JSON of fields outside the schema
+
+Usage:
+    from reacture_columns import load_or_compile_columns
+
+    columns, cache_hit = load_or_compile_columns('reacture_..._data.jsonl')
+    x = columns.field('robot.position.x')    # (N,) float64 view
+    keys = columns.group('key_presses')      # (N, 9) bool
+"""
+
+import bz2
+import gzip
+import importlib
+import json
+import lzma
+import os
+import shutil
+import time
+import warnings
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from reacture_ragged import Ragged
+
+CACHE_FORMAT_VERSION = 4
+
+# Column groups compiled from every JSONL row.
+# (group name, storage kind, leaf field paths)
+#
+# Vector groups share one 2-D array so extract_* can hand out slices
+# without restacking; single-field groups are stored 1-D.
+COLUMN_SCHEMA: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ('timestamp_ms', 'f8', ('timestamp_ms',)),
+    ('time_elapsed_s', 'f8', ('time_elapsed_s',)),
+    # ISO-8601 'timestamp' strings, stored as epoch ms (see parse_iso_timestamp)
+    ('timestamp_utc_ms', 'f8', ('timestamp',)),
+    ('type', 'category', ('type',)),
+    ('event', 'category', ('event',)),
+    ('action', 'category', ('action',)),
+    ('key_presses', 'bool', (
+        'key_presses.W', 'key_presses.A', 'key_presses.S', 'key_presses.D',
+        'key_presses.inspect', 'key_presses.destroy',
+        'key_presses.Space', 'key_presses.E', 'key_presses.R',
+    )),
+    ('key_presses.mouse', 'f8', ('key_presses.mouse_dx', 'key_presses.mouse_dy')),
+    ('robot.position', 'f8', ('robot.position.x', 'robot.position.y', 'robot.position.z')),
+    ('robot.rotation', 'f8', ('robot.rotation.x', 'robot.rotation.y', 'robot.rotation.z')),
+    ('robot.velocity', 'f8', ('robot.velocity.x', 'robot.velocity.y', 'robot.velocity.z')),
+    ('robot.isJumping', 'bool', ('robot.isJumping',)),
+    ('accelerometer', 'f8', ('accelerometer.x', 'accelerometer.y', 'accelerometer.z')),
+    ('battery', 'f8', ('battery',)),
+    ('damage', 'f8', ('damage',)),
+    ('health', 'f8', ('health',)),
+    ('fuel', 'f8', ('fuel',)),
+    ('zone', 'category', ('zone',)),
+    ('camera.position', 'f8', ('camera.position.x', 'camera.position.y', 'camera.position.z')),
+    ('camera.rotation', 'f8', ('camera.rotation.x', 'camera.rotation.y', 'camera.rotation.z')),
+    ('camera.yaw', 'f8', ('camera.yaw',)),
+    ('camera.pitch', 'f8', ('camera.pitch',)),
+    ('sensors.proximity', 'f8', ('sensors.proximity',)),
+    ('sensors.proximitySensors', 'f8', (
+        'sensors.proximitySensors.forward', 'sensors.proximitySensors.left',
+        'sensors.proximitySensors.right', 'sensors.proximitySensors.back',
+    )),
+    ('sensors.victimsDetected', 'i2', ('sensors.victimsDetected',)),
+    ('sensors.fuelStationDistance', 'f8', ('sensors.fuelStationDistance',)),
+    ('sensors.zone', 'category', ('sensors.zone',)),
+    ('sensors.inYellowZone', 'bool', ('sensors.inYellowZone',)),
+    ('sensors.inRedZone', 'bool', ('sensors.inRedZone',)),
+    ('visual_frame_index', 'i4', ('visual_frame_path',)),
+)
+
+# Variable-length list fields, stored ragged: '<name>.offsets' (N + 1,) int64
+# row starts into flat '<name>.<leaf>' value arrays (see reacture_ragged)
+RAGGED_SCHEMA: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ('sensors.victims', 'f8', ('distance', 'angle', 'health')),
+)
+
+
+# Fields whose column value cannot say whether the source row had them:
+# flags (stored False when absent), the timestamps filled in for
+# player_action rows and the ragged lists (stored empty when absent).
+# PRESENT_GROUP holds one bit per field, set when the row had it.
+PRESENCE_FIELDS: Tuple[str, ...] = (
+    ('timestamp_ms', 'time_elapsed_s')
+    + tuple(leaf for _, kind, leaves in COLUMN_SCHEMA if kind == 'bool' for leaf in leaves)
+    + tuple(name for name, _, _ in RAGGED_SCHEMA)
+)
+PRESENT_GROUP = 'present'
+PRESENT_DTYPE = np.uint32
+
+# Parts of a row the columns cannot reproduce (keys outside the schema such
+# as 'finalStats', explicit nulls, 'timestamp' values that are not ISO
+# strings, flags written as 0/1, ...) are kept as compact JSON:
+# '<EXTRAS_GROUP>.offsets' (N + 1,) int64 row starts into
+# '<EXTRAS_GROUP>.data' (uint8 UTF-8 bytes).
+EXTRAS_GROUP = 'extras'
+
+
+def presence_bit(field: str) -> int:
+    """Bit of ``field`` (one of PRESENCE_FIELDS) in the PRESENT_GROUP column."""
+    return 1 << PRESENCE_FIELDS.index(field)
+
+
+def array_names() -> List[str]:
+    """Every array a compiled session holds (column groups, ragged parts, presence, extras)."""
+    names = [name for name, _, _ in COLUMN_SCHEMA]
+    for name, _, leaves in RAGGED_SCHEMA:
+        names += [f"{name}.offsets"] + [f"{name}.{leaf}" for leaf in leaves]
+    return names + [PRESENT_GROUP, f"{EXTRAS_GROUP}.offsets", f"{EXTRAS_GROUP}.data"]
+
+
+# Categories every session knows about up front, so codes for the common
+# values are stable across sessions. Unseen values are appended per session.
+KNOWN_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    'type': ('robot_state', 'player_action'),
+    'event': (
+        'periodic_update_10hz', 'game_start', 'game_end', 'inspect',
+        'destroy_rubble', 'rescue', 'zone_change', 'damage_from_zone',
+        'collision_damage',
+    ),
+    'action': (),
+    'zone': ('safe', 'yellow', 'red'),
+    'sensors.zone': ('safe', 'yellow', 'red'),
+}
+
+CATEGORY_DTYPE = np.int16
+MISSING_CODE = -1
+
+_STORAGE_DTYPES = {
+    'f8': np.float64,
+    'i2': np.int16,
+    'i4': np.int32,
+    'bool': np.bool_,
+    'category': CATEGORY_DTYPE,
+}
+
+_MISSING_VALUES = {
+    'f8': np.nan,
+    'i2': -1,
+    'i4': -1,
+    'bool': False,
+    'category': MISSING_CODE,
+}
+
+# Rows compiled into Python lists before being flushed to NumPy
+DEFAULT_CHUNK_ROWS = 8192
+
+# JSONL is read in blocks of this many (decompressed) bytes
+DEFAULT_READ_BYTES = 4 << 20
+
+# ``<session>_data.jsonl`` may also be stored compressed
+JSONL_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+# JSON decoders tried in order; orjson/ujson are optional, the stdlib always works.
+# REACTURE_JSON_BACKEND=json forces the stdlib.
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
+
+# Lines decoded per call: one JSON array parse amortises per-call overhead
+DEFAULT_DECODE_LINES = 256
+
+
+def _select_json_backend(name: Optional[str] = None) -> Tuple[str, Callable]:
+    for backend in ([name] if name else JSON_BACKENDS):
+        try:
+            return backend, importlib.import_module(backend).loads
+        except ImportError:
+            if name:
+                raise
+    return 'json', json.loads
+
+
+JSON_BACKEND, _json_loads = _select_json_backend(os.environ.get('REACTURE_JSON_BACKEND'))
+
+
+def set_json_backend(name: Optional[str] = None) -> str:
+    """
+    Choose the JSON decoder used for JSONL ('orjson', 'ujson', 'json'; None: fastest installed).
+
+    Returns:
+        Name of the selected backend
+    """
+    global JSON_BACKEND, _json_loads
+    JSON_BACKEND, _json_loads = _select_json_backend(name)
+    return JSON_BACKEND
+
+
+def decode_lines(lines: List[bytes]) -> List[Dict]:
+    """
+    Decode JSONL lines with one parse of ``[line, line, ...]``.
+
+    If the batch does not parse (a malformed line, or a NaN literal the fast
+    backends reject), the lines are decoded one by one with the stdlib so
+    the error names the offending line.
+    """
+    if not lines:
+        return []
+    try:
+        records = _json_loads(b'[' + b','.join(lines) + b']')
+    except ValueError:
+        return [json.loads(line) for line in lines]
+    # A line holding several comma-separated values would shift the records
+    if len(records) != len(lines):
+        return [json.loads(line) for line in lines]
+    return records
+
+
+def columns_dir_for(jsonl_path) -> Path:
+    """Cache directory that sits next to ``<session>_data.jsonl``."""
+    jsonl_path = Path(jsonl_path)
+    session_id = jsonl_path.name.split('_data.jsonl')[0]
+    return jsonl_path.parent / f"{session_id}_columns"
+
+
+def find_jsonl(base_path, session_id: str) -> Optional[Path]:
+    """``<session>_data.jsonl``, or its ``.gz``/``.bz2``/``.xz`` form, if one exists."""
+    plain = Path(base_path) / f"{session_id}_data.jsonl"
+    for path in [plain] + [plain.with_name(plain.name + suffix) for suffix in JSONL_OPENERS]:
+        if path.exists():
+            return path
+    return None
+
+
+def open_jsonl(path):
+    """Open a (possibly compressed) JSONL file for binary reading."""
+    path = Path(path)
+    opener = JSONL_OPENERS.get(path.suffix)
+    return opener(path, 'rb') if opener is not None else open(path, 'rb')
+
+
+def iter_jsonl_lines(path, read_bytes: int = DEFAULT_READ_BYTES) -> Iterator[bytes]:
+    """Yield raw lines, reading the file in large blocks."""
+    with open_jsonl(path) as f:
+        tail = b''
+        while True:
+            block = f.read(read_bytes)
+            if not block:
+                break
+            lines = (tail + block).split(b'\n')
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+
+
+def iter_jsonl(path, events: Optional[Collection[str]] = None,
+               types: Optional[Collection[str]] = None,
+               read_bytes: int = DEFAULT_READ_BYTES,
+               decode_lines_per_batch: int = DEFAULT_DECODE_LINES) -> Iterator[Dict]:
+    """
+    Decode JSONL records, batching lines per decoder call.
+
+    Args:
+        path: ``_data.jsonl`` (optionally ``.gz``/``.bz2``/``.xz``)
+        events: Only yield records whose 'event' is one of these
+        types: Only yield records whose 'type' is one of these
+        read_bytes: Block size for reads
+        decode_lines_per_batch: Lines decoded together (see ``decode_lines``)
+
+    Yields:
+        Record dictionaries, in file order
+    """
+    # Lines that cannot match are rejected on their raw bytes before parsing
+    wanted = [(key, set(values), [json.dumps(v).encode() for v in values])
+              for key, values in (('event', events), ('type', types)) if values is not None]
+    batch: List[bytes] = []
+    for line in iter_jsonl_lines(path, read_bytes):
+        if not line.strip():
+            continue
+        if any(not any(needle in line for needle in needles) for _, _, needles in wanted):
+            continue
+        batch.append(line)
+        if len(batch) >= decode_lines_per_batch:
+            for record in decode_lines(batch):
+                if all(record.get(key) in values for key, values, _ in wanted):
+                    yield record
+            batch = []
+    for record in decode_lines(batch):
+        if all(record.get(key) in values for key, values, _ in wanted):
+            yield record
+
+
+def iter_column_batches(records: Iterable[Dict], batch_rows: int = DEFAULT_CHUNK_ROWS,
+                        categories: Optional[Dict[str, List[str]]] = None) -> Iterator['SessionColumns']:
+    """
+    Compile records into fixed-size column batches as they arrive.
+
+    Category codes stay consistent across batches (new values are appended).
+
+    Yields:
+        SessionColumns of up to ``batch_rows`` rows
+    """
+    builder = _ColumnBuilder(categories)
+    for record in records:
+        builder.add(record)
+        if len(builder) >= batch_rows:
+            yield builder.finish([builder.flush()])
+    if len(builder):
+        yield builder.finish([builder.flush()])
+
+
+def frame_index_from_path(path) -> int:
+    """Parse ``frames/frame_000123.npy`` into 123 (-1 if unparseable)."""
+    if not isinstance(path, str):
+        return -1
+    stem = path.rsplit('/', 1)[-1].split('.', 1)[0]
+    digits = stem.rsplit('_', 1)[-1]
+    return int(digits) if digits.isdigit() else -1
+
+
+@lru_cache(maxsize=4096)
+def _epoch_seconds(text: str) -> Optional[int]:
+    try:
+        return int(datetime.strptime(text, '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc).timestamp())
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _iso_seconds(seconds: int) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))
+
+
+def parse_iso_timestamp(value) -> float:
+    """Epoch ms of a ``YYYY-MM-DDTHH:MM:SS.mmmZ`` string (NaN for anything else)."""
+    if not (isinstance(value, str) and len(value) == 24 and value[19] == '.' and value[23] == 'Z'
+            and value[20:23].isdigit()):
+        return np.nan
+    seconds = _epoch_seconds(value[:19])
+    return np.nan if seconds is None else seconds * 1000.0 + int(value[20:23])
+
+
+def format_iso_timestamp(ms: float) -> str:
+    """Inverse of ``parse_iso_timestamp`` (the format ``Date.toISOString`` writes)."""
+    seconds, millis = divmod(int(ms), 1000)
+    return f"{_iso_seconds(seconds)}.{millis:03d}Z"
+
+
+# Every field a record is split into: column leaves in schema order, then ragged lists
+_SOURCE_FIELDS: Tuple[str, ...] = (
+    tuple(leaf for _, _, leaves in COLUMN_SCHEMA for leaf in leaves)
+    + tuple(name for name, _, _ in RAGGED_SCHEMA)
+)
+
+
+# JSON types a column of each kind reproduces exactly; other values (0/1 for
+# a flag, a string in a number field, NaN) are also kept in the row's extras.
+# timestamp_ms, 'timestamp' and the frame path are checked by the builder.
+_EXACT_TYPES = {
+    'f8': frozenset((float, int)),
+    'i2': frozenset((int,)),
+    'bool': frozenset((bool,)),
+}
+_BUILDER_CHECKED = ('timestamp_ms', 'timestamp', 'visual_frame_path')
+_NUMBER_TYPES = _EXACT_TYPES['f8']
+
+
+def _source_tree(fields: List[Tuple[Tuple[str, ...], int, object]], prefix: str = '') -> Tuple:
+    # One node per nested object the columns hold: (known keys, (key, slot, exact
+    # types) of its leaves, (key, child node), (key, item keys) of ragged lists,
+    # categorical keys)
+    children: Dict[str, List] = {}
+    leaves, ragged, categories = [], [], []
+    for path, slot, kind in fields:
+        if len(path) > 1:
+            children.setdefault(path[0], []).append((path[1:], slot, kind))
+            continue
+        exact = None if prefix + path[0] in _BUILDER_CHECKED else _EXACT_TYPES.get(kind)
+        leaves.append((path[0], slot, exact))
+        if isinstance(kind, frozenset):
+            ragged.append((path[0], kind))
+        elif kind == 'category':
+            categories.append(path[0])
+    keys = frozenset(path[0] for path, _, _ in fields)
+    nodes = tuple((key, _source_tree(rest, f"{prefix}{key}.")) for key, rest in children.items())
+    return keys, tuple(leaves), nodes, tuple(ragged), tuple(categories)
+
+
+_SOURCE_TREE = _source_tree(
+    [(tuple(path.split('.')), slot, kind) for slot, (path, kind) in enumerate(
+        [(leaf, kind) for _, kind, leaves in COLUMN_SCHEMA for leaf in leaves]
+        + [(name, frozenset(leaves)) for name, _, leaves in RAGGED_SCHEMA])]
+)
+
+
+def _split_record(record: Dict, values: List, node: Tuple = _SOURCE_TREE) -> Dict:
+    """
+    Fill ``values`` (one slot per _SOURCE_FIELDS entry, None if absent) from
+    a record and return the parts the columns cannot hold, as a nested dict.
+    """
+    keys, leaves, nodes, ragged, categories = node
+    extra = {}
+    if not record.keys() <= keys:
+        extra = {key: record[key] for key in record.keys() - keys}
+    for key, slot, exact in leaves:
+        value = values[slot] = record.get(key)
+        if value is None:
+            if key in record:
+                extra[key] = None
+        elif exact is not None and (type(value) not in exact or value != value):
+            extra[key] = value
+            if not isinstance(value, (int, float)):
+                values[slot] = None
+    for key, child in nodes:
+        value = record.get(key)
+        if value is None:
+            if key in record:
+                extra[key] = None
+        elif not isinstance(value, dict) or not value:
+            extra[key] = value
+        else:
+            nested = _split_record(value, values, child)
+            if nested:
+                extra[key] = nested
+    for key, item_keys in ragged:
+        value = record.get(key)
+        if value is None:
+            continue
+        clean = isinstance(value, list)
+        for item in value if clean else ():
+            if not (isinstance(item, dict) and item.keys() <= item_keys) or not all(
+                    type(v) in _NUMBER_TYPES and v == v for v in item.values()):
+                clean = False
+                break
+        if not clean:
+            extra[key] = value
+    for key in categories:
+        value = record.get(key)
+        if value is not None and not isinstance(value, str):
+            extra[key] = value
+    return extra
+
+
+def _lookup(record, keys: Tuple[str, ...]):
+    for key in keys:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+        if record is None:
+            return None
+    return record
+
+
+class SessionColumns:
+    """
+    Struct-of-arrays view over one session's telemetry.
+
+    Attributes:
+        arrays: Mapping of group name to NumPy array (N,) or (N, k)
+        categories: Mapping of categorical group name to its value list
+        cache_dir: Directory derived artifacts are stored in, or None
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], categories: Dict[str, List[str]],
+                 cache_dir=None, loader: Optional[Callable[[], Dict[str, np.ndarray]]] = None):
+        """
+        Args:
+            arrays: Group name to array
+            categories: Categorical group name to value list
+            cache_dir: Column cache directory (enables ``save_derived``)
+            loader: Picklable callable that reopens ``arrays``; when set,
+                arrays are not pickled but reopened in the receiving process
+        """
+        self.arrays = arrays
+        self.categories = categories
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.loader = loader
+        self._leaf_index = {}
+        for name, _, leaves in COLUMN_SCHEMA:
+            for col, leaf in enumerate(leaves):
+                self._leaf_index[leaf] = (name, col if len(leaves) > 1 else None)
+        # visual_frame_path is stored as its parsed frame index
+        self._leaf_index['visual_frame_index'] = ('visual_frame_index', None)
+
+    def __len__(self) -> int:
+        return len(self.arrays['timestamp_ms'])
+
+    @property
+    def group_names(self) -> List[str]:
+        """Per-row column groups (the ragged parts are not per-row)."""
+        return [name for name, _, _ in COLUMN_SCHEMA if name in self.arrays]
+
+    def ragged(self, name: str) -> Ragged:
+        """Ragged list field (e.g. 'sensors.victims') as offsets plus flat values."""
+        for ragged_name, _, leaves in RAGGED_SCHEMA:
+            if ragged_name == name:
+                return Ragged(self.arrays[f"{name}.offsets"],
+                              {leaf: self.arrays[f"{name}.{leaf}"] for leaf in leaves})
+        raise KeyError(f"Unknown ragged field: {name}")
+
+    def __getstate__(self):
+        # Memory-mapped columns are reopened rather than pickled, so worker
+        # processes don't receive copies of every column.
+        state = self.__dict__.copy()
+        if self.loader is not None:
+            state['arrays'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.arrays is None:
+            self.arrays = self.loader()
+
+    def row_dict(self, idx: int) -> Dict:
+        """
+        Rebuild the nested sample dictionary of one row from the columns.
+
+        The result equals the decoded JSONL record: fields the row lacked are
+        absent and fields outside the schema come from the row's extras.
+        ``reacture_records.SampleRecord`` gives the same values without
+        building the dictionary.
+        """
+        from reacture_records import SampleRecord
+
+        return SampleRecord(self, range(len(self))[idx]).to_dict()
+
+    def extras(self, idx: int) -> Optional[Dict]:
+        """Source fields of one row the columns cannot hold (None if there are none)."""
+        idx = range(len(self))[idx]
+        offsets = self.arrays[f"{EXTRAS_GROUP}.offsets"]
+        start, stop = int(offsets[idx]), int(offsets[idx + 1])
+        if start == stop:
+            return None
+        return json.loads(bytes(self.arrays[f"{EXTRAS_GROUP}.data"][start:stop]))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays or name in self._leaf_index
+
+    def group(self, name: str) -> np.ndarray:
+        """Return the array for a column group, e.g. ``robot.position``."""
+        try:
+            return self.arrays[name]
+        except KeyError:
+            raise KeyError(f"Unknown column group: {name}") from None
+
+    def field(self, path: str) -> np.ndarray:
+        """
+        Return a single leaf field as a 1-D view.
+
+        Args:
+            path: Dotted field path, e.g. ``robot.position.x`` or ``key_presses.W``
+
+        Returns:
+            NumPy array of shape (N,), a view into the group array
+        """
+        if path in self.arrays and self.arrays[path].ndim == 1:
+            return self.arrays[path]
+        try:
+            name, col = self._leaf_index[path]
+        except KeyError:
+            raise KeyError(f"Unknown column field: {path}") from None
+        array = self.arrays[name]
+        return array if col is None else array[:, col]
+
+    def load_derived(self, name: str, params: Dict) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Load an array bundle previously stored with ``save_derived``.
+
+        Derived artifacts (frame alignment, indexes, statistics) live in the
+        column cache directory, so they are discarded together with the
+        columns whenever the source JSONL changes.
+
+        Args:
+            name: Artifact name (file stem inside the cache directory)
+            params: JSON-serialisable parameters the artifact was built with;
+                a bundle built with different parameters is ignored
+
+        Returns:
+            Dictionary of arrays, or None if missing, stale or uncached
+        """
+        if self.cache_dir is None:
+            return None
+        path = self.cache_dir / f"{name}.npz"
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as bundle:
+            if str(bundle['__params__']) != json.dumps(params, sort_keys=True):
+                return None
+            return {key: bundle[key] for key in bundle.files if key != '__params__'}
+
+    def save_derived(self, name: str, params: Dict, arrays: Dict[str, np.ndarray]) -> bool:
+        """
+        Store a derived array bundle beside the columns (no-op when uncached).
+
+        Returns:
+            True if the bundle was written
+        """
+        if self.cache_dir is None:
+            return False
+        path = self.cache_dir / f"{name}.npz"
+        tmp_path = path.with_name(f"{name}.tmp{os.getpid()}.npz")
+        try:
+            np.savez(tmp_path, __params__=np.array(json.dumps(params, sort_keys=True)), **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            warnings.warn(f"Could not write {path}: {e}")
+            return False
+        return True
+
+    def code_of(self, name: str, value: str) -> int:
+        """Integer code for a categorical value (-1 if never seen)."""
+        try:
+            return self.categories[name].index(value)
+        except ValueError:
+            return MISSING_CODE
+
+    def decode(self, name: str, codes: np.ndarray) -> np.ndarray:
+        """Map categorical codes back to an object array of strings (None for missing)."""
+        lookup = np.array(list(self.categories[name]) + [None], dtype=object)
+        codes = np.asarray(codes)
+        return lookup[np.where(codes < 0, len(lookup) - 1, codes)]
+
+
+class _ColumnBuilder:
+    """Accumulates parsed JSONL records and flushes them as column chunks."""
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None):
+        if categories is None:
+            categories = {name: list(values) for name, values in KNOWN_CATEGORIES.items()}
+        self.categories = categories
+        self._category_codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in categories.items()
+        }
+        bits = {field: presence_bit(field) for field in PRESENCE_FIELDS}
+        slots = {field: slot for slot, field in enumerate(_SOURCE_FIELDS)}
+        self._getters = [
+            (name, kind, [slots[leaf] for leaf in leaves], [bits.get(leaf, 0) for leaf in leaves])
+            for name, kind, leaves in COLUMN_SCHEMA
+        ]
+        self._rows = {name: [] for name, _, _ in COLUMN_SCHEMA}
+        self._ragged = {
+            name: ([], {leaf: [] for leaf in leaves}, slots[name], tuple(name.split('.')), bits[name])
+            for name, _, leaves in RAGGED_SCHEMA
+        }
+        self._present: List[int] = []
+        self._extras: List[bytes] = []
+        self._chunks: List[Dict[str, np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows['timestamp_ms'])
+
+    def _encode(self, name: str, value) -> int:
+        if not isinstance(value, str):
+            return MISSING_CODE
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = len(codes)
+            codes[value] = code
+            self.categories[name].append(value)
+        return code
+
+    def add(self, record: Dict):
+        """Append one decoded JSONL record."""
+        rows = self._rows
+        values = [None] * len(_SOURCE_FIELDS)
+        extra = _split_record(record, values)
+        present = 0
+
+        (_, _, (ms_slot,), (ms_bit,)), (_, _, (elapsed_slot,), (elapsed_bit,)) = self._getters[:2]
+        timestamp = record.get('timestamp')
+        timestamp_ms = values[ms_slot]
+        if timestamp_ms is None:
+            # player_action rows carry their offset in 'timestamp' (ms)
+            timestamp_ms = timestamp if isinstance(timestamp, (int, float)) else np.nan
+        else:
+            present |= ms_bit
+            # Records read integral values back as int, any other number as float
+            if type(timestamp_ms) is not int and not (type(timestamp_ms) is float
+                                                       and not timestamp_ms.is_integer()
+                                                       and timestamp_ms == timestamp_ms):
+                extra['timestamp_ms'] = timestamp_ms
+                if not isinstance(timestamp_ms, (int, float)):
+                    timestamp_ms = np.nan
+        elapsed = values[elapsed_slot]
+        if elapsed is None:
+            elapsed = timestamp_ms / 1000.0
+        else:
+            present |= elapsed_bit
+        rows['timestamp_ms'].append(timestamp_ms)
+        rows['time_elapsed_s'].append(elapsed)
+
+        for name, kind, slots, bits in self._getters[2:]:
+            if kind == 'category':
+                rows[name].append(self._encode(name, values[slots[0]]))
+            elif name == 'timestamp_utc_ms':
+                utc_ms = parse_iso_timestamp(timestamp)
+                if timestamp is not None and (utc_ms != utc_ms or format_iso_timestamp(utc_ms) != timestamp):
+                    extra['timestamp'] = timestamp
+                    utc_ms = np.nan
+                rows[name].append(utc_ms)
+            elif name == 'visual_frame_index':
+                path = values[slots[0]]
+                index = frame_index_from_path(path)
+                if path is not None and (index < 0 or f"frames/frame_{index:06d}.npy" != path):
+                    extra['visual_frame_path'] = path
+                rows[name].append(index)
+            elif len(slots) == 1:
+                value = values[slots[0]]
+                if value is None:
+                    value = _MISSING_VALUES[kind]
+                else:
+                    present |= bits[0]
+                rows[name].append(value)
+            else:
+                missing = _MISSING_VALUES[kind]
+                group = []
+                for slot, bit in zip(slots, bits):
+                    value = values[slot]
+                    if value is None:
+                        value = missing
+                    else:
+                        present |= bit
+                    group.append(value)
+                rows[name].append(group)
+
+        for lengths, columns, slot, keys, bit in self._ragged.values():
+            items = values[slot]
+            if isinstance(items, list):
+                if _lookup(extra, keys) is None:
+                    present |= bit
+                items = [item for item in items if isinstance(item, dict)]
+            else:
+                items = []
+            lengths.append(len(items))
+            for leaf, column in columns.items():
+                column.extend(np.nan if item.get(leaf) is None else item[leaf] for item in items)
+
+        self._present.append(present)
+        self._extras.append(json.dumps(extra, separators=(',', ':')).encode() if extra else b'')
+
+    def flush(self) -> Optional[Dict[str, np.ndarray]]:
+        """Convert buffered rows into a chunk of arrays and reset the buffer."""
+        if not len(self):
+            return None
+        chunk = {}
+        for name, kind, leaves in COLUMN_SCHEMA:
+            values = self._rows[name]
+            if kind == 'bool':
+                # JSON may carry null/0/1 for flags; normalise through bool()
+                array = np.array(values, dtype=object).astype(np.bool_)
+            else:
+                array = np.array(values, dtype=_STORAGE_DTYPES[kind])
+            if len(leaves) > 1:
+                array = array.reshape(len(values), len(leaves))
+            chunk[name] = array
+            self._rows[name] = []
+        for name, kind, leaves in RAGGED_SCHEMA:
+            lengths, values, _, _, _ = self._ragged[name]
+            # Row lengths here; finish() turns them into offsets
+            chunk[f"{name}.lengths"] = np.array(lengths, dtype=np.int64)
+            for leaf in leaves:
+                chunk[f"{name}.{leaf}"] = np.array(values[leaf], dtype=_STORAGE_DTYPES[kind])
+                values[leaf] = []
+            lengths.clear()
+        chunk[PRESENT_GROUP] = np.array(self._present, dtype=PRESENT_DTYPE)
+        chunk[f"{EXTRAS_GROUP}.lengths"] = np.array([len(item) for item in self._extras], dtype=np.int64)
+        chunk[f"{EXTRAS_GROUP}.data"] = np.frombuffer(b''.join(self._extras), dtype=np.uint8)
+        self._present, self._extras = [], []
+        return chunk
+
+    def finish(self, chunks: Iterable[Dict[str, np.ndarray]]) -> SessionColumns:
+        """Concatenate flushed chunks into a SessionColumns."""
+        chunks = [chunk for chunk in chunks if chunk]
+        arrays = {}
+        for name, kind, leaves in COLUMN_SCHEMA:
+            if chunks:
+                arrays[name] = np.concatenate([chunk[name] for chunk in chunks])
+            else:
+                shape = (0,) if len(leaves) == 1 else (0, len(leaves))
+                arrays[name] = np.empty(shape, dtype=_STORAGE_DTYPES[kind])
+        for name, kind, leaves in RAGGED_SCHEMA:
+            lengths = np.concatenate([np.zeros(0, np.int64)] + [c[f"{name}.lengths"] for c in chunks])
+            arrays[f"{name}.offsets"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            for leaf in leaves:
+                parts = [c[f"{name}.{leaf}"] for c in chunks]
+                arrays[f"{name}.{leaf}"] = (np.concatenate(parts) if parts
+                                            else np.empty(0, dtype=_STORAGE_DTYPES[kind]))
+        arrays[PRESENT_GROUP] = np.concatenate(
+            [np.zeros(0, PRESENT_DTYPE)] + [c[PRESENT_GROUP] for c in chunks])
+        lengths = np.concatenate([np.zeros(0, np.int64)] + [c[f"{EXTRAS_GROUP}.lengths"] for c in chunks])
+        arrays[f"{EXTRAS_GROUP}.offsets"] = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        arrays[f"{EXTRAS_GROUP}.data"] = np.concatenate(
+            [np.zeros(0, np.uint8)] + [c[f"{EXTRAS_GROUP}.data"] for c in chunks])
+        return SessionColumns(arrays, self.categories)
+
+
+def compile_jsonl(jsonl_path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> SessionColumns:
+    """
+    Parse a session JSONL file into columns.
+
+    Args:
+        jsonl_path: Path to ``<session>_data.jsonl`` (optionally compressed)
+        chunk_rows: Rows buffered as Python objects before converting to NumPy
+
+    Returns:
+        SessionColumns with in-memory arrays
+    """
+    builder = _ColumnBuilder()
+    chunks = []
+    for record in iter_jsonl(jsonl_path):
+        builder.add(record)
+        if len(builder) >= chunk_rows:
+            chunks.append(builder.flush())
+    chunks.append(builder.flush())
+    return builder.finish(chunks)
+
+
+def missing_arrays(num_rows: int) -> Dict[str, np.ndarray]:
+    """
+    Every array of a session with ``num_rows`` rows, filled with missing values.
+
+    Importers fill in the fields their source has (NaN / False / -1 stand
+    for the rest, as after compiling a JSONL that lacks them) and set the
+    PRESENT_GROUP bits of the PRESENCE_FIELDS they fill; ragged fields and
+    extras start out with empty rows.
+    """
+    arrays = {}
+    for name, kind, leaves in COLUMN_SCHEMA:
+        shape = (num_rows,) if len(leaves) == 1 else (num_rows, len(leaves))
+        arrays[name] = np.full(shape, _MISSING_VALUES[kind], dtype=_STORAGE_DTYPES[kind])
+    for name, kind, leaves in RAGGED_SCHEMA:
+        arrays[f"{name}.offsets"] = np.zeros(num_rows + 1, dtype=np.int64)
+        for leaf in leaves:
+            arrays[f"{name}.{leaf}"] = np.empty(0, dtype=_STORAGE_DTYPES[kind])
+    arrays[PRESENT_GROUP] = np.zeros(num_rows, dtype=PRESENT_DTYPE)
+    arrays[f"{EXTRAS_GROUP}.offsets"] = np.zeros(num_rows + 1, dtype=np.int64)
+    arrays[f"{EXTRAS_GROUP}.data"] = np.empty(0, dtype=np.uint8)
+    return arrays
+
+
+def source_fingerprint(path: Path) -> Dict:
+    """Name, size and mtime used to detect that a source file has changed."""
+    path = Path(path)
+    stat = path.stat()
+    return {'name': path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def save_columns(columns: SessionColumns, cache_dir, source_path) -> Path:
+    """
+    Write columns to ``cache_dir`` with a manifest fingerprinting the source.
+
+    The manifest is written last, so a partially written cache is never
+    considered valid. ``source_path`` None marks columns with no JSONL
+    behind them (imported sessions); such a cache is never stale.
+    """
+    cache_dir = Path(cache_dir)
+    tmp_dir = cache_dir.with_name(cache_dir.name + f".tmp{os.getpid()}")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    groups = {}
+    for name, array in columns.arrays.items():
+        np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        groups[name] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+    manifest = {
+        'format_version': CACHE_FORMAT_VERSION,
+        'source': source_fingerprint(Path(source_path)) if source_path is not None else None,
+        'num_rows': len(columns),
+        'groups': groups,
+        'categories': columns.categories,
+    }
+    with open(tmp_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if cache_dir.exists():
+        shutil.rmtree(cache_dir)
+    os.replace(tmp_dir, cache_dir)
+    return cache_dir
+
+
+def load_columns(cache_dir, source_path=None, mmap_mode: Optional[str] = 'r') -> Optional[SessionColumns]:
+    """
+    Open a column cache.
+
+    Args:
+        cache_dir: Directory written by ``save_columns``
+        source_path: If given, the cache is rejected when the source's
+            size or mtime no longer matches the manifest
+        mmap_mode: Passed to ``np.load`` ('r' maps columns read-only)
+
+    Returns:
+        SessionColumns, or None if the cache is missing or stale
+    """
+    cache_dir = Path(cache_dir)
+    manifest_path = cache_dir / 'manifest.json'
+    if not manifest_path.exists():
+        return None
+
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        return None
+    if source_path is not None:
+        source_path = Path(source_path)
+        if not source_path.exists() or manifest['source'] != source_fingerprint(source_path):
+            return None
+    if set(manifest['groups']) != set(array_names()):
+        return None
+
+    loader = partial(_load_cached_arrays, cache_dir, tuple(manifest['groups']), mmap_mode)
+    loader = loader if mmap_mode is not None else None
+    return SessionColumns(_load_cached_arrays(cache_dir, manifest['groups'], mmap_mode),
+                          manifest['categories'], cache_dir=cache_dir, loader=loader)
+
+
+def _load_cached_arrays(cache_dir: Path, names: Iterable[str],
+                        mmap_mode: Optional[str]) -> Dict[str, np.ndarray]:
+    return {
+        name: np.load(Path(cache_dir) / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+        for name in names
+    }
+
+
+def load_or_compile_columns(jsonl_path, cache: bool = True,
+                            mmap_mode: Optional[str] = 'r') -> Tuple[SessionColumns, bool]:
+    """
+    Load a session's column cache, compiling (and saving) it if stale.
+
+    Args:
+        jsonl_path: Path to ``<session>_data.jsonl``
+        cache: Read and write the on-disk cache; False compiles in memory
+        mmap_mode: Memory-map mode for cached columns
+
+    Returns:
+        Tuple of (SessionColumns, cache_hit)
+    """
+    jsonl_path = Path(jsonl_path)
+    cache_dir = columns_dir_for(jsonl_path)
+
+    if cache:
+        columns = load_columns(cache_dir, jsonl_path, mmap_mode=mmap_mode)
+        if columns is not None:
+            return columns, True
+
+    columns = compile_jsonl(jsonl_path)
+    if cache:
+        try:
+            save_columns(columns, cache_dir, jsonl_path)
+        except OSError as e:
+            # Read-only dataset directories still load, just without a cache
+            warnings.warn(f"Could not write column cache {cache_dir}: {e}")
+        else:
+            columns = load_columns(cache_dir, mmap_mode=mmap_mode) or columns
+    return columns, False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from reacture_instrument import log_to_stdout
+
+    p = argparse.ArgumentParser(description="Compile session JSONL files into column caches.")
+    p.add_argument("jsonl_paths", nargs="+", help="Paths to <session>_data.jsonl files")
+    p.add_argument("--force", action="store_true", help="Recompile even if the cache is fresh")
+    args = p.parse_args()
+    log_to_stdout()
+
+    for path in args.jsonl_paths:
+        columns, hit = load_or_compile_columns(path, cache=not args.force)
+        if args.force:
+            save_columns(columns, columns_dir_for(path), path)
+        status = "up to date" if hit else "compiled"
+        print(f"{path}: {len(columns)} rows ({status}) -> {columns_dir_for(path)}")
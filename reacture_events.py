@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+ReActure Event Index & Stratified Sampling
+==========================================
+
+``EventIndex`` is an inverted index from categorical values to sample
+indices, one posting list per value of each facet:
+
+- ``event``: ``rescue``, ``destroy_rubble``, ``collision_damage``, ...
+- ``type``: ``robot_state`` / ``player_action``
+- ``zone``: ``safe`` / ``yellow`` / ``red``
+- ``keys``: the combination of keys held, e.g. ``W+A`` or ``none``
+
+Posting lists are stored CSR-style per facet (``rows`` grouped by value,
+ascending within a value, plus ``offsets``), built with one stable sort of
+the category codes. A session's index is kept with its column cache
+(``SessionColumns.save_derived``); indexes of several sessions merge into
+one over global sample indices. Rows appended to a followed session are
+indexed on their own and added as a run; runs of similar size are merged,
+so appending costs amortised O(new rows) and queries read a few runs.
+
+``StratifiedSampler`` draws batches from chosen strata (posting lists)
+with given weights, balanced by default. A draw picks a stratum, then a
+uniform row inside it, so a batch costs O(batch) regardless of how rare
+the strata are. With ``context`` each draw becomes a window of rows
+around the sampled event, clipped to its session.
+
+Usage:
+    index = dataset.event_index()
+    rescues = index.rows('event', 'rescue')
+    index.counts('keys')                       # {'none': 4210, 'W': 1893, 'W+A': 212, ...}
+
+    sampler = dataset.stratified_sampler(['event:rescue', 'event:collision_damage',
+                                          'event:periodic_update_10hz'], batch_size=64)
+    dataloader = dataset.to_pytorch_dataloader(batch_sampler=sampler)
+    for rows in sampler.batches(10):            # plain index arrays
+        batch = dataset.get_batch(rows)
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+EVENT_INDEX_VERSION = 1
+
+# Facet -> categorical column group it is built from ('keys' uses key_presses)
+FACETS = {
+    'event': 'event',
+    'type': 'type',
+    'zone': 'zone',
+    'keys': 'key_presses',
+}
+
+KEY_NAMES = ('W', 'A', 'S', 'D', 'inspect', 'destroy', 'Space', 'E', 'R')
+NO_KEYS = 'none'
+
+# A stratum: 'facet:value' or (facet, value)
+Stratum = Union[str, Tuple[str, str]]
+
+
+def _key_labels(masks: np.ndarray) -> List[str]:
+    labels = []
+    for mask in masks.tolist():
+        held = [name for bit, name in enumerate(KEY_NAMES) if mask >> bit & 1]
+        labels.append('+'.join(held) if held else NO_KEYS)
+    return labels
+
+
+def _facet_codes(columns, facet: str, start: int, stop: int) -> Tuple[np.ndarray, List[str]]:
+    """Per-row value codes (-1: no value) and the label of each code."""
+    if facet == 'keys':
+        keys = np.asarray(columns.group('key_presses')[start:stop], dtype=np.int64)
+        masks = keys @ (1 << np.arange(keys.shape[1], dtype=np.int64))
+        values, codes = np.unique(masks, return_inverse=True)
+        return codes.reshape(-1), _key_labels(values)
+    group = FACETS[facet]
+    return (np.asarray(columns.group(group)[start:stop], dtype=np.int64),
+            list(columns.categories[group]))
+
+
+def _parse_stratum(stratum: Stratum) -> Tuple[str, str]:
+    if isinstance(stratum, str):
+        facet, sep, value = stratum.partition(':')
+        if not sep:
+            raise ValueError(f"Stratum must be 'facet:value', got {stratum!r}")
+        return facet, value
+    facet, value = stratum
+    return facet, value
+
+
+class EventIndex:
+    """
+    Posting lists of sample indices per facet value.
+
+    Rows without a value for a facet (e.g. ``event`` on a player action)
+    are not listed under that facet.
+
+    Attributes:
+        num_rows: Samples covered (rows are in ``[0, num_rows)``)
+        facets: Facet -> (labels, offsets, rows); the rows of
+            ``labels[i]`` are ``rows[offsets[i]:offsets[i + 1]]`` (reading
+            it merges appended runs)
+    """
+
+    def __init__(self, facets: Dict[str, Tuple[List[str], np.ndarray, np.ndarray]], num_rows: int):
+        self.num_rows = num_rows
+        # Posting lists of consecutive row ranges, oldest first, and their row counts
+        self._runs = [facets]
+        self._run_rows = [num_rows]
+
+    @property
+    def facets(self) -> Dict[str, Tuple[List[str], np.ndarray, np.ndarray]]:
+        if len(self._runs) > 1:
+            self._runs = [_merge_facets(self._runs)]
+            self._run_rows = [self.num_rows]
+        return self._runs[0]
+
+    def append(self, part: 'EventIndex'):
+        """
+        Add the index of the rows after ``num_rows`` (``build(columns, num_rows, stop)``).
+
+        The part becomes a run of its own; while the previous run is at
+        most twice its size the two are merged.
+        """
+        self._runs.append(part.facets)
+        self._run_rows.append(part.num_rows - self.num_rows)
+        self.num_rows = part.num_rows
+        while len(self._runs) > 1 and self._run_rows[-2] <= 2 * self._run_rows[-1]:
+            self._runs[-2:] = [_merge_facets(self._runs[-2:])]
+            self._run_rows[-2:] = [self._run_rows[-2] + self._run_rows[-1]]
+
+    @classmethod
+    def build(cls, columns, start: int = 0, stop: Optional[int] = None) -> 'EventIndex':
+        """
+        Index rows ``start:stop`` of a session's columns.
+
+        Returned row indices are positions in the whole column (offset by
+        ``start``), so indexes of consecutive row ranges can be combined.
+        """
+        stop = len(columns) if stop is None else stop
+        facets = {}
+        for facet in FACETS:
+            codes, labels = _facet_codes(columns, facet, start, stop)
+            order = np.argsort(codes, kind='stable')
+            sorted_codes = codes[order]
+            # Missing values (-1) sort first and are dropped
+            first = np.searchsorted(sorted_codes, 0)
+            offsets = np.searchsorted(sorted_codes, np.arange(len(labels) + 1), side='left')
+            rows = (order[first:] + start).astype(np.int64)
+            facets[facet] = (labels, (offsets - first).astype(np.int64), rows)
+        return cls(facets, stop)
+
+    @classmethod
+    def combine(cls, parts: Sequence['EventIndex'],
+                offsets: Optional[Sequence[int]] = None) -> 'EventIndex':
+        """
+        Merge indexes, unifying values by label.
+
+        Args:
+            parts: Indexes to merge, in row order
+            offsets: Row offset added to each part (e.g. a corpus's
+                cumulative sample counts); None if rows are already global
+
+        Returns:
+            EventIndex whose posting lists are ascending
+        """
+        offsets = [0] * len(parts) if offsets is None else [int(o) for o in offsets]
+        num_rows = max((offset + part.num_rows for part, offset in zip(parts, offsets)), default=0)
+        return cls(_merge_facets([part.facets for part in parts], offsets), num_rows)
+
+    def values(self, facet: str) -> List[str]:
+        """Values of ``facet`` present in the index."""
+        return list(dict.fromkeys(label for labels, _, _ in self._facet(facet) for label in labels))
+
+    def _facet(self, facet: str) -> List[Tuple[List[str], np.ndarray, np.ndarray]]:
+        """``facet``'s posting lists in each run."""
+        if facet not in FACETS:
+            raise KeyError(f"Unknown facet {facet!r}; expected one of {list(FACETS)}")
+        return [run[facet] for run in self._runs]
+
+    def rows(self, facet: str, value: str) -> np.ndarray:
+        """
+        Sample indices where ``facet`` equals ``value`` (ascending, empty if absent).
+
+        Returns:
+            int64 array (a view into the posting lists when there is one run)
+        """
+        parts = []
+        for labels, offsets, rows in self._facet(facet):
+            try:
+                i = labels.index(value)
+            except ValueError:
+                continue
+            parts.append(rows[offsets[i]:offsets[i + 1]])
+        if not parts:
+            return np.zeros(0, np.int64)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def counts(self, facet: str) -> Dict[str, int]:
+        """Number of samples per value of ``facet``."""
+        counts: Dict[str, int] = {}
+        for labels, offsets, _ in self._facet(facet):
+            for label, count in zip(labels, np.diff(offsets).tolist()):
+                counts[label] = counts.get(label, 0) + count
+        return counts
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Flat array bundle (for ``SessionColumns.save_derived``)."""
+        arrays = {}
+        for facet, (labels, offsets, rows) in self.facets.items():
+            arrays[f"{facet}.labels"] = np.array(labels, dtype=str)
+            arrays[f"{facet}.offsets"] = offsets
+            arrays[f"{facet}.rows"] = rows
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], num_rows: int) -> 'EventIndex':
+        facets = {facet: (arrays[f"{facet}.labels"].tolist(), arrays[f"{facet}.offsets"],
+                          arrays[f"{facet}.rows"])
+                  for facet in FACETS}
+        return cls(facets, num_rows)
+
+
+def _merge_facets(parts: Sequence[Dict], offsets: Optional[Sequence[int]] = None) -> Dict:
+    """Merge per-facet posting lists, unifying values by label (rows shifted by ``offsets``)."""
+    offsets = [0] * len(parts) if offsets is None else offsets
+    facets = {}
+    for facet in FACETS:
+        positions: Dict[str, int] = {}
+        codes, rows = [], []
+        for part, offset in zip(parts, offsets):
+            part_labels, part_offsets, part_rows = part[facet]
+            remap = np.array([positions.setdefault(label, len(positions)) for label in part_labels],
+                             dtype=np.int64)
+            codes.append(np.repeat(remap, np.diff(part_offsets)))
+            rows.append(part_rows + offset)
+        labels = list(positions)
+        codes = np.concatenate(codes) if codes else np.zeros(0, np.int64)
+        rows = np.concatenate(rows) if rows else np.zeros(0, np.int64)
+        order = np.lexsort((rows, codes))
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1), side='left')
+        facets[facet] = (labels, bounds.astype(np.int64), rows[order])
+    return facets
+
+
+def load_event_index(columns, use_cache: bool = True) -> EventIndex:
+    """
+    A session's event index, read from its column cache when present.
+
+    Args:
+        columns: SessionColumns of the session
+        use_cache: Read/write the ``event_index`` bundle in the column cache
+
+    Returns:
+        EventIndex
+    """
+    params = {'version': EVENT_INDEX_VERSION, 'num_rows': len(columns)}
+    if use_cache:
+        cached = columns.load_derived('event_index', params)
+        if cached is not None:
+            return EventIndex.from_arrays(cached, len(columns))
+    index = EventIndex.build(columns)
+    if use_cache:
+        columns.save_derived('event_index', params, index.to_arrays())
+    return index
+
+
+class StratifiedSampler:
+    """
+    Weighted draws from strata of an ``EventIndex``.
+
+    Iterating yields ``num_batches`` lists of sample indices, so the
+    sampler can be passed as a DataLoader ``batch_sampler`` (it behaves as
+    a PyTorch ``Sampler`` over batches); ``batches`` and ``sample`` return
+    NumPy arrays instead. Draws are with replacement, and each epoch uses a
+    fresh, seed-determined stream.
+
+    With ``context`` a batch_sampler can only hand out flat index lists, so
+    each DataLoader batch holds ``batch_size * window_size`` samples, window
+    by window; ``unflatten`` restores the (batch_size, window_size, ...)
+    shape of its arrays.
+
+    Attributes:
+        strata: (facet, value) of each stratum with at least one row
+        probabilities: Probability of drawing from each stratum
+        context: (before, after) window size around each draw, or None
+        window_size: Rows per draw (``before + 1 + after``, 1 without context)
+    """
+
+    def __init__(self, index: EventIndex, strata: Union[str, Sequence[Stratum]],
+                 weights: Union[None, str, Sequence[float], Dict[str, float]] = None,
+                 batch_size: int = 32, num_batches: Optional[int] = None,
+                 context: Union[None, int, Tuple[int, int]] = None,
+                 bounds: Optional[Sequence[int]] = None, seed: Optional[int] = None):
+        """
+        Args:
+            index: EventIndex to draw from
+            strata: A facet name (every value is a stratum) or a list of
+                'facet:value' strings / (facet, value) pairs
+            weights: None for balanced strata, 'proportional' for weights
+                equal to stratum sizes, or per-stratum weights (a sequence
+                aligned with ``strata`` or a dict keyed by 'facet:value')
+            batch_size: Draws per batch
+            num_batches: Batches per epoch (default: one pass worth of samples)
+            context: Rows before and after each draw (an int for both);
+                each draw then yields ``before + 1 + after`` rows
+            bounds: Session boundaries as cumulative row counts (S + 1,);
+                windows never cross them (default: one session)
+            seed: Seed for the draw streams
+        """
+        if isinstance(strata, str):
+            strata = [(strata, value) for value in index.values(strata)]
+        strata = [_parse_stratum(stratum) for stratum in strata]
+        postings = [index.rows(facet, value) for facet, value in strata]
+
+        if weights is None:
+            weights = np.ones(len(strata))
+        elif isinstance(weights, str):
+            if weights != 'proportional':
+                raise ValueError(f"weights must be None, 'proportional' or numbers, got {weights!r}")
+            weights = np.array([len(rows) for rows in postings], dtype=np.float64)
+        elif isinstance(weights, dict):
+            weights = np.array([weights.get(f"{facet}:{value}", 0.0) for facet, value in strata])
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) != len(strata):
+            raise ValueError(f"Got {len(weights)} weights for {len(strata)} strata")
+
+        keep = [i for i, rows in enumerate(postings) if len(rows) and weights[i] > 0]
+        if not keep:
+            raise ValueError("No stratum has samples (and a positive weight)")
+        self.strata = [strata[i] for i in keep]
+        self.probabilities = weights[keep] / weights[keep].sum()
+        self._cumulative = np.cumsum(self.probabilities)
+        self._cumulative[-1] = 1.0
+        self._sizes = np.array([len(postings[i]) for i in keep], dtype=np.int64)
+        self._starts = np.concatenate([[0], np.cumsum(self._sizes)[:-1]]).astype(np.int64)
+        self._rows = np.concatenate([postings[i] for i in keep])
+
+        if isinstance(context, int):
+            context = (context, context)
+        self.context = tuple(context) if context is not None else None
+        self.window_size = sum(self.context) + 1 if self.context is not None else 1
+        self.bounds = np.asarray(bounds if bounds is not None else [0, index.num_rows], dtype=np.int64)
+        self.batch_size = batch_size
+        self.num_batches = (num_batches if num_batches is not None
+                            else max(1, index.num_rows // batch_size))
+        self.seed = seed
+        self.epoch = 0
+        self._generator: Optional[np.random.Generator] = None
+
+    def __len__(self) -> int:
+        return self.num_batches
+
+    def set_epoch(self, epoch: int):
+        """Select the draw stream of ``epoch`` (otherwise each iteration advances it)."""
+        self.epoch = epoch
+        self._generator = None
+
+    def _rng(self, epoch: int) -> np.random.Generator:
+        return np.random.default_rng(None if self.seed is None else [self.seed, epoch])
+
+    def sample(self, size: Optional[int] = None,
+               rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        One batch of draws.
+
+        Without ``rng``, successive calls continue the current epoch's
+        stream (restarted by ``set_epoch`` and ``batches``).
+
+        Returns:
+            int64 array (size,) of sample indices, or (size, window_size)
+            with ``context``
+        """
+        size = self.batch_size if size is None else size
+        if rng is None:
+            if self._generator is None:
+                self._generator = self._rng(self.epoch)
+            rng = self._generator
+        stratum = np.searchsorted(self._cumulative, rng.random(size), side='right')
+        stratum = np.minimum(stratum, len(self._sizes) - 1)
+        pick = (rng.random(size) * self._sizes[stratum]).astype(np.int64)
+        rows = self._rows[self._starts[stratum] + pick]
+        if self.context is None:
+            return rows
+        return self.windows(rows)
+
+    def windows(self, rows) -> np.ndarray:
+        """
+        Context windows around ``rows``, clipped (edge-repeated) at session bounds.
+
+        Returns:
+            int64 array (len(rows), before + 1 + after)
+        """
+        before, after = self.context or (0, 0)
+        rows = np.asarray(rows, dtype=np.int64)
+        session = np.searchsorted(self.bounds, rows, side='right') - 1
+        lo, hi = self.bounds[session], self.bounds[session + 1] - 1
+        window = rows[:, None] + np.arange(-before, after + 1)
+        return np.clip(window, lo[:, None], hi[:, None])
+
+    def batches(self, num_batches: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yield ``num_batches`` (default: one epoch) index arrays from this epoch's stream."""
+        rng = self._rng(self.epoch)
+        self.epoch += 1
+        self._generator = None
+        for _ in range(self.num_batches if num_batches is None else num_batches):
+            yield self.sample(rng=rng)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        """Flat index lists (window by window with ``context``; see ``unflatten``)."""
+        for rows in self.batches():
+            yield rows.reshape(-1).tolist()
+
+    def unflatten(self, batch):
+        """
+        Reshape a collated flat batch to (batch_size, window_size, ...).
+
+        Args:
+            batch: Array or tensor with ``batch_size * window_size`` rows, a
+                list of that many items, or a dict of either (as the
+                DataLoader collates samples)
+
+        Returns:
+            Same structure split per draw (lists become lists of windows)
+        """
+        size = self.window_size
+        if isinstance(batch, dict):
+            return {key: self.unflatten(value) for key, value in batch.items()}
+        if isinstance(batch, (list, tuple)):
+            return [list(batch[i:i + size]) for i in range(0, len(batch), size)]
+        return batch.reshape((-1, size) + tuple(batch.shape[1:]))
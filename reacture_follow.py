@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+ReActure Live Sessions (Follow Mode)
+====================================
+
+Tail a session that is still being recorded. ``startDataCollection`` in
+``game.js`` appends a ``periodic_update_10hz`` row (and a frame) every
+100 ms; a ``SessionFollower`` reads only the bytes appended since its last
+poll and extends an ordinary ``ReActureDataset`` in place:
+
+- columns live in capacity-doubling buffers, so appending is amortised
+  O(new rows) and ``dataset.columns`` always sees views of the current rows
+- the cached time indexes, the robot_state selection, the event index and
+  the sample-to-frame alignment are extended rather than rebuilt
+- ``_frames.npy`` (and ``_timestamps.npy``) are remapped when they grow;
+  complete frames are counted from the file size, so the writer may append
+  frame data before rewriting the ``.npy`` header
+- running statistics (``DatasetStatistics``) absorb only the new rows and frames
+
+A trailing line without its newline is a record still being written: it is
+held back until the rest arrives. ``state()`` records the byte offset of
+the last complete line, so a consumer can persist it and resume there
+later; rows before the offset are then not loaded.
+
+Usage:
+    from load_reacture_dataset import ReActureDataset
+
+    follower = ReActureDataset.follow('reacture_1731177600000_metadata.json')
+    while not follower.finished:
+        rows = follower.wait_for_samples(min_new=10, timeout=5.0)
+        batch = follower.dataset.get_batch(rows)
+
+    # asyncio
+    rows = await follower.wait_for_samples_async(min_new=10)
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from reacture_align import DEFAULT_TOLERANCE_MS
+from reacture_columns import (COLUMN_SCHEMA, EXTRAS_GROUP, JSONL_OPENERS, PRESENT_DTYPE, PRESENT_GROUP,
+                              RAGGED_SCHEMA, SessionColumns, _ColumnBuilder, _STORAGE_DTYPES, decode_lines)
+from reacture_events import EventIndex
+from reacture_frames import MemmapFrameStore, open_session_frames
+from reacture_index import TimeIndex
+from reacture_instrument import info
+from reacture_stats import DatasetStatistics, accumulate_frames, accumulate_rows
+
+# Bytes read per poll before the new rows are compiled
+DEFAULT_FOLLOW_READ_BYTES = 16 << 20
+
+# Sleep between polls while waiting for new samples
+DEFAULT_POLL_INTERVAL_S = 0.1
+
+_INITIAL_CAPACITY = 1024
+
+
+class _GrowableArray:
+    """Capacity-doubling buffer; ``view`` is the filled part."""
+
+    def __init__(self, dtype, row_shape=(), capacity: int = _INITIAL_CAPACITY):
+        self._buffer = np.empty((capacity,) + tuple(row_shape), dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: np.ndarray):
+        values = np.asarray(values)
+        end = self.size + len(values)
+        if end > len(self._buffer):
+            capacity = max(end, 2 * len(self._buffer))
+            buffer = np.empty((capacity,) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+            buffer[:self.size] = self._buffer[:self.size]
+            self._buffer = buffer
+        self._buffer[self.size:end] = values
+        self.size = end
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._buffer[:self.size]
+
+
+class SessionFollower:
+    """
+    Incrementally loads a session whose JSONL (and frames) are still growing.
+
+    Attributes:
+        dataset: ReActureDataset extended in place by every ``poll``
+        jsonl_path: Path to the ``_data.jsonl`` being tailed
+        offset: Byte offset just past the last complete line consumed
+        base_row: Rows before ``offset`` that were skipped when resuming
+        statistics: Running DatasetStatistics, or None if disabled
+        finished: True once a 'game_end' row has been read
+    """
+
+    def __init__(self, metadata_path, offset: int = 0, categories: Optional[Dict[str, List[str]]] = None,
+                 base_row: int = 0, frame_tolerance_ms: Optional[float] = DEFAULT_TOLERANCE_MS,
+                 statistics: bool = True, include_frames: bool = True,
+                 read_bytes: int = DEFAULT_FOLLOW_READ_BYTES):
+        """
+        Args:
+            metadata_path: Path to ``<session>_metadata.json``; the file may
+                not exist yet (the game writes it when the session ends)
+            offset: Byte offset of a line start to resume from (see ``state``)
+            categories: Category lists saved with the offset, so codes stay
+                the same as before the restart
+            base_row: Rows before ``offset`` (reported back by ``state``)
+            frame_tolerance_ms: Maximum distance for timestamp frame matches
+            statistics: Maintain running statistics in ``statistics``
+            include_frames: Include new frames in the pixel histogram
+            read_bytes: Maximum bytes consumed per ``poll``
+        """
+        from load_reacture_dataset import ReActureDataset
+
+        self.metadata_path = Path(metadata_path)
+        base_path = self.metadata_path.parent
+        session_id = self.metadata_path.stem.replace('_metadata', '')
+        self.jsonl_path = base_path / f"{session_id}_data.jsonl"
+        if not self.jsonl_path.exists() and any(
+                self.jsonl_path.with_name(self.jsonl_path.name + suffix).exists() for suffix in JSONL_OPENERS):
+            raise ValueError(f"Compressed sessions are complete and cannot be followed: {self.jsonl_path}")
+        self.offset = int(offset)
+        self.base_row = int(base_row)
+        self.read_bytes = read_bytes
+        self.include_frames = include_frames
+        self.finished = False
+        self._tail = b''
+        self._metadata_loaded = False
+
+        self._builder = _ColumnBuilder(
+            {name: list(values) for name, values in categories.items()} if categories else None)
+        self._arrays = {
+            name: _GrowableArray(_STORAGE_DTYPES[kind], (len(leaves),) if len(leaves) > 1 else ())
+            for name, kind, leaves in COLUMN_SCHEMA
+        }
+        for name, kind, leaves in RAGGED_SCHEMA:
+            self._arrays[f"{name}.offsets"] = _GrowableArray(np.int64)
+            self._arrays[f"{name}.offsets"].extend(np.zeros(1, dtype=np.int64))
+            for leaf in leaves:
+                self._arrays[f"{name}.{leaf}"] = _GrowableArray(_STORAGE_DTYPES[kind])
+        self._arrays[PRESENT_GROUP] = _GrowableArray(PRESENT_DTYPE)
+        self._arrays[f"{EXTRAS_GROUP}.offsets"] = _GrowableArray(np.int64)
+        self._arrays[f"{EXTRAS_GROUP}.offsets"].extend(np.zeros(1, dtype=np.int64))
+        self._arrays[f"{EXTRAS_GROUP}.data"] = _GrowableArray(np.uint8)
+        self._frame_index = _GrowableArray(np.int32)
+        self._robot_state_rows = _GrowableArray(np.int64)
+        self._all_robot_state = True
+        self._aligned_from = 0           # rows from here on may still change frame
+        self._frames_counted = 0
+
+        columns = SessionColumns({name: array.view for name, array in self._arrays.items()},
+                                 self._builder.categories)
+        self.dataset = ReActureDataset._from_parts(
+            {'session_id': session_id, 'duration_s': 0.0, 'sampling_rate_hz': 10},
+            session_id, columns, None, base_path=base_path,
+            sample_frame_index=self._frame_index.view, frame_tolerance_ms=frame_tolerance_ms)
+        self.dataset._robot_state_rows = slice(None)
+
+        self.statistics = None
+        if statistics:
+            self.statistics = DatasetStatistics()
+            self.statistics.num_sessions = 1
+            self.statistics.sampling_rates = [10.0]
+        self._load_metadata()
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def state(self) -> Dict:
+        """JSON-serialisable resume point: ``SessionFollower(path, **state)``."""
+        return {
+            'offset': self.offset,
+            'base_row': self.base_row + len(self.dataset),
+            'categories': {name: list(values) for name, values in self._builder.categories.items()},
+        }
+
+    def _load_metadata(self):
+        if self._metadata_loaded or not self.metadata_path.exists():
+            return
+        try:
+            with open(self.metadata_path, 'rb') as f:
+                metadata = json.loads(f.read())
+        except ValueError:
+            return                           # still being written
+        self.dataset.metadata = metadata
+        self._metadata_loaded = True
+        if self.statistics is not None and 'sampling_rate_hz' in metadata:
+            self.statistics.sampling_rates = [float(metadata['sampling_rate_hz'])]
+
+    def _read_lines(self) -> List[bytes]:
+        if not self.jsonl_path.exists():
+            return []
+        position = self.offset + len(self._tail)
+        size = self.jsonl_path.stat().st_size
+        if size < position:
+            raise RuntimeError(f"{self.jsonl_path} shrank from {position} to {size} bytes; "
+                               f"the session was rewritten")
+        if size == position:
+            return []
+        with open(self.jsonl_path, 'rb') as f:
+            f.seek(position)
+            block = f.read(min(size - position, self.read_bytes))
+        self.dataset.load_stats.add_bytes('jsonl', len(block))
+        lines = (self._tail + block).split(b'\n')
+        self._tail = lines.pop()
+        self.offset += sum(len(line) + 1 for line in lines)
+        return lines
+
+    def poll(self) -> slice:
+        """
+        Read whatever was appended since the last poll.
+
+        Returns:
+            Slice of the dataset rows added by this call (may be empty)
+        """
+        dataset = self.dataset
+        with dataset.load_stats.phase('follow'):
+            self._load_metadata()
+            start = len(dataset)
+            for record in decode_lines([line for line in self._read_lines() if line.strip()]):
+                self._builder.add(record)
+            chunk = self._builder.flush()
+            if chunk is not None:
+                self._append(chunk)
+            stop = len(dataset)
+            new_frames = self._refresh_frames()
+            if stop > start or new_frames:
+                self._align(stop)
+            self._update_statistics(start, stop)
+        return slice(start, stop)
+
+    def _append(self, chunk: Dict[str, np.ndarray]):
+        dataset = self.dataset
+        arrays = self._arrays
+        start = len(dataset)
+        for name, _, _ in COLUMN_SCHEMA:
+            arrays[name].extend(chunk[name])
+        for name, _, leaves in RAGGED_SCHEMA:
+            offsets = arrays[f"{name}.offsets"]
+            offsets.extend(offsets.view[-1] + np.cumsum(chunk[f"{name}.lengths"]))
+            for leaf in leaves:
+                arrays[f"{name}.{leaf}"].extend(chunk[f"{name}.{leaf}"])
+        arrays[PRESENT_GROUP].extend(chunk[PRESENT_GROUP])
+        offsets = arrays[f"{EXTRAS_GROUP}.offsets"]
+        offsets.extend(offsets.view[-1] + np.cumsum(chunk[f"{EXTRAS_GROUP}.lengths"]))
+        arrays[f"{EXTRAS_GROUP}.data"].extend(chunk[f"{EXTRAS_GROUP}.data"])
+        dataset.columns.arrays.update({name: array.view for name, array in arrays.items()})
+        dataset._record_source = None
+        stop = len(dataset)
+
+        self._frame_index.extend(np.full(stop - start, -1, dtype=np.int32))
+        dataset._sample_frame_index = self._frame_index.view
+
+        codes = chunk['type']
+        rows = np.flatnonzero(codes == dataset.columns.code_of('type', 'robot_state')) + start
+        self._robot_state_rows.extend(rows)
+        self._all_robot_state &= len(rows) == stop - start
+        dataset._robot_state_rows = slice(None) if self._all_robot_state else self._robot_state_rows.view
+
+        for unit, index in dataset._time_indexes.items():
+            index.extend(dataset.columns.group('time_elapsed_s' if unit == 's' else 'timestamp_ms'))
+        if dataset._event_index is not None:
+            dataset._event_index.append(EventIndex.build(dataset.columns, start, stop))
+        for index in dataset._spatial_indexes.values():
+            index.append(dataset.session_id, dataset.columns.group('robot.position')[start:stop],
+                         rows=np.arange(start, stop))
+        if dataset._samples is not None:
+            dataset._samples.extend(dataset.columns.row_dict(i) for i in range(start, stop))
+
+        if np.any(chunk['event'] == dataset.columns.code_of('event', 'game_end')):
+            self.finished = True
+        if not self._metadata_loaded:
+            dataset.metadata['duration_s'] = float(np.nan_to_num(arrays['time_elapsed_s'].view[-1]))
+
+    def _refresh_frames(self) -> int:
+        dataset = self.dataset
+        store = dataset.frame_store
+        if store is None:
+            store = open_session_frames(dataset.base_path, dataset.session_id)
+            if store is None:
+                return 0
+            if not isinstance(store, MemmapFrameStore):
+                # .rfz containers are written after recording; nothing will be appended
+                dataset.frame_store = store
+                return len(store)
+            info(f"📷 Following frames in {store.frames_path.name}")
+            store.refresh()
+            dataset.frame_store = store
+            return len(store)
+        return store.refresh() if isinstance(store, MemmapFrameStore) else 0
+
+    def _align(self, stop: int):
+        """Re-align the rows whose frame may have changed since the last poll."""
+        dataset = self.dataset
+        store = dataset.frame_store
+        if store is None:
+            return
+        lo = self._aligned_from
+        num_frames = len(store)
+        tolerance = dataset.frame_tolerance_ms
+        raw = np.asarray(dataset.columns.group('visual_frame_index')[lo:stop])
+        times = np.asarray(dataset.columns.group('timestamp_ms')[lo:stop])
+
+        frame_idx = raw.astype(np.int32)
+        frame_idx[(frame_idx < 0) | (frame_idx >= num_frames)] = -1
+        pending = np.flatnonzero(frame_idx < 0)
+        frame_times = np.asarray(store.timestamps[:num_frames], dtype=np.float64)
+        if pending.size and len(frame_times):
+            query = times[pending]
+            # Frame timestamps are recorded in order: only frames near the new rows can match
+            first = 0
+            if tolerance is not None and not np.isnan(query).all():
+                first = int(np.searchsorted(frame_times, np.nanmin(query) - tolerance, side='left'))
+            matched = TimeIndex(frame_times[first:]).lookup(query, mode='nearest', tolerance=tolerance)
+            frame_idx[pending] = np.where(matched >= 0, matched + first, -1)
+        self._frame_index.view[lo:stop] = frame_idx
+
+        # Rows whose frame is not written yet, or that a later frame could
+        # still be closer to, are revisited on the next poll
+        if len(frame_times):
+            horizon = frame_times[-1] - (tolerance if tolerance is not None else 0.0)
+            unsettled = (raw >= num_frames) | ((raw < 0) & (times > horizon))
+        else:
+            unsettled = np.ones(len(raw), dtype=bool)
+        first_unsettled = np.flatnonzero(unsettled)
+        self._aligned_from = lo + int(first_unsettled[0]) if first_unsettled.size else stop
+
+    def _update_statistics(self, start: int, stop: int):
+        stats = self.statistics
+        if stats is None:
+            return
+        if stop > start:
+            accumulate_rows(stats, self.dataset.columns, start, stop)
+        store = self.dataset.frame_store
+        if store is not None and len(store) > self._frames_counted:
+            accumulate_frames(stats, store, self._frames_counted, len(store),
+                              histogram=self.include_frames and store.dtype == np.uint8)
+            self._frames_counted = len(store)
+        stats.duration_s = float(self.dataset.metadata.get('duration_s', 0.0))
+
+    def wait_for_samples(self, min_new: int = 1, timeout: Optional[float] = None,
+                         poll_interval: float = DEFAULT_POLL_INTERVAL_S) -> slice:
+        """
+        Block until at least ``min_new`` rows arrive, the timeout expires or the session ends.
+
+        Args:
+            min_new: Rows to wait for
+            timeout: Seconds to wait at most (None: no limit)
+            poll_interval: Sleep between polls
+
+        Returns:
+            Slice of the rows added while waiting (possibly fewer than ``min_new``)
+        """
+        start = len(self.dataset)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.poll()
+            if len(self.dataset) - start >= min_new or self.finished:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            sleep = poll_interval if deadline is None else min(poll_interval, deadline - time.monotonic())
+            time.sleep(max(sleep, 0.0))
+        return slice(start, len(self.dataset))
+
+    async def wait_for_samples_async(self, min_new: int = 1, timeout: Optional[float] = None,
+                                     poll_interval: float = DEFAULT_POLL_INTERVAL_S) -> slice:
+        """``wait_for_samples`` for asyncio: polls run in the default executor, waits yield the loop."""
+        loop = asyncio.get_running_loop()
+        start = len(self.dataset)
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            await loop.run_in_executor(None, self.poll)
+            if len(self.dataset) - start >= min_new or self.finished:
+                break
+            if deadline is not None and loop.time() >= deadline:
+                break
+            sleep = poll_interval if deadline is None else min(poll_interval, deadline - loop.time())
+            await asyncio.sleep(max(sleep, 0.0))
+        return slice(start, len(self.dataset))
+
+    def updates(self, min_new: int = 1, idle_timeout: Optional[float] = None,
+                poll_interval: float = DEFAULT_POLL_INTERVAL_S) -> Iterator[slice]:
+        """
+        Yield slices of new rows as they arrive.
+
+        Stops after the session ends or when nothing arrives for ``idle_timeout`` seconds.
+        """
+        while True:
+            rows = self.wait_for_samples(min_new, idle_timeout, poll_interval)
+            if rows.stop > rows.start:
+                yield rows
+            if self.finished or rows.stop == rows.start:
+                return
@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+ReActure Frame Storage
+======================
+
+Frame backends used by ``ReActureDataset``.
+
+``MemmapFrameStore`` memory-maps ``<session>_frames.npy`` (and
+``_timestamps.npy``) on first use, so registering a session costs only a
+header read and frames are paged in per requested index. The map is never
+pickled: DataLoader workers receive the paths and reopen the map in their
+own process, which keeps RSS flat regardless of how many sessions exist.
+
+``CompressedFrameStore`` reads ``<session>_frames.rfz``, a container of
+zlib/lzma-compressed chunks of K frames (optionally delta-encoded against
+each chunk's first frame). Only the chunks that are touched get decoded,
+and a small LRU cache keeps sequential reads cheap.
+
+Usage:
+    from reacture_frames import MemmapFrameStore
+
+    store = MemmapFrameStore('reacture_..._frames.npy')
+    frame = store[10]                    # (128, 128, 3) uint8
+    batch = store.take([3, 99, 4])       # (3, 128, 128, 3) uint8
+
+    # Convert and report ratio vs decode throughput (CLI)
+    python reacture_frames.py reacture_..._frames.npy --codec zlib --chunk-frames 32 --compare
+"""
+
+import json
+import lzma
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from reacture_columns import source_fingerprint
+
+# Frame timestamps are synthesised at this interval when _timestamps.npy is absent
+DEFAULT_FRAME_INTERVAL_MS = 100.0
+
+
+def read_npy_header(path) -> Tuple[Tuple[int, ...], np.dtype, bool, int]:
+    """
+    Read an ``.npy`` header without touching the array data.
+
+    Returns:
+        Tuple of (shape, dtype, fortran_order, data_offset)
+    """
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        return shape, dtype, fortran_order, f.tell()
+
+
+def map_growing_npy(path) -> np.ndarray:
+    """
+    Read-only map of the complete rows of an ``.npy`` file still being appended to.
+
+    The row count comes from the file size rather than the header, so a
+    writer may append rows before it rewrites the header's shape.
+    """
+    shape, dtype, fortran_order, offset = read_npy_header(path)
+    if fortran_order:
+        raise ValueError(f"Cannot follow a Fortran-ordered array: {path}")
+    row_shape = tuple(shape[1:])
+    row_nbytes = int(np.prod(row_shape, dtype=np.int64)) * dtype.itemsize
+    count = max(os.path.getsize(path) - offset, 0) // row_nbytes if row_nbytes else shape[0]
+    if count == 0:
+        return np.empty((0,) + row_shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,) + row_shape)
+
+
+class FrameStore:
+    """
+    Common interface of the frame backends.
+
+    Subclasses provide ``array`` (anything indexable like an (N, H, W, C)
+    array) and ``timestamps``; ``take`` gathers frames in sorted order.
+
+    Attributes:
+        shape: Frame array shape (N, H, W, C)
+        dtype: Frame dtype (uint8)
+    """
+
+    shape: Tuple[int, ...] = (0,)
+    dtype: np.dtype = np.dtype(np.uint8)
+
+    @property
+    def array(self):
+        raise NotImplementedError
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def has_timestamps_file(self) -> bool:
+        return False
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def fingerprint(self) -> Dict:
+        """JSON-serialisable identity of the frame source (for cache keys)."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return self.shape[0] if self.shape else 0
+
+    def __getitem__(self, idx):
+        return self.array[idx]
+
+    def take(self, indices: Sequence[int]) -> np.ndarray:
+        """
+        Gather frames by index, reading only the pages those frames live on.
+
+        Indices are visited in sorted order so reads are sequential on disk,
+        then returned in the order requested.
+
+        Args:
+            indices: Frame indices
+
+        Returns:
+            NumPy array of shape (len(indices), H, W, C), a private copy
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size == 0:
+            return np.empty((0,) + tuple(self.shape[1:]), dtype=self.dtype)
+        order = np.argsort(indices, kind='stable')
+        out = np.empty((len(indices),) + tuple(self.shape[1:]), dtype=self.dtype)
+        out[order] = self.array[indices[order]]
+        return out
+
+    def close(self):
+        """Release any open maps or handles (reopened on next access)."""
+
+
+class MemmapFrameStore(FrameStore):
+    """
+    Lazily memory-mapped (N, H, W, C) frame array.
+
+    Attributes:
+        frames_path: Path to the consolidated ``_frames.npy`` file
+        timestamps_path: Path to ``_timestamps.npy`` or None
+        shape: Array shape read from the ``.npy`` header
+        dtype: Array dtype read from the ``.npy`` header
+    """
+
+    def __init__(self, frames_path, timestamps_path=None, mmap_mode: Optional[str] = 'r'):
+        """
+        Args:
+            frames_path: Path to ``<session>_frames.npy``
+            timestamps_path: Optional path to ``<session>_timestamps.npy``
+            mmap_mode: ``np.load`` mode; None reads the whole array into RAM
+        """
+        self.frames_path = Path(frames_path)
+        self.timestamps_path = Path(timestamps_path) if timestamps_path else None
+        self.mmap_mode = mmap_mode
+        self.shape, self.dtype, _, _ = read_npy_header(self.frames_path)
+        self.growing = False
+        self._frames = None
+        self._timestamps = None
+        self._pid = None
+
+    def _ensure_open(self):
+        # A map opened in the parent is dropped in forked workers and reopened,
+        # so each process owns its own file handle and page-cache view.
+        if self._frames is None or self._pid != os.getpid():
+            if self.growing:
+                self._frames = map_growing_npy(self.frames_path)[:self.shape[0]]
+            else:
+                self._frames = np.load(self.frames_path, mmap_mode=self.mmap_mode)
+            self._timestamps = None
+            self._pid = os.getpid()
+
+    @property
+    def array(self) -> np.ndarray:
+        """The underlying (memory-mapped) frame array."""
+        self._ensure_open()
+        return self._frames
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Per-frame timestamps in ms (synthesised at 10 Hz if no file exists)."""
+        self._ensure_open()
+        if self._timestamps is None:
+            if self.growing and self.has_timestamps_file:
+                self._timestamps = map_growing_npy(self.timestamps_path)
+            elif self.timestamps_path is not None and self.timestamps_path.exists():
+                self._timestamps = np.load(self.timestamps_path, mmap_mode=self.mmap_mode)
+            else:
+                self._timestamps = np.arange(len(self)) * DEFAULT_FRAME_INTERVAL_MS
+        return self._timestamps
+
+    @property
+    def has_timestamps_file(self) -> bool:
+        return self.timestamps_path is not None and self.timestamps_path.exists()
+
+    def fingerprint(self) -> Dict:
+        return {
+            'frames': source_fingerprint(self.frames_path),
+            'timestamps': (source_fingerprint(self.timestamps_path)
+                           if self.has_timestamps_file else None),
+        }
+
+    def refresh(self) -> int:
+        """
+        Pick up frames appended since the last call (for sessions still recording).
+
+        Switches the store to counting complete frames from the file size
+        (see ``map_growing_npy``) and remaps the file when it has grown.
+
+        Returns:
+            Number of new frames
+        """
+        self.growing = True
+        shape, self.dtype, _, offset = read_npy_header(self.frames_path)
+        frame_nbytes = int(np.prod(shape[1:], dtype=np.int64)) * self.dtype.itemsize
+        count = max(self.frames_path.stat().st_size - offset, 0) // max(frame_nbytes, 1)
+        added = count - self.shape[0]
+        if added or tuple(shape[1:]) != tuple(self.shape[1:]):
+            self.shape = (count,) + tuple(shape[1:])
+            self.close()
+        elif self._timestamps is not None and len(self._timestamps) < count:
+            self._timestamps = None          # the timestamps file may have caught up
+        return max(added, 0)
+
+    def close(self):
+        """Drop the map; it is reopened on next access."""
+        self._frames = None
+        self._timestamps = None
+        self._pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_frames'] = None
+        state['_timestamps'] = None
+        state['_pid'] = None
+        return state
+
+    def __repr__(self) -> str:
+        return f"MemmapFrameStore({self.frames_path.name!r}, shape={self.shape})"
+
+
+def open_session_frames(base_path, session_id: str, lazy: bool = True) -> Optional[FrameStore]:
+    """
+    Open a session's frames: ``_frames.npy`` if present, else ``_frames.rfz``.
+
+    Args:
+        base_path: Directory holding the session files
+        session_id: Session id (file prefix)
+        lazy: Memory-map ``_frames.npy`` instead of reading it into RAM
+
+    Returns:
+        FrameStore, or None if the session has no frames file
+    """
+    base_path = Path(base_path)
+    frames_path = base_path / f"{session_id}_frames.npy"
+    compressed_path = base_path / f"{session_id}_frames.rfz"
+    timestamps_path = base_path / f"{session_id}_timestamps.npy"
+    if frames_path.exists():
+        return MemmapFrameStore(frames_path, timestamps_path, mmap_mode='r' if lazy else None)
+    if compressed_path.exists():
+        return CompressedFrameStore(compressed_path, timestamps_path)
+    return None
+
+
+# --- Compressed frame container (.rfz) ---------------------------------------
+#
+#   prelude   magic b'RFZ1', header length (u4), chunk table offset (u8)
+#   header    JSON: shape, dtype, chunk_frames, codec, level, delta
+#   chunks    compressed (K, H, W, C) blocks; with delta encoding, frames
+#             1..K-1 are stored as (frame - keyframe) mod 256
+#   table     u8 byte offsets of every chunk plus the end offset
+
+RFZ_MAGIC = b'RFZ1'
+RFZ_PRELUDE = struct.Struct('<4sIQ')
+RFZ_CODECS = ('zlib', 'lzma', 'none')
+
+DEFAULT_CHUNK_FRAMES = 32
+DEFAULT_CACHE_CHUNKS = 8
+
+
+def _compress(data: bytes, codec: str, level: int) -> bytes:
+    if codec == 'zlib':
+        return zlib.compress(data, level)
+    if codec == 'lzma':
+        return lzma.compress(data, preset=level)
+    return data
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'lzma':
+        return lzma.decompress(data)
+    return data
+
+
+def _encode_chunk(chunk: np.ndarray, codec: str, level: int, delta: bool) -> bytes:
+    chunk = np.ascontiguousarray(chunk)
+    if delta and len(chunk) > 1:
+        # uint8 arithmetic wraps, so decoding is the exact inverse
+        chunk = chunk.copy()
+        chunk[1:] -= chunk[0]
+    return _compress(chunk.tobytes(), codec, level)
+
+
+def _decode_chunk(data: bytes, codec: str, delta: bool, frame_shape, dtype) -> np.ndarray:
+    chunk = np.frombuffer(_decompress(data, codec), dtype=dtype).reshape((-1,) + tuple(frame_shape))
+    chunk = chunk.copy()
+    if delta and len(chunk) > 1:
+        chunk[1:] += chunk[0]
+    return chunk
+
+
+class CompressedFrameStore(FrameStore):
+    """
+    Frames from a chunk-compressed ``.rfz`` container.
+
+    Reading a frame decompresses only its chunk; the most recently used
+    chunks are kept in a bounded LRU cache, so sequential reads decode each
+    chunk once. ``array`` returns the store itself, which supports integer,
+    slice and index-array access like an (N, H, W, C) array.
+
+    Attributes:
+        path: Path to the ``.rfz`` file
+        timestamps_path: Path to ``_timestamps.npy`` or None
+        chunk_frames: Frames per compressed chunk
+        codec: 'zlib', 'lzma' or 'none'
+        delta: Whether chunks are delta-encoded against their first frame
+    """
+
+    def __init__(self, path, timestamps_path=None, cache_chunks: int = DEFAULT_CACHE_CHUNKS):
+        """
+        Args:
+            path: Path to ``<session>_frames.rfz``
+            timestamps_path: Optional path to ``<session>_timestamps.npy``
+            cache_chunks: Decoded chunks kept in memory (LRU)
+        """
+        self.path = Path(path)
+        self.timestamps_path = Path(timestamps_path) if timestamps_path else None
+        self.cache_chunks = max(int(cache_chunks), 1)
+
+        with open(self.path, 'rb') as f:
+            magic, header_len, table_offset = RFZ_PRELUDE.unpack(f.read(RFZ_PRELUDE.size))
+            if magic != RFZ_MAGIC:
+                raise ValueError(f"Not an .rfz frame container: {self.path}")
+            header = json.loads(f.read(header_len))
+            f.seek(table_offset)
+            self.chunk_offsets = np.frombuffer(f.read(), dtype='<u8').astype(np.int64)
+
+        self.shape = tuple(header['shape'])
+        self.dtype = np.dtype(header['dtype'])
+        self.chunk_frames = int(header['chunk_frames'])
+        self.codec = header['codec']
+        self.delta = bool(header['delta'])
+
+        self._fd = None
+        self._pid = None
+        self._timestamps = None
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def num_chunks(self) -> int:
+        return len(self.chunk_offsets) - 1
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def compressed_nbytes(self) -> int:
+        return int(self.chunk_offsets[-1] - self.chunk_offsets[0])
+
+    def _ensure_open(self):
+        pid = os.getpid()
+        if self._fd is not None and self._pid == pid:
+            return
+        with self._open_lock:
+            # Reader threads can race here; only the first one opens
+            if self._fd is not None and self._pid == pid:
+                return
+            # Forked workers get their own descriptor and an empty cache
+            self._cache = OrderedDict()
+            self._lock = threading.Lock()
+            self._fd = os.open(self.path, os.O_RDONLY)
+            self._pid = pid
+
+    def chunk(self, c: int) -> np.ndarray:
+        """Decoded chunk ``c`` as a (K, H, W, C) array (cached, do not modify)."""
+        self._ensure_open()
+        with self._lock:
+            cached = self._cache.get(c)
+            if cached is not None:
+                self._cache.move_to_end(c)
+                self.cache_hits += 1
+                return cached
+        start, end = int(self.chunk_offsets[c]), int(self.chunk_offsets[c + 1])
+        decoded = _decode_chunk(os.pread(self._fd, end - start, start), self.codec,
+                                self.delta, self.shape[1:], self.dtype)
+        with self._lock:
+            self.cache_misses += 1
+            self._cache[c] = decoded
+            while len(self._cache) > self.cache_chunks:
+                self._cache.popitem(last=False)
+        return decoded
+
+    @property
+    def array(self) -> 'CompressedFrameStore':
+        return self
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Per-frame timestamps in ms (synthesised at 10 Hz if no file exists)."""
+        if self._timestamps is None:
+            if self.has_timestamps_file:
+                self._timestamps = np.load(self.timestamps_path)
+            else:
+                self._timestamps = np.arange(len(self)) * DEFAULT_FRAME_INTERVAL_MS
+        return self._timestamps
+
+    @property
+    def has_timestamps_file(self) -> bool:
+        return self.timestamps_path is not None and self.timestamps_path.exists()
+
+    def fingerprint(self) -> Dict:
+        return {
+            'frames': source_fingerprint(self.path),
+            'timestamps': (source_fingerprint(self.timestamps_path)
+                           if self.has_timestamps_file else None),
+        }
+
+    def take(self, indices: Sequence[int]) -> np.ndarray:
+        """Gather frames by index, decoding each touched chunk once."""
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        n = len(self)
+        if indices.size and (indices.min() < -n or indices.max() >= n):
+            raise IndexError(f"Frame index out of range for {n} frames")
+        indices = np.where(indices < 0, indices + n, indices)
+
+        out = np.empty((len(indices),) + tuple(self.shape[1:]), dtype=self.dtype)
+        chunk_ids = indices // self.chunk_frames
+        for c in np.unique(chunk_ids):
+            rows = np.flatnonzero(chunk_ids == c)
+            out[rows] = self.chunk(int(c))[indices[rows] - c * self.chunk_frames]
+        return out
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (int, np.integer)):
+            return self.take([idx])[0]
+        if isinstance(idx, slice):
+            return self.take(np.arange(len(self))[idx])
+        return self.take(idx).reshape(np.shape(idx) + tuple(self.shape[1:]))
+
+    def __iter__(self):
+        for c in range(self.num_chunks):
+            yield from self.chunk(c)
+
+    def __array__(self, dtype=None, copy=None):
+        frames = self[:]
+        return frames if dtype is None else frames.astype(dtype)
+
+    def close(self):
+        """Close the file and drop cached chunks."""
+        with self._open_lock:
+            if self._fd is not None and self._pid == os.getpid():
+                os.close(self._fd)
+            self._fd = None
+            self._pid = None
+            self._cache = OrderedDict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_fd'] = None
+        state['_pid'] = None
+        state['_cache'] = OrderedDict()
+        state['_lock'] = None
+        state['_open_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (f"CompressedFrameStore({self.path.name!r}, shape={self.shape}, "
+                f"codec={self.codec!r}, chunk_frames={self.chunk_frames})")
+
+
+def compress_frames(frames_path, out_path=None, chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+                    codec: str = 'zlib', level: int = 6, delta: bool = True,
+                    measure_decode: bool = True) -> Dict:
+    """
+    Convert a ``_frames.npy`` file into a ``.rfz`` container.
+
+    Frames are read from a memory map one chunk at a time, so memory use is
+    bounded by the chunk size.
+
+    Args:
+        frames_path: Source ``<session>_frames.npy``
+        out_path: Destination (default: same name with ``.rfz``)
+        chunk_frames: Frames per chunk (the random-access granularity)
+        codec: 'zlib', 'lzma' or 'none'
+        level: Compression level (zlib 0-9, lzma preset 0-9)
+        delta: Delta-encode frames against their chunk's first frame
+        measure_decode: Decode the result once to measure throughput
+
+    Returns:
+        Report with sizes, compression ratio and encode/decode throughput
+    """
+    if codec not in RFZ_CODECS:
+        raise ValueError(f"Unknown codec {codec!r}; expected one of {RFZ_CODECS}")
+    frames_path = Path(frames_path)
+    out_path = Path(out_path) if out_path else frames_path.with_suffix('.rfz')
+    frames = np.load(frames_path, mmap_mode='r')
+
+    header = json.dumps({
+        'shape': list(frames.shape),
+        'dtype': frames.dtype.str,
+        'chunk_frames': chunk_frames,
+        'codec': codec,
+        'level': level,
+        'delta': delta,
+    }).encode()
+
+    start = time.perf_counter()
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    offsets = []
+    with open(tmp_path, 'wb') as f:
+        f.write(RFZ_PRELUDE.pack(RFZ_MAGIC, len(header), 0))
+        f.write(header)
+        for i in range(0, len(frames), chunk_frames):
+            offsets.append(f.tell())
+            f.write(_encode_chunk(frames[i:i + chunk_frames], codec, level, delta))
+        offsets.append(f.tell())
+        table_offset = f.tell()
+        f.write(np.asarray(offsets, dtype='<u8').tobytes())
+        f.seek(0)
+        f.write(RFZ_PRELUDE.pack(RFZ_MAGIC, len(header), table_offset))
+    os.replace(tmp_path, out_path)
+    encode_s = time.perf_counter() - start
+
+    raw_bytes = frames.size * frames.dtype.itemsize
+    compressed_bytes = offsets[-1] - offsets[0]
+    report = {
+        'path': str(out_path),
+        'codec': codec,
+        'level': level,
+        'delta': delta,
+        'chunk_frames': chunk_frames,
+        'frames': int(len(frames)),
+        'raw_bytes': int(raw_bytes),
+        'compressed_bytes': int(compressed_bytes),
+        'ratio': raw_bytes / max(compressed_bytes, 1),
+        'encode_mb_s': raw_bytes / 1e6 / max(encode_s, 1e-9),
+    }
+    if measure_decode:
+        report.update(measure_decode_throughput(out_path))
+    return report
+
+
+def measure_decode_throughput(path) -> Dict:
+    """Decode every chunk of a ``.rfz`` file once and time it."""
+    store = CompressedFrameStore(path, cache_chunks=1)
+    start = time.perf_counter()
+    for c in range(store.num_chunks):
+        store.chunk(c)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    store.close()
+    return {
+        'decode_frames_s': len(store) / elapsed,
+        'decode_mb_s': store.nbytes / 1e6 / elapsed,
+    }
+
+
+def format_compression_report(report: Dict) -> str:
+    delta = '+delta' if report['delta'] else ''
+    return (f"{report['codec']}-{report['level']}{delta} K={report['chunk_frames']}: "
+            f"ratio {report['ratio']:.2f}x, encode {report['encode_mb_s']:.0f} MB/s, "
+            f"decode {report.get('decode_mb_s', float('nan')):.0f} MB/s "
+            f"({report.get('decode_frames_s', float('nan')):.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from reacture_instrument import log_to_stdout
+
+    p = argparse.ArgumentParser(description="Compress _frames.npy into a chunked .rfz container.")
+    p.add_argument("frames_path", help="Path to <session>_frames.npy")
+    p.add_argument("out_path", nargs="?", default=None, help="Output .rfz (default: beside input)")
+    p.add_argument("--codec", choices=RFZ_CODECS, default="zlib", help="Compression codec")
+    p.add_argument("--level", type=int, default=6, help="Compression level (default: 6)")
+    p.add_argument("--chunk-frames", type=int, default=DEFAULT_CHUNK_FRAMES,
+                   help=f"Frames per chunk (default: {DEFAULT_CHUNK_FRAMES})")
+    p.add_argument("--no-delta", action="store_true", help="Disable delta encoding")
+    p.add_argument("--compare", action="store_true",
+                   help="Also report ratio/throughput for other codec settings")
+    args = p.parse_args()
+    log_to_stdout()
+
+    report = compress_frames(args.frames_path, args.out_path, args.chunk_frames,
+                             args.codec, args.level, not args.no_delta)
+    print(f"✅ Wrote {report['path']}")
+    print(f"📊 {format_compression_report(report)}")
+
+    if args.compare:
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for codec, level in (('zlib', 1), ('zlib', 6), ('lzma', 1)):
+                for delta in (False, True):
+                    trial = compress_frames(args.frames_path, Path(tmp) / 'trial.rfz',
+                                            args.chunk_frames, codec, level, delta)
+                    print(f"   {format_compression_report(trial)}")
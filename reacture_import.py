@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+ReActure Server Export Import
+=============================
+
+Turn the JSON dumps served by ``server/routes/dataset.js`` into loader
+sessions:
+
+- ``GET /api/dataset/ml-ready``: ``{"metadata": ..., "data": [...]}`` with
+  flat ``trajectory`` / ``actions`` / ``sensors`` lists per session
+- ``GET /api/dataset/export``: ``{"metadata": ..., "sessions": [...]}`` with
+  raw ``PlayerSession`` documents (``movementPath``, ``decisions``,
+  ``sensorData``)
+
+The dump is read one session at a time (``reacture_ingest.iter_json_array``),
+from a file or straight from the server's URL. Worker processes convert each
+session into column arrays and write ``<session>_metadata.json`` plus the
+``<session>_columns/`` cache, so memory is bounded by the few sessions in
+flight. The written sessions have no JSONL; ``ReActureDataset`` and
+``MultiSessionDataset`` open their columns directly.
+
+Rows are the 10 Hz sensor samples (the 1 Hz trajectory when a session has
+no sensor data). A decision annotates the row at its exact timestamp as
+that row's ``event``, or becomes a ``player_action`` row of its own.
+Positions and camera yaw/pitch are linearly interpolated from the
+trajectory (NaN outside it), and decisions keep their own recorded position.
+
+Usage:
+    from reacture_import import import_server_export
+
+    report = import_server_export('reacture_ml_dataset.json', 'datasets/server/', workers=4)
+    corpus = MultiSessionDataset.from_directory('datasets/server/')
+
+    # CLI (a file or the live endpoint)
+    python reacture_import.py http://localhost:3001/api/dataset/ml-ready datasets/server/
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from reacture_columns import (KNOWN_CATEGORIES, PRESENT_GROUP, SessionColumns, columns_dir_for,
+                              missing_arrays, presence_bit, save_columns)
+from reacture_ingest import iter_json_array
+from reacture_instrument import info, log_to_stdout
+
+# Top-level keys holding the session list (/ml-ready, /export)
+EXPORT_KEYS = ('data', 'sessions')
+
+SENSOR_FIELDS = ('accel_x', 'accel_y', 'accel_z', 'battery', 'damage', 'proximity')
+
+_KEY_LEAVES = ('W', 'A', 'S', 'D', 'inspect', 'destroy', 'Space', 'E', 'R')
+
+
+def _get(item, *keys):
+    for key in keys:
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+def _floats(items: List[Dict], *keys) -> np.ndarray:
+    values = (_get(item, *keys) for item in items)
+    return np.array([value if isinstance(value, (int, float)) else np.nan for value in values],
+                    dtype=np.float64)
+
+
+def normalize_session(doc: Dict) -> Dict:
+    """
+    Bring a raw ``PlayerSession`` document (``/export``) into the ``/ml-ready`` layout.
+
+    ``/ml-ready`` entries are returned unchanged, except that ``/export``
+    sensor samples also carry their ``keys`` (``keyPresses``).
+    """
+    if 'trajectory' in doc or 'sensors' in doc:
+        return doc
+    return {
+        'session_id': doc.get('sessionId'),
+        'player_id': doc.get('playerId'),
+        'player_name': doc.get('playerName'),
+        'environment': doc.get('environment'),
+        'trajectory': [
+            {'x': _get(p, 'position', 'x'), 'y': _get(p, 'position', 'y'), 'z': _get(p, 'position', 'z'),
+             'yaw': _get(p, 'rotation', 'yaw'), 'pitch': _get(p, 'rotation', 'pitch'),
+             't': p.get('timestamp')}
+            for p in doc.get('movementPath') or []
+        ],
+        'actions': [
+            {'type': d.get('type'), 'x': _get(d, 'position', 'x'), 'y': _get(d, 'position', 'y'),
+             'z': _get(d, 'position', 'z'), 't': d.get('timestamp'), 'success': d.get('success')}
+            for d in doc.get('decisions') or []
+        ],
+        'sensors': [
+            {'t': s.get('timestamp'), 'accel_x': _get(s, 'accelerometer', 'x'),
+             'accel_y': _get(s, 'accelerometer', 'y'), 'accel_z': _get(s, 'accelerometer', 'z'),
+             'battery': s.get('battery'), 'damage': s.get('damage'), 'proximity': s.get('proximity'),
+             'keys': s.get('keyPresses')}
+            for s in doc.get('sensorData') or []
+        ],
+        'score': doc.get('score'),
+        'victims_saved': doc.get('victimsSaved'),
+        'victims_total': doc.get('victimsTotal'),
+        'victims_died': doc.get('victimsDied'),
+        'final_health': doc.get('finalHealth'),
+        'final_fuel': doc.get('finalFuel'),
+        'duration_s': doc.get('duration'),
+        'start_time': doc.get('createdAt'),
+    }
+
+
+def _interp(times: np.ndarray, sample_times: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Linear interpolation that is NaN outside the sampled span."""
+    valid = ~(np.isnan(sample_times) | np.isnan(values))
+    out = np.full(times.shape, np.nan)
+    if not valid.any():
+        return out
+    xs, ys = sample_times[valid], values[valid]
+    order = np.argsort(xs, kind='stable')
+    xs, ys = xs[order], ys[order]
+    inside = (times >= xs[0]) & (times <= xs[-1])
+    out[inside] = np.interp(times[inside], xs, ys)
+    return out
+
+
+def session_columns(session: Dict) -> SessionColumns:
+    """
+    Convert one (normalised) server session into loader columns.
+
+    Returns:
+        SessionColumns with rows in time order
+    """
+    sensors = session.get('sensors') or []
+    trajectory = session.get('trajectory') or []
+    actions = session.get('actions') or []
+    base = sensors if sensors else trajectory
+
+    base_t = _floats(base, 't')
+    action_t = _floats(actions, 't')
+    order = np.argsort(base_t, kind='stable')
+    sorted_t = base_t[order]
+
+    # Decisions land on the first free base row with the same timestamp
+    action_row = np.full(len(actions), -1, dtype=np.int64)
+    taken = np.zeros(len(base), dtype=bool)
+    lo = np.searchsorted(sorted_t, action_t, side='left')
+    hi = np.searchsorted(sorted_t, action_t, side='right')
+    for i in range(len(actions)):
+        for pos in range(lo[i], hi[i]):
+            if not taken[order[pos]]:
+                taken[order[pos]] = True
+                action_row[i] = order[pos]
+                break
+    extra = np.flatnonzero(action_row < 0)
+
+    times = np.concatenate([base_t, action_t[extra]])
+    num_rows = len(times)
+    rows = np.argsort(times, kind='stable')          # output row -> source row
+    position_of = np.empty(num_rows, dtype=np.int64)
+    position_of[rows] = np.arange(num_rows)          # source row -> output row
+    action_row[extra] = len(base) + np.arange(len(extra))
+    action_out = position_of[action_row] if len(actions) else action_row
+
+    categories = {name: list(values) for name, values in KNOWN_CATEGORIES.items()}
+    arrays = missing_arrays(num_rows)
+    t = times[rows]
+    arrays['timestamp_ms'][:] = t
+    arrays['time_elapsed_s'][:] = t / 1000.0
+    arrays[PRESENT_GROUP][:] = presence_bit('timestamp_ms') | presence_bit('time_elapsed_s')
+    arrays['type'][:] = categories['type'].index('robot_state')
+    # Decisions without a sensor row of their own are player actions, not robot states
+    arrays['type'][position_of[len(base):]] = categories['type'].index('player_action')
+
+    event_codes = arrays['event']
+    for i, kind in enumerate(action.get('type') for action in actions):
+        if isinstance(kind, str):
+            if kind not in categories['event']:
+                categories['event'].append(kind)
+            event_codes[action_out[i]] = categories['event'].index(kind)
+
+    if sensors:
+        base_out = position_of[:len(base)]
+        values = {name: _floats(sensors, name) for name in SENSOR_FIELDS}
+        arrays['accelerometer'][base_out] = np.stack(
+            [values['accel_x'], values['accel_y'], values['accel_z']], axis=1)
+        arrays['battery'][base_out] = values['battery']
+        arrays['damage'][base_out] = values['damage']
+        arrays['sensors.proximity'][base_out] = values['proximity']
+        if any(isinstance(s.get('keys'), dict) for s in sensors):
+            keys = [s.get('keys') if isinstance(s.get('keys'), dict) else {} for s in sensors]
+            arrays['key_presses'][base_out] = [[bool(k.get(leaf)) for leaf in _KEY_LEAVES] for k in keys]
+            arrays[PRESENT_GROUP][base_out] |= np.array(
+                [sum(presence_bit(f"key_presses.{leaf}") for leaf in _KEY_LEAVES if k.get(leaf) is not None)
+                 for k in keys], dtype=arrays[PRESENT_GROUP].dtype)
+            arrays['key_presses.mouse'][base_out] = np.stack(
+                [_floats(keys, 'mouse_dx'), _floats(keys, 'mouse_dy')], axis=1)
+
+    if trajectory:
+        traj_t = _floats(trajectory, 't')
+        arrays['robot.position'][:] = np.stack(
+            [_interp(t, traj_t, _floats(trajectory, axis)) for axis in 'xyz'], axis=1)
+        # game.js accumulates yaw without wrapping, so it interpolates directly
+        arrays['camera.yaw'][:] = _interp(t, traj_t, _floats(trajectory, 'yaw'))
+        arrays['camera.pitch'][:] = _interp(t, traj_t, _floats(trajectory, 'pitch'))
+    if actions:
+        recorded = np.stack([_floats(actions, axis) for axis in 'xyz'], axis=1)
+        keep = ~np.isnan(recorded).any(axis=1)
+        arrays['robot.position'][action_out[keep]] = recorded[keep]
+    return SessionColumns(arrays, categories)
+
+
+def session_metadata(session: Dict, session_id: str, columns: SessionColumns, source: Dict) -> Dict:
+    """Loader metadata (``<session>_metadata.json``) for an imported session."""
+    times = np.asarray(columns.group('time_elapsed_s'))
+    duration = session.get('duration_s')
+    if not isinstance(duration, (int, float)):
+        duration = float(np.nanmax(times)) if len(times) and not np.isnan(times).all() else 0.0
+    actions = session.get('actions') or []
+    game_result = {
+        'victims_total': session.get('victims_total'),
+        'victims_saved': session.get('victims_saved'),
+        'victims_died': session.get('victims_died'),
+        'final_score': session.get('score'),
+        'final_health': session.get('final_health'),
+        'final_fuel': session.get('final_fuel'),
+    }
+    metadata = {
+        'session_id': session_id,
+        'start_time': session.get('start_time'),
+        'duration_s': float(duration),
+        'sampling_rate_hz': 10 if session.get('sensors') else 1,
+        'player_id': session.get('player_id'),
+        'player_name': session.get('player_name'),
+        'environment': session.get('environment'),
+        'game_result': {key: value for key, value in game_result.items() if value is not None},
+        'data_stats': {
+            'total_samples': len(columns),
+            'total_frames': 0,
+            'actions_logged': len(actions),
+        },
+        'import': dict(source,
+                       server_session_id=session.get('session_id'),
+                       trajectory_points=len(session.get('trajectory') or []),
+                       sensor_samples=len(session.get('sensors') or []),
+                       failed_actions=sum(1 for action in actions if action.get('success') is False)),
+    }
+    return {key: value for key, value in metadata.items() if value is not None}
+
+
+def _session_id(session: Dict, index: int) -> str:
+    raw = session.get('session_id')
+    if not isinstance(raw, str) or not raw:
+        return f"imported_{index:06d}"
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', raw)
+
+
+def import_session(doc: Dict, index: int, out_dir, source: Dict,
+                   overwrite: bool = False) -> Tuple[str, int, bool]:
+    """
+    Convert and write one exported session.
+
+    Returns:
+        Tuple of (session id, rows, written); existing sessions are left
+        alone (written False) unless ``overwrite``
+    """
+    out_dir = Path(out_dir)
+    session = normalize_session(doc)
+    session_id = _session_id(session, index)
+    metadata_path = out_dir / f"{session_id}_metadata.json"
+    if metadata_path.exists() and not overwrite:
+        return session_id, 0, False
+
+    columns = session_columns(session)
+    save_columns(columns, columns_dir_for(out_dir / f"{session_id}_data.jsonl"), None)
+    metadata = session_metadata(session, session_id, columns, source)
+    tmp_path = metadata_path.with_name(f"{metadata_path.name}.tmp{os.getpid()}")
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    # Metadata last: a session is discoverable only once its columns exist
+    os.replace(tmp_path, metadata_path)
+    return session_id, len(columns), True
+
+
+def import_server_export(source, out_dir, workers: Optional[int] = None, overwrite: bool = False,
+                         limit: Optional[int] = None, progress_every: float = 2.0) -> Dict:
+    """
+    Stream a server dataset export into loader sessions.
+
+    Args:
+        source: Export file (``.json`` or ``.json.gz``) or the endpoint's http(s) URL
+        out_dir: Directory receiving ``<session>_metadata.json`` and ``<session>_columns/``
+        workers: Converter processes (default: CPUs, max 8; 0 or 1 converts inline)
+        overwrite: Re-import sessions that already exist in ``out_dir``
+        limit: Stop after this many sessions
+        progress_every: Seconds between progress messages
+
+    Returns:
+        Dict with 'imported', 'skipped' (session ids), 'rows' and 'elapsed_s'
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = min(8, os.cpu_count() or 1) if workers is None else workers
+    origin = {'source': str(source), 'imported_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+
+    start = last_report = time.perf_counter()
+    imported: List[str] = []
+    skipped: List[str] = []
+    rows = 0
+
+    def collect(result):
+        nonlocal rows
+        session_id, num_rows, written = result
+        (imported if written else skipped).append(session_id)
+        rows += num_rows
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = set()
+    try:
+        for index, doc in enumerate(iter_json_array(source, keys=EXPORT_KEYS)):
+            if limit is not None and index >= limit:
+                break
+            source_info = dict(origin, format='export' if 'sessionId' in doc else 'ml-ready')
+            if pool is None:
+                collect(import_session(doc, index, out_dir, source_info, overwrite))
+            else:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                pending.add(pool.submit(import_session, doc, index, out_dir, source_info, overwrite))
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                last_report = now
+                info(f"📥 Imported {len(imported)} sessions ({rows} rows, {len(skipped)} skipped)")
+        for future in pending:
+            collect(future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    imported.sort()
+    skipped.sort()
+    elapsed = time.perf_counter() - start
+    info(f"✅ Imported {len(imported)} sessions ({rows} rows) into {out_dir} in {elapsed:.1f}s"
+         + (f", skipped {len(skipped)} existing" if skipped else ""))
+    return {'imported': imported, 'skipped': skipped, 'rows': rows, 'elapsed_s': elapsed}
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Import a server /api/dataset export into loader sessions.")
+    p.add_argument("source", help="Export file (.json/.json.gz) or http(s) URL of /ml-ready or /export")
+    p.add_argument("out_dir", help="Directory for <session>_metadata.json and <session>_columns/")
+    p.add_argument("--workers", type=int, default=None, help="Converter processes (default: CPUs, max 8)")
+    p.add_argument("--overwrite", action="store_true", help="Re-import sessions that already exist")
+    p.add_argument("--limit", type=int, default=None, help="Only import the first N sessions")
+    args = p.parse_args()
+    log_to_stdout()
+
+    import_server_export(args.source, args.out_dir, workers=args.workers, overwrite=args.overwrite,
+                         limit=args.limit)
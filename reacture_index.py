@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+ReActure Session Indexes
+========================
+
+Lookup structures built over a session's columns.
+
+``TimeIndex`` keeps a sorted copy of a timestamp column and answers
+point and range queries with ``np.searchsorted`` (O(log N) per query,
+vectorised over arrays of queries).
+
+Usage:
+    from reacture_index import TimeIndex
+
+    index = TimeIndex(dataset.column('time_elapsed_s'))
+    rows = index.lookup([1.0, 2.5, 7.25], mode='nearest')
+    lo, hi = index.range_bounds([0.0, 10.0], [5.0, 15.0])
+"""
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MATCH_MODES = ('nearest', 'floor', 'ceil')
+
+# Row selector returned for ranges: a slice when rows are already in time
+# order (zero-copy for column views), otherwise an index array.
+RowSelector = Union[slice, np.ndarray]
+
+
+class TimeIndex:
+    """
+    Sorted timestamp index for binary-search lookups.
+
+    Rows with NaN timestamps are excluded. When the column is already
+    non-decreasing (the normal case for recorded sessions) no permutation
+    is stored and range queries map straight to slices.
+
+    Attributes:
+        times: Timestamps in sorted order
+        order: Row index of each sorted entry, or None if rows are already sorted
+        num_rows: Rows of the indexed column (including NaN rows)
+    """
+
+    def __init__(self, times: Sequence[float]):
+        times = np.asarray(times, dtype=np.float64)
+        self.num_rows = len(times)
+        valid = ~np.isnan(times)
+        if valid.all() and (len(times) < 2 or np.all(times[1:] >= times[:-1])):
+            self.times = times
+            self.order = None
+        else:
+            rows = np.flatnonzero(valid)
+            self.order = rows[np.argsort(times[rows], kind='stable')]
+            self.times = times[self.order]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def extend(self, times: Sequence[float]) -> 'TimeIndex':
+        """
+        Index rows appended to the column (for sessions that are still growing).
+
+        Only rows past ``num_rows`` are examined: appending in time order
+        keeps the index monotonic at O(new rows); out-of-order rows are
+        merged into the permutation instead.
+
+        Args:
+            times: The whole column, with its first ``num_rows`` entries unchanged
+
+        Returns:
+            self
+        """
+        times = np.asarray(times, dtype=np.float64)
+        new = times[self.num_rows:]
+        if (self.order is None and not np.isnan(new).any()
+                and (len(new) < 2 or np.all(new[1:] >= new[:-1]))
+                and (len(self.times) == 0 or len(new) == 0 or new[0] >= self.times[-1])):
+            self.times = times
+        else:
+            order = np.arange(self.num_rows) if self.order is None else self.order
+            rows = np.flatnonzero(~np.isnan(new))
+            rows = rows[np.argsort(new[rows], kind='stable')]
+            # side='right' keeps earlier rows first among equal times
+            positions = np.searchsorted(self.times, new[rows], side='right')
+            self.times = np.insert(self.times, positions, new[rows])
+            self.order = np.insert(order, positions, rows + self.num_rows)
+        self.num_rows = len(times)
+        return self
+
+    @property
+    def is_monotonic(self) -> bool:
+        """True if row order is time order (ranges become slices)."""
+        return self.order is None
+
+    def _rows(self, positions: np.ndarray) -> np.ndarray:
+        return positions if self.order is None else self.order[positions]
+
+    def lookup(self, query_times, mode: str = 'nearest',
+               tolerance: Optional[float] = None) -> np.ndarray:
+        """
+        Match query times to rows.
+
+        Args:
+            query_times: Scalar or array of times (same unit as the index)
+            mode: 'nearest', 'floor' (last time <= query) or
+                'ceil' (first time >= query); nearest ties go to the earlier row
+            tolerance: Maximum allowed |time - query|; farther matches are -1
+
+        Returns:
+            int64 array of row indices, -1 where there is no match
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"mode must be one of {MATCH_MODES}, got {mode!r}")
+
+        queries = np.asarray(query_times, dtype=np.float64)
+        n = len(self.times)
+        if n == 0:
+            return np.full(queries.shape, -1, dtype=np.int64)
+
+        if mode == 'floor':
+            pos = np.searchsorted(self.times, queries, side='right') - 1
+            found = pos >= 0
+        elif mode == 'ceil':
+            pos = np.searchsorted(self.times, queries, side='left')
+            found = pos < n
+        else:
+            right = np.clip(np.searchsorted(self.times, queries, side='left'), 0, n - 1)
+            left = np.clip(right - 1, 0, n - 1)
+            take_left = np.abs(queries - self.times[left]) <= np.abs(self.times[right] - queries)
+            pos = np.where(take_left, left, right)
+            found = np.ones(queries.shape, dtype=bool)
+
+        pos = np.clip(pos, 0, n - 1)
+        if tolerance is not None:
+            found &= np.abs(self.times[pos] - queries) <= tolerance
+        found &= ~np.isnan(queries)
+        return np.where(found, self._rows(pos), -1).astype(np.int64)
+
+    def range_bounds(self, starts, ends) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions in sorted order covering ``start <= t <= end`` for each pair.
+
+        Args:
+            starts: Scalar or array of range starts
+            ends: Scalar or array of range ends (inclusive)
+
+        Returns:
+            Tuple of (lo, hi) int64 arrays; entries ``lo:hi`` of ``times`` match
+        """
+        lo = np.searchsorted(self.times, np.asarray(starts, dtype=np.float64), side='left')
+        hi = np.searchsorted(self.times, np.asarray(ends, dtype=np.float64), side='right')
+        return lo.astype(np.int64), np.maximum(hi, lo).astype(np.int64)
+
+    def range_rows(self, start: float, end: float) -> RowSelector:
+        """
+        Rows with ``start <= t <= end``.
+
+        Returns:
+            A slice if the index is monotonic, otherwise a sorted row index array
+        """
+        lo, hi = self.range_bounds(start, end)
+        lo, hi = int(lo), int(hi)
+        if self.order is None:
+            return slice(lo, hi)
+        return np.sort(self.order[lo:hi])
+
+    def ranges(self, pairs) -> List[RowSelector]:
+        """
+        Batched ``range_rows`` for an (M, 2) array of ``(start, end)`` pairs.
+
+        Returns:
+            List of M row selectors (slices when monotonic)
+        """
+        pairs = np.asarray(pairs, dtype=np.float64).reshape(-1, 2)
+        lo, hi = self.range_bounds(pairs[:, 0], pairs[:, 1])
+        if self.order is None:
+            return [slice(a, b) for a, b in zip(lo.tolist(), hi.tolist())]
+        return [np.sort(self.order[a:b]) for a, b in zip(lo.tolist(), hi.tolist())]
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+ReActure Legacy Frame Ingest
+============================
+
+Convert a legacy ``<session>_frames.json`` manifest (one base64
+``data_base64`` blob per frame, as written by ``generateFramesManifest``
+in ``game.js``) into ``<session>_frames.npy`` plus ``_timestamps.npy``.
+
+The manifest is never loaded whole: entries are decoded one at a time
+from a sliding text buffer (``iter_json_array``, also used by
+``reacture_import`` for server exports), frames are gathered into chunks and each
+chunk is base64-decoded by a worker process straight into a preallocated,
+memory-mapped (N, H, W, C) uint8 output. Memory use is bounded by the
+read block plus the chunks in flight, whatever the manifest's size.
+
+``ReActureDataset`` runs the conversion on first load when a session has
+a manifest but no ``_frames.npy``/``_frames.rfz``.
+
+Usage:
+    from reacture_ingest import ingest_frames_json
+
+    report = ingest_frames_json('reacture_1731177600000_frames.json', workers=8)
+
+    # CLI
+    python reacture_ingest.py reacture_1731177600000_frames.json --workers 8
+"""
+
+import argparse
+import base64
+import gzip
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from reacture_instrument import info, log_to_stdout
+
+# Characters of manifest text read per block
+DEFAULT_READ_CHARS = 4 << 20
+
+# Frames decoded per worker task
+DEFAULT_INGEST_CHUNK_FRAMES = 64
+
+_DATA_KEY = b'"data_base64"'
+
+
+def find_frames_manifest(base_path, session_id: str) -> Optional[Path]:
+    """``<session>_frames.json`` if the session has one."""
+    path = Path(base_path) / f"{session_id}_frames.json"
+    return path if path.exists() else None
+
+
+def count_manifest_frames(path, read_bytes: int = DEFAULT_READ_CHARS) -> int:
+    """Number of ``data_base64`` entries, counted on raw bytes without parsing."""
+    count = 0
+    overlap = len(_DATA_KEY) - 1
+    with open(path, 'rb') as f:
+        tail = b''
+        while True:
+            block = f.read(read_bytes)
+            if not block:
+                return count
+            data = tail + block
+            count += data.count(_DATA_KEY)
+            # Too short to hold a whole key, so nothing is counted twice
+            tail = data[-overlap:]
+
+
+def _open_text(source):
+    """Open a JSON source for text reading: a path (optionally ``.gz``) or an http(s) URL."""
+    if isinstance(source, str) and source.startswith(('http://', 'https://')):
+        from urllib.request import urlopen
+        return io.TextIOWrapper(urlopen(source), encoding='utf-8')
+    if Path(source).suffix == '.gz':
+        return gzip.open(source, 'rt', encoding='utf-8')
+    return open(source, 'r', encoding='utf-8')
+
+
+class _JsonStream:
+    """Decodes one JSON value at a time from a sliding text buffer."""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, f, read_chars: int):
+        self.f = f
+        self.read_chars = read_chars
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        # Reads at least as much as is buffered, so retrying a large value stays linear
+        block = self.f.read(max(self.read_chars, len(self.buffer) - self.pos))
+        if not block:
+            return False
+        self.buffer, self.pos = self.buffer[self.pos:] + block, 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON input, got {char or 'end of input'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next block
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(source, keys: Optional[Sequence[str]] = None,
+                    read_chars: int = DEFAULT_READ_CHARS) -> Iterator:
+    """
+    Decode the items of a JSON array one at a time.
+
+    Args:
+        source: Path (optionally ``.gz``) or http(s) URL
+        keys: If given and the input is an object, the array is the value of
+            the first of these top-level keys (other values are skipped)
+        read_chars: Characters read per block
+
+    Yields:
+        Array items, in order
+    """
+    with _open_text(source) as f:
+        stream = _JsonStream(f, read_chars)
+        if keys is not None and stream.peek() != '[':
+            stream.expect('{')
+            while True:
+                if stream.peek() == '}':
+                    raise KeyError(f"{source}: no top-level {' or '.join(keys)} array")
+                name = stream.value()
+                stream.expect(':')
+                if name in keys:
+                    break
+                stream.value()
+                if stream.expect(',}') == '}':
+                    raise KeyError(f"{source}: no top-level {' or '.join(keys)} array")
+        stream.expect('[')
+        if stream.peek() == ']':
+            return
+        while True:
+            yield stream.value()
+            if stream.expect(',]') == ']':
+                return
+
+
+def iter_manifest_entries(path, read_chars: int = DEFAULT_READ_CHARS) -> Iterator[Dict]:
+    """Decode the entries of a ``frames.json`` manifest one at a time."""
+    return iter_json_array(path, read_chars=read_chars)
+
+
+def _entry_shape(entry: Dict) -> Tuple[int, ...]:
+    shape = entry.get('shape')
+    if shape is None:
+        shape = [entry['height'], entry['width'], 3]
+    return tuple(int(dim) for dim in shape)
+
+
+def _decode_into(frames_path: str, start: int, blobs: List[str]) -> int:
+    """Worker: base64-decode consecutive frames into the output map."""
+    frames = np.load(frames_path, mmap_mode='r+')
+    frame_nbytes = frames[0].nbytes
+    for i, blob in enumerate(blobs):
+        data = base64.b64decode(blob)
+        if len(data) != frame_nbytes:
+            raise ValueError(f"Frame {start + i} decodes to {len(data)} bytes, "
+                             f"expected {frame_nbytes}")
+        frames[start + i] = np.frombuffer(data, dtype=np.uint8).reshape(frames.shape[1:])
+    frames.flush()
+    del frames
+    return len(blobs)
+
+
+def _submit(pool: Optional[ProcessPoolExecutor], pending: set, frames_path: Path, start: int,
+            blobs: List[str], max_in_flight: int) -> int:
+    """Decode a chunk (inline without a pool); returns frames finished meanwhile."""
+    if pool is None:
+        return _decode_into(str(frames_path), start, blobs)
+    finished = 0
+    if len(pending) >= max_in_flight:
+        done, rest = wait(pending, return_when=FIRST_COMPLETED)
+        pending.clear()
+        pending.update(rest)
+        finished = sum(future.result() for future in done)
+    pending.add(pool.submit(_decode_into, str(frames_path), start, blobs))
+    return finished
+
+
+def ingest_frames_json(manifest_path, frames_path=None, timestamps_path=None,
+                       chunk_frames: int = DEFAULT_INGEST_CHUNK_FRAMES, workers: Optional[int] = None,
+                       overwrite: bool = False, progress_every: float = 2.0) -> Dict:
+    """
+    Convert a base64 frame manifest into ``_frames.npy`` and ``_timestamps.npy``.
+
+    Args:
+        manifest_path: ``<session>_frames.json``
+        frames_path: Output frames (default: ``<session>_frames.npy`` beside the manifest)
+        timestamps_path: Output timestamps (default: ``<session>_timestamps.npy``);
+            an existing file is kept unless ``overwrite``
+        chunk_frames: Frames per decode task
+        workers: Decoder processes (default: CPUs, max 8; 0 or 1 decodes inline)
+        overwrite: Replace an existing frames file
+        progress_every: Seconds between progress messages
+
+    Returns:
+        Dict with 'frames', 'shape', 'frames_path', 'timestamps_path' and 'elapsed_s'
+    """
+    manifest_path = Path(manifest_path)
+    session_id = manifest_path.name.split('_frames.json')[0]
+    frames_path = Path(frames_path or manifest_path.with_name(f"{session_id}_frames.npy"))
+    timestamps_path = Path(timestamps_path or manifest_path.with_name(f"{session_id}_timestamps.npy"))
+    if frames_path.exists() and not overwrite:
+        raise FileExistsError(f"{frames_path} exists (use --overwrite to replace).")
+
+    start_time = last_report = time.perf_counter()
+    count = count_manifest_frames(manifest_path)
+    if count == 0:
+        raise ValueError(f"{manifest_path} holds no frames")
+    workers = min(8, os.cpu_count() or 1) if workers is None else workers
+
+    entries = iter_manifest_entries(manifest_path)
+    first = next(entries)
+    frame_shape = _entry_shape(first)
+    if first.get('dtype', 'uint8') != 'uint8':
+        raise ValueError(f"Only uint8 frames are supported, got {first['dtype']}")
+    shape = (count,) + frame_shape
+
+    tmp_path = frames_path.with_name(frames_path.name + f".tmp{os.getpid()}")
+    np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=shape).flush()
+    timestamps = np.full(count, np.nan, dtype=np.float32)
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = set()
+    decoded = 0
+    try:
+        blobs: List[str] = []
+        for i, entry in enumerate(itertools.chain([first], entries)):
+            if i >= count:
+                raise ValueError(f"{manifest_path}: more entries than data_base64 keys")
+            if _entry_shape(entry) != frame_shape:
+                raise ValueError(f"Frame {i} has shape {_entry_shape(entry)}, expected {frame_shape}")
+            if entry.get('timestamp_ms') is not None:
+                timestamps[i] = entry['timestamp_ms']
+            if not isinstance(entry.get('data_base64'), str):
+                raise ValueError(f"Frame {i} has no data_base64 blob")
+            blobs.append(entry['data_base64'])
+            if len(blobs) < chunk_frames:
+                continue
+            decoded += _submit(pool, pending, tmp_path, i + 1 - len(blobs), blobs, 2 * workers)
+            blobs = []
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                last_report = now
+                info(f"🗃️  Decoded {decoded}/{count} frames "
+                     f"({decoded / max(now - start_time, 1e-9):.0f} frames/s)")
+        if blobs:
+            decoded += _submit(pool, pending, tmp_path, count - len(blobs), blobs, 2 * workers)
+        decoded += sum(future.result() for future in pending)
+        if decoded != count:
+            raise ValueError(f"{manifest_path}: {decoded} entries but {count} data_base64 keys")
+    except BaseException:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if pool is not None:
+        pool.shutdown()
+    os.replace(tmp_path, frames_path)
+
+    wrote_timestamps = None
+    if not np.isnan(timestamps).all() and (overwrite or not timestamps_path.exists()):
+        tmp_ts = timestamps_path.with_name(timestamps_path.name + f".tmp{os.getpid()}")
+        with open(tmp_ts, 'wb') as f:
+            np.lib.format.write_array(f, timestamps, allow_pickle=False)
+        os.replace(tmp_ts, timestamps_path)
+        wrote_timestamps = timestamps_path
+
+    elapsed = time.perf_counter() - start_time
+    info(f"✅ Converted {count} frames {shape} into {frames_path.name} in {elapsed:.1f}s")
+    return {
+        'frames': count,
+        'shape': shape,
+        'frames_path': frames_path,
+        'timestamps_path': wrote_timestamps,
+        'elapsed_s': elapsed,
+    }
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Convert legacy base64 frames.json manifests to frames.npy.")
+    p.add_argument("manifests", nargs="+", help="Paths to <session>_frames.json files")
+    p.add_argument("--workers", type=int, default=None, help="Decoder processes (default: CPUs, max 8)")
+    p.add_argument("--chunk-frames", type=int, default=DEFAULT_INGEST_CHUNK_FRAMES,
+                   help=f"Frames per decode task (default: {DEFAULT_INGEST_CHUNK_FRAMES})")
+    p.add_argument("--overwrite", action="store_true", help="Replace existing frames/timestamps files")
+    args = p.parse_args()
+    log_to_stdout()
+
+    for manifest in args.manifests:
+        report = ingest_frames_json(manifest, chunk_frames=args.chunk_frames, workers=args.workers,
+                                    overwrite=args.overwrite)
+        print(f"{manifest}: {report['frames']} frames {report['shape']} -> {report['frames_path']}")
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+ReActure Multi-Session Loading
+==============================
+
+Load many sessions at once behind a single global sample index.
+
+Sessions are compiled (column cache + frame alignment) in a process pool;
+the parent then opens each one from its cache, which is only a few
+memory-mapped ``np.load`` calls. Global indices map to ``(session, sample)``
+through cumulative offsets with a binary search (O(log S)).
+
+Usage:
+    from reacture_multi import MultiSessionDataset
+
+    corpus = MultiSessionDataset.from_directory('datasets/', processes=8)
+    print(corpus.report)                   # loaded / failed sessions
+    sample = corpus[123456]                # sample dict + 'session_id'
+
+    # One disjoint subset of sessions per rank (distributed training)
+    shard = corpus.shard(rank, world_size)
+"""
+
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from load_reacture_dataset import ReActureDataset
+from reacture_events import EventIndex, StratifiedSampler
+from reacture_instrument import LoadStats, logger
+from reacture_spatial import DEFAULT_CELL_SIZE, SpatialIndex, index_sessions
+
+METADATA_PATTERN = '*_metadata.json'
+
+
+def discover_sessions(roots: Union[str, Path, Sequence[Union[str, Path]]],
+                      pattern: str = METADATA_PATTERN, recursive: bool = True) -> List[Path]:
+    """
+    Find session metadata files.
+
+    Args:
+        roots: Directory (or list of directories / metadata files)
+        pattern: Glob for metadata files
+        recursive: Search subdirectories
+
+    Returns:
+        Sorted list of metadata paths (sorted order makes sharding deterministic)
+    """
+    if isinstance(roots, (str, Path)):
+        roots = [roots]
+    found = set()
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            found.add(root)
+        else:
+            found.update(root.rglob(pattern) if recursive else root.glob(pattern))
+    return sorted(found)
+
+
+class SessionLoadFailure(NamedTuple):
+    """A session that could not be loaded."""
+    path: str
+    error: str
+    traceback: str
+
+
+class LoadReport(NamedTuple):
+    """Outcome of loading a set of sessions."""
+    loaded: List[str]
+    failed: List[SessionLoadFailure]
+    elapsed_s: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __str__(self) -> str:
+        lines = [f"Loaded {len(self.loaded)} sessions, {len(self.failed)} failed "
+                 f"in {self.elapsed_s:.1f}s"]
+        lines += [f"  ⚠️  {failure.path}: {failure.error}" for failure in self.failed]
+        return '\n'.join(lines)
+
+
+def _prepare_session(metadata_path: str, dataset_kwargs: Dict) -> Tuple[str, Optional[str], str]:
+    """Worker: build the session's caches so the parent can open them cheaply."""
+    try:
+        dataset = ReActureDataset(metadata_path, **dataset_kwargs)
+        dataset.sample_frame_index  # builds and caches the frame alignment
+        return metadata_path, None, ''
+    except Exception as e:
+        return metadata_path, f"{type(e).__name__}: {e}", traceback.format_exc()
+
+
+def load_sessions(metadata_paths: Sequence[Union[str, Path]], processes: Optional[int] = None,
+                  **dataset_kwargs) -> Tuple[List[ReActureDataset], LoadReport]:
+    """
+    Load sessions, compiling their caches in parallel.
+
+    Args:
+        metadata_paths: Session metadata files
+        processes: Worker processes for compilation (None: CPU count,
+            0 or 1: compile in this process)
+        **dataset_kwargs: Passed to ReActureDataset
+
+    Returns:
+        Tuple of (datasets in input order, LoadReport)
+    """
+    start = time.perf_counter()
+    paths = [str(path) for path in metadata_paths]
+    errors: Dict[str, SessionLoadFailure] = {}
+
+    if dataset_kwargs.get('use_cache', True) and len(paths) > 1 and processes not in (0, 1):
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(_prepare_session, path, dataset_kwargs) for path in paths]
+            for future in as_completed(futures):
+                path, error, trace = future.result()
+                if error is not None:
+                    errors[path] = SessionLoadFailure(path, error, trace)
+
+    datasets, loaded = [], []
+    for path in paths:
+        if path in errors:
+            continue
+        try:
+            datasets.append(ReActureDataset(path, **dataset_kwargs))
+            loaded.append(path)
+        except Exception as e:
+            errors[path] = SessionLoadFailure(path, f"{type(e).__name__}: {e}",
+                                              traceback.format_exc())
+
+    failed = [errors[path] for path in paths if path in errors]
+    return datasets, LoadReport(loaded, failed, time.perf_counter() - start)
+
+
+class MultiSessionDataset:
+    """
+    Many ReActure sessions behind one global sample index.
+
+    Attributes:
+        sessions: Loaded ReActureDataset objects, in sorted path order
+        offsets: int64 array (S + 1,) of cumulative sample counts
+        report: LoadReport from construction
+    """
+
+    def __init__(self, metadata_paths: Sequence[Union[str, Path]], processes: Optional[int] = None,
+                 **dataset_kwargs):
+        """
+        Args:
+            metadata_paths: Session metadata files
+            processes: Worker processes used to compile session caches
+            **dataset_kwargs: Passed to each ReActureDataset
+        """
+        sessions, report = load_sessions(sorted(str(p) for p in metadata_paths),
+                                         processes=processes, **dataset_kwargs)
+        self._set_sessions(sessions)
+        self.report = report
+        for failure in report.failed:
+            logger.warning(f"⚠️  Failed to load {failure.path}: {failure.error}")
+
+    @classmethod
+    def from_directory(cls, root, pattern: str = METADATA_PATTERN, recursive: bool = True,
+                       processes: Optional[int] = None, **dataset_kwargs) -> 'MultiSessionDataset':
+        """Discover ``*_metadata.json`` files under ``root`` and load them."""
+        return cls(discover_sessions(root, pattern, recursive), processes=processes, **dataset_kwargs)
+
+    @classmethod
+    def from_sessions(cls, sessions: Sequence[ReActureDataset],
+                      report: Optional[LoadReport] = None) -> 'MultiSessionDataset':
+        """Wrap already-loaded sessions without reloading them."""
+        corpus = cls.__new__(cls)
+        corpus._set_sessions(list(sessions))
+        corpus.report = report or LoadReport([str(s.session_id) for s in sessions], [], 0.0)
+        return corpus
+
+    @classmethod
+    def from_pack(cls, pack_dir, sessions: Optional[Sequence[Union[int, str]]] = None
+                  ) -> 'MultiSessionDataset':
+        """Open sessions from a packed shard directory (see ``reacture_pack``)."""
+        from reacture_pack import PackReader
+
+        return PackReader(pack_dir).open_corpus(sessions)
+
+    def _set_sessions(self, sessions: List[ReActureDataset]):
+        self.sessions = sessions
+        counts = np.array([len(session) for session in sessions], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._spatial = None
+        self._event_index = None
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def session_ids(self) -> List[str]:
+        return [session.session_id for session in self.sessions]
+
+    @property
+    def load_stats(self) -> LoadStats:
+        """Load timings and counters of every session, merged."""
+        return LoadStats.combine(session.load_stats for session in self.sessions)
+
+    def locate(self, indices) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map global sample indices to (session index, local sample index).
+
+        Args:
+            indices: Scalar or array of global indices (negative allowed)
+
+        Returns:
+            Tuple of int64 arrays (session, local)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        total = len(self)
+        if indices.size and (indices.min() < -total or indices.max() >= total):
+            raise IndexError(f"Index out of range for {total} samples")
+        indices = np.where(indices < 0, indices + total, indices)
+        session = np.searchsorted(self.offsets, indices, side='right') - 1
+        return session, indices - self.offsets[session]
+
+    def __getitem__(self, idx: int) -> Dict:
+        return self.get_sample(idx)
+
+    def get_sample(self, idx: int, parse_jsonl: bool = True) -> Dict:
+        """Sample ``idx`` with its 'session_id' (see ``ReActureDataset.get_sample``)."""
+        session, local = self.locate(idx)
+        dataset = self.sessions[int(session)]
+        sample = dataset.get_sample(int(local), parse_jsonl=parse_jsonl)
+        sample['session_id'] = dataset.session_id
+        return sample
+
+    def __iter__(self):
+        for dataset in self.sessions:
+            for sample in dataset:
+                sample['session_id'] = dataset.session_id
+                yield sample
+
+    @property
+    def frame_shape(self) -> Tuple[int, ...]:
+        shapes = {session.frame_shape for session in self.sessions}
+        if len(shapes) > 1:
+            raise ValueError(f"Sessions have different frame shapes: {sorted(shapes)}")
+        return shapes.pop() if shapes else (128, 128, 3)
+
+    def get_batch(self, indices, fields: Optional[List[str]] = None,
+                  include_frames: bool = True, victims_k: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Gather a batch across sessions (one ``get_batch`` call per session touched).
+
+        Returns:
+            Same layout as ``ReActureDataset.get_batch`` plus 'session' (B,) int64
+        """
+        if isinstance(indices, slice):
+            indices = np.arange(len(self))[indices]
+        session, local = self.locate(np.asarray(indices).reshape(-1))
+
+        batch = None
+        for s in np.unique(session):
+            rows = np.flatnonzero(session == s)
+            part = self.sessions[s].get_batch(local[rows], fields=fields,
+                                              include_frames=include_frames, victims_k=victims_k)
+            if batch is None:
+                batch = {name: np.empty((len(session),) + array.shape[1:], dtype=array.dtype)
+                         for name, array in part.items()}
+            for name, array in part.items():
+                batch[name][rows] = array
+
+        if batch is None:
+            batch = (self.sessions[0].get_batch([], fields=fields, include_frames=include_frames,
+                                                victims_k=victims_k)
+                     if self.sessions else {})
+        batch['session'] = session
+        return batch
+
+    def prefetch(self, batch_size: Optional[int] = None, workers: int = 2, **kwargs):
+        """Iterate all sessions with read-ahead across session boundaries (see ``reacture_prefetch``)."""
+        from reacture_prefetch import prefetch
+
+        return prefetch(self, batch_size=batch_size, workers=workers, **kwargs)
+
+    def shard(self, rank: int, world_size: int, seed: Optional[int] = None) -> 'MultiSessionDataset':
+        """
+        Deterministic subset of sessions for one rank (or rank x worker).
+
+        Sessions are assigned whole, round-robin over sorted session order
+        (optionally permuted with ``seed``, identically on every rank), so
+        shards are disjoint and together cover the corpus.
+
+        Args:
+            rank: Shard index in [0, world_size); for per-worker shards use
+                ``rank * num_workers + worker_id`` with ``world_size * num_workers``
+            world_size: Number of shards
+            seed: Optional permutation seed (same value on every rank)
+
+        Returns:
+            MultiSessionDataset over this shard's sessions
+        """
+        if not 0 <= rank < world_size:
+            raise ValueError(f"rank must be in [0, {world_size}), got {rank}")
+        order = np.arange(len(self.sessions))
+        if seed is not None:
+            order = np.random.default_rng(seed).permutation(order)
+        mine = [self.sessions[i] for i in order[rank::world_size]]
+        return MultiSessionDataset.from_sessions(mine, self.report)
+
+    def event_index(self) -> EventIndex:
+        """Event index over global sample indices, merged from the per-session indexes."""
+        if self._event_index is None:
+            parts = [session.event_index() for session in self.sessions]
+            self._event_index = EventIndex.combine(parts, self.offsets[:-1])
+        return self._event_index
+
+    def stratified_sampler(self, strata='event', weights=None, batch_size: int = 32,
+                           **kwargs) -> StratifiedSampler:
+        """
+        Balanced (or weighted) batch sampler over event strata of all sessions.
+
+        Context windows are clipped at session boundaries. See
+        ``ReActureDataset.stratified_sampler`` for the arguments.
+        """
+        return StratifiedSampler(self.event_index(), strata, weights=weights,
+                                 batch_size=batch_size, bounds=self.offsets, **kwargs)
+
+    def spatial_index(self, path=None, cell_size: float = DEFAULT_CELL_SIZE) -> SpatialIndex:
+        """
+        Grid index over ``robot.position`` of every session (see ``reacture_spatial``).
+
+        With ``path``, the index saved there is reopened and only new or
+        changed sessions are indexed before it is saved again. The result is
+        kept for the spatial query methods below.
+
+        Args:
+            path: Index directory shared between runs (None: in memory only)
+            cell_size: Grid cell edge length in metres
+
+        Returns:
+            SpatialIndex; its session numbers map to ``self.sessions`` via
+            the query methods, not directly
+        """
+        index, mapping = index_sessions(self.sessions, path=path, cell_size=cell_size)
+        self._spatial = (index, mapping)
+        return index
+
+    def _spatial_state(self) -> Tuple[SpatialIndex, np.ndarray]:
+        if self._spatial is None:
+            self.spatial_index()
+        return self._spatial
+
+    @staticmethod
+    def _spatial_results(mapping: np.ndarray, session: np.ndarray, *arrays) -> Tuple[np.ndarray, ...]:
+        # Index session numbers -> positions in self.sessions, dropping foreign sessions
+        session = mapping[session]
+        keep = session >= 0
+        return (session[keep],) + tuple(array[keep] for array in arrays)
+
+    def samples_near(self, center, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples of every session within ``radius`` of ``center``.
+
+        Returns:
+            Tuple of int64 arrays (session, sample), sorted by session then sample
+        """
+        index, mapping = self._spatial_state()
+        return self._spatial_results(mapping, *index.radius(center, radius))
+
+    def samples_in_box(self, lo, hi) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples of every session with ``lo <= position <= hi`` on every axis.
+
+        Returns:
+            Tuple of int64 arrays (session, sample), sorted by session then sample
+        """
+        index, mapping = self._spatial_state()
+        return self._spatial_results(mapping, *index.box(lo, hi))
+
+    def nearest_samples(self, point, k: int = 1, max_distance: Optional[float] = None
+                        ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The ``k`` samples closest to ``point`` across all sessions.
+
+        Returns:
+            Tuple of (session, sample, distance) arrays, nearest first
+        """
+        index, mapping = self._spatial_state()
+        if len(mapping) and (mapping < 0).any():
+            # Index shared with sessions outside this corpus: over-fetch, then filter
+            fetch = k
+            while True:
+                session, rows, distance = self._spatial_results(
+                    mapping, *index.nearest(point, k=fetch, max_distance=max_distance))
+                if len(session) >= k or fetch >= len(index):
+                    return session[:k], rows[:k], distance[:k]
+                fetch *= 4
+        return self._spatial_results(mapping, *index.nearest(point, k=k, max_distance=max_distance))
+
+    def compute_statistics(self, processes: Optional[int] = None, include_frames: bool = True,
+                           use_cache: bool = True):
+        """Corpus statistics merged from per-session results (see ``reacture_stats``)."""
+        from reacture_stats import corpus_statistics
+
+        return corpus_statistics(self.sessions, processes=processes,
+                                 include_frames=include_frames, use_cache=use_cache)
+
+    def to_pytorch_dataloader(self, batch_size: int = 32, shuffle: bool = True, **kwargs):
+        """PyTorch DataLoader over all sessions (see ``ReActureDataset.to_pytorch_dataloader``)."""
+        try:
+            from reacture_torch import make_dataloader
+        except ImportError:
+            raise ImportError("PyTorch not installed. Install with: pip install torch")
+        return make_dataloader(self, batch_size=batch_size, shuffle=shuffle, **kwargs)
+
+    def to_tensorflow_dataset(self, batch_size: int = 32, shuffle: bool = True, **kwargs):
+        """Interleaved tf.data pipeline over all sessions (see ``reacture_tf.make_tf_dataset``)."""
+        try:
+            from reacture_tf import make_tf_dataset
+        except ImportError:
+            raise ImportError("TensorFlow not installed. Install with: pip install tensorflow")
+        return make_tf_dataset(self.sessions, batch_size=batch_size, shuffle=shuffle, **kwargs)
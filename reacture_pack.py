@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+ReActure Packed Session Shards
+==============================
+
+Pack many sessions into a few large shard files so a corpus opens with a
+handful of ``open()`` calls instead of five-plus files per session.
+
+Layout:
+
+    packs/train/
+    ├── sessions.json       # format version, block names, per-session metadata
+    ├── index.npy           # block table: (session, block, shard, offset, shape, ...)
+    ├── shard_00000.rpk     # raw, aligned array blocks of many sessions
+    └── shard_00001.rpk
+
+Each session contributes one block per column group plus its frame
+alignment, frame timestamps and frames. Blocks are raw little-endian
+arrays at aligned offsets, so a reader maps each shard once and every
+``(session, sample)`` access is an offset computation into that map.
+
+Usage:
+    # Convert sessions (CLI)
+    python reacture_pack.py packs/train datasets/ --shard-size-gb 4 --processes 8
+
+    # Read
+    from reacture_pack import PackReader
+    pack = PackReader('packs/train')
+    dataset = pack.open_session('reacture_1731177600000')
+    corpus = pack.open_corpus()            # MultiSessionDataset over every session
+"""
+
+import json
+import os
+import shutil
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from load_reacture_dataset import ReActureDataset
+from reacture_columns import SessionColumns
+from reacture_frames import FrameStore
+from reacture_instrument import info, log_to_stdout
+
+PACK_FORMAT_VERSION = 4
+SESSIONS_FILE = 'sessions.json'
+INDEX_FILE = 'index.npy'
+SHARD_TEMPLATE = 'shard_{:05d}.rpk'
+
+DEFAULT_SHARD_BYTES = 4 << 30
+
+# Column blocks are cache-line aligned; frame blocks are page aligned
+COLUMN_ALIGNMENT = 64
+FRAME_ALIGNMENT = 4096
+
+# Frames are streamed into the shard in chunks of this many frames
+WRITE_CHUNK_FRAMES = 256
+
+FRAMES_BLOCK = 'frames'
+FRAME_TIMESTAMPS_BLOCK = 'frame_timestamps'
+FRAME_ALIGNMENT_BLOCK = 'frame_alignment'
+
+MAX_BLOCK_DIMS = 4
+
+BLOCK_DTYPE = np.dtype([
+    ('session', '<u4'),
+    ('block', '<u2'),
+    ('shard', '<u2'),
+    ('dtype', '<u1'),
+    ('ndim', '<u1'),
+    ('offset', '<u8'),
+    ('shape', '<i8', (MAX_BLOCK_DIMS,)),
+])
+
+
+def _align(offset: int, alignment: int) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class PackWriter:
+    """
+    Append sessions to a new pack directory.
+
+    Use as a context manager, or call ``close()`` to write the index.
+    """
+
+    def __init__(self, out_dir, shard_bytes: int = DEFAULT_SHARD_BYTES, overwrite: bool = False):
+        """
+        Args:
+            out_dir: Pack directory to create
+            shard_bytes: Start a new shard once the current one reaches this size
+            overwrite: Replace an existing pack directory
+        """
+        self.out_dir = Path(out_dir)
+        if (self.out_dir / SESSIONS_FILE).exists():
+            if not overwrite:
+                raise FileExistsError(f"{self.out_dir} already contains a pack (use overwrite=True).")
+            shutil.rmtree(self.out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        self.shard_bytes = shard_bytes
+        self.block_names: List[str] = []
+        self.dtypes: List[str] = []
+        self.shards: List[str] = []
+        self.sessions: List[Dict] = []
+        self.blocks: List[tuple] = []
+        self._file = None
+        self._offset = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _code(self, table: List[str], value: str) -> int:
+        if value not in table:
+            table.append(value)
+        return table.index(value)
+
+    def _roll_shard(self):
+        if self._file is not None:
+            self._file.close()
+        name = SHARD_TEMPLATE.format(len(self.shards))
+        self.shards.append(name)
+        self._file = open(self.out_dir / name, 'wb')
+        self._offset = 0
+
+    def _write_block(self, session: int, name: str, array: np.ndarray, alignment: int):
+        if array.ndim > MAX_BLOCK_DIMS:
+            raise ValueError(f"Block {name} has {array.ndim} dims (max {MAX_BLOCK_DIMS})")
+        dtype = np.dtype(array.dtype).newbyteorder('<') if array.dtype.itemsize > 1 else array.dtype
+
+        start = _align(self._offset, alignment)
+        self._file.write(b'\0' * (start - self._offset))
+        step = WRITE_CHUNK_FRAMES if array.ndim > 1 else max(len(array), 1)
+        for i in range(0, len(array), step):
+            chunk = np.ascontiguousarray(array[i:i + step], dtype=dtype)
+            self._file.write(memoryview(chunk).cast('B'))
+        self._offset = start + array.size * dtype.itemsize
+
+        shape = list(array.shape) + [0] * (MAX_BLOCK_DIMS - array.ndim)
+        self.blocks.append((session, self._code(self.block_names, name), len(self.shards) - 1,
+                            self._code(self.dtypes, dtype.str), array.ndim, start, shape))
+
+    def add_session(self, dataset: ReActureDataset):
+        """Append one loaded session (columns, frame alignment and frames)."""
+        if self._file is None or self._offset >= self.shard_bytes:
+            self._roll_shard()
+
+        session = len(self.sessions)
+        for name, array in dataset.columns.arrays.items():
+            self._write_block(session, name, np.asarray(array), COLUMN_ALIGNMENT)
+        self._write_block(session, FRAME_ALIGNMENT_BLOCK,
+                          np.asarray(dataset.sample_frame_index, dtype=np.int32), COLUMN_ALIGNMENT)
+        if dataset.frame_store is not None:
+            self._write_block(session, FRAME_TIMESTAMPS_BLOCK,
+                              np.asarray(dataset.frame_store.timestamps, dtype=np.float64),
+                              COLUMN_ALIGNMENT)
+            self._write_block(session, FRAMES_BLOCK, dataset.frame_store.array, FRAME_ALIGNMENT)
+
+        self.sessions.append({
+            'session_id': dataset.session_id,
+            'metadata': dataset.metadata,
+            'categories': dataset.columns.categories,
+            'num_rows': len(dataset),
+        })
+
+    def close(self):
+        """Flush the current shard and write the index files."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        blocks = np.array(self.blocks, dtype=BLOCK_DTYPE)
+        np.save(self.out_dir / INDEX_FILE, blocks, allow_pickle=False)
+        with open(self.out_dir / SESSIONS_FILE, 'w') as f:
+            json.dump({
+                'format_version': PACK_FORMAT_VERSION,
+                'block_names': self.block_names,
+                'dtypes': self.dtypes,
+                'shards': self.shards,
+                'sessions': self.sessions,
+            }, f)
+
+
+# Readers are cached per (pack, process) so reopening columns in a worker
+# doesn't re-read the index once per session.
+_READERS: Dict[tuple, 'PackReader'] = {}
+
+
+def _shared_reader(pack_dir: str) -> 'PackReader':
+    key = (pack_dir, os.getpid())
+    if key not in _READERS:
+        _READERS[key] = PackReader(pack_dir)
+    return _READERS[key]
+
+
+def _load_pack_columns(pack_dir: str, session: int) -> Dict[str, np.ndarray]:
+    return _shared_reader(pack_dir).column_arrays(session)
+
+
+class PackedFrameStore(FrameStore):
+    """Frames of one packed session, served from the shard's memory map."""
+
+    def __init__(self, pack_dir, session: int, shape, dtype):
+        self.pack_dir = str(pack_dir)
+        self.session = session
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def array(self) -> np.ndarray:
+        return _shared_reader(self.pack_dir).block(self.session, FRAMES_BLOCK)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return _shared_reader(self.pack_dir).block(self.session, FRAME_TIMESTAMPS_BLOCK)
+
+    @property
+    def has_timestamps_file(self) -> bool:
+        return True
+
+    def fingerprint(self) -> Dict:
+        return {'pack': self.pack_dir, 'session': self.session}
+
+    def __repr__(self) -> str:
+        return f"PackedFrameStore({self.pack_dir!r}, session={self.session}, shape={self.shape})"
+
+
+class PackReader:
+    """
+    Random access to sessions in a pack directory.
+
+    Opening a pack reads ``sessions.json`` and ``index.npy``; shard files are
+    memory-mapped on first use, once per process.
+
+    Attributes:
+        pack_dir: Pack directory
+        session_ids: Session ids in pack order
+    """
+
+    def __init__(self, pack_dir):
+        self.pack_dir = Path(pack_dir)
+        with open(self.pack_dir / SESSIONS_FILE, 'r') as f:
+            info = json.load(f)
+        if info.get('format_version') != PACK_FORMAT_VERSION:
+            raise ValueError(f"Unsupported pack format: {info.get('format_version')}")
+
+        self.block_names: List[str] = info['block_names']
+        self.dtypes = [np.dtype(code) for code in info['dtypes']]
+        self.shards: List[str] = info['shards']
+        self.sessions: List[Dict] = info['sessions']
+        self.session_ids = [entry['session_id'] for entry in self.sessions]
+        self._session_lookup = {sid: i for i, sid in enumerate(self.session_ids)}
+
+        self.blocks = np.load(self.pack_dir / INDEX_FILE, allow_pickle=False)
+        # Blocks are written session by session, so each session owns a contiguous range
+        self._block_starts = np.searchsorted(self.blocks['session'], np.arange(len(self.sessions) + 1))
+        self._block_ids = {name: i for i, name in enumerate(self.block_names)}
+        self._maps: Dict[int, np.memmap] = {}
+        self._pid = None
+
+        counts = np.array([entry['num_rows'] for entry in self.sessions], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_maps'] = {}
+        state['_pid'] = None
+        return state
+
+    def session_index(self, session: Union[int, str]) -> int:
+        """Position of a session given its id or position."""
+        if isinstance(session, (int, np.integer)):
+            if not 0 <= session < len(self.sessions):
+                raise IndexError(f"Session {session} out of range for {len(self.sessions)} sessions")
+            return int(session)
+        try:
+            return self._session_lookup[session]
+        except KeyError:
+            raise KeyError(f"Session not in pack: {session}") from None
+
+    def _shard_map(self, shard: int) -> np.memmap:
+        if self._pid != os.getpid():
+            self._maps = {}
+            self._pid = os.getpid()
+        if shard not in self._maps:
+            self._maps[shard] = np.memmap(self.pack_dir / self.shards[shard], dtype=np.uint8, mode='r')
+        return self._maps[shard]
+
+    def _session_blocks(self, session: int) -> np.ndarray:
+        return self.blocks[self._block_starts[session]:self._block_starts[session + 1]]
+
+    def _view(self, entry) -> np.ndarray:
+        dtype = self.dtypes[entry['dtype']]
+        shape = tuple(int(n) for n in entry['shape'][:entry['ndim']])
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        offset = int(entry['offset'])
+        return self._shard_map(int(entry['shard']))[offset:offset + nbytes].view(dtype).reshape(shape)
+
+    def has_block(self, session: int, name: str) -> bool:
+        block_id = self._block_ids.get(name)
+        return block_id is not None and bool((self._session_blocks(session)['block'] == block_id).any())
+
+    def block(self, session: int, name: str) -> np.ndarray:
+        """Zero-copy view of one block of a session."""
+        blocks = self._session_blocks(session)
+        match = np.flatnonzero(blocks['block'] == self._block_ids.get(name, -1))
+        if not len(match):
+            raise KeyError(f"Session {session} has no block {name!r}")
+        return self._view(blocks[match[0]])
+
+    def column_arrays(self, session: int) -> Dict[str, np.ndarray]:
+        """All column-group blocks of a session as views."""
+        special = {FRAMES_BLOCK, FRAME_TIMESTAMPS_BLOCK, FRAME_ALIGNMENT_BLOCK}
+        return {
+            self.block_names[entry['block']]: self._view(entry)
+            for entry in self._session_blocks(session)
+            if self.block_names[entry['block']] not in special
+        }
+
+    def open_session(self, session: Union[int, str], **kwargs) -> ReActureDataset:
+        """
+        Open one session as a ReActureDataset backed by shard views.
+
+        Args:
+            session: Session id or position
+            **kwargs: Passed to ``ReActureDataset._from_parts`` (e.g. frame_tolerance_ms)
+        """
+        i = self.session_index(session)
+        entry = self.sessions[i]
+        pack_dir = str(self.pack_dir)
+        _READERS.setdefault((pack_dir, os.getpid()), self)
+
+        columns = SessionColumns(self.column_arrays(i), entry['categories'],
+                                 loader=partial(_load_pack_columns, pack_dir, i))
+        frame_store = None
+        if self.has_block(i, FRAMES_BLOCK):
+            frames = self.block(i, FRAMES_BLOCK)
+            frame_store = PackedFrameStore(pack_dir, i, frames.shape, frames.dtype)
+        return ReActureDataset._from_parts(
+            entry['metadata'], entry['session_id'], columns, frame_store,
+            base_path=self.pack_dir,
+            sample_frame_index=self.block(i, FRAME_ALIGNMENT_BLOCK),
+            **kwargs,
+        )
+
+    def locate(self, indices) -> tuple:
+        """Map global sample indices to (session, local sample) arrays."""
+        indices = np.asarray(indices, dtype=np.int64)
+        session = np.searchsorted(self.offsets, indices, side='right') - 1
+        return session, indices - self.offsets[session]
+
+    def open_corpus(self, sessions: Optional[Iterable[Union[int, str]]] = None):
+        """Open (a subset of) the pack as a ``reacture_multi.MultiSessionDataset``."""
+        from reacture_multi import MultiSessionDataset
+
+        chosen = range(len(self.sessions)) if sessions is None else sessions
+        return MultiSessionDataset.from_sessions([self.open_session(s) for s in chosen])
+
+
+def pack_sessions(metadata_paths: Sequence[Union[str, Path]], out_dir,
+                  shard_bytes: int = DEFAULT_SHARD_BYTES, processes: Optional[int] = None,
+                  overwrite: bool = False):
+    """
+    Convert sessions into a pack directory.
+
+    Args:
+        metadata_paths: Session metadata files
+        out_dir: Pack directory to create
+        shard_bytes: Target shard size
+        processes: Worker processes used to compile session caches first
+        overwrite: Replace an existing pack
+
+    Returns:
+        ``reacture_multi.LoadReport`` for the sessions that were read
+    """
+    from reacture_multi import load_sessions
+
+    datasets, report = load_sessions(metadata_paths, processes=processes)
+    with PackWriter(out_dir, shard_bytes=shard_bytes, overwrite=overwrite) as writer:
+        for dataset in datasets:
+            writer.add_session(dataset)
+            info(f"📦 Packed {dataset.session_id} ({len(dataset)} samples)")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from reacture_multi import discover_sessions
+
+    p = argparse.ArgumentParser(description="Pack ReActure sessions into shard files.")
+    p.add_argument("out_dir", help="Pack directory to create")
+    p.add_argument("inputs", nargs="+", help="Session metadata files or directories to search")
+    p.add_argument("--shard-size-gb", type=float, default=DEFAULT_SHARD_BYTES / (1 << 30),
+                   help="Target shard size in GiB (default: 4)")
+    p.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--overwrite", action="store_true", help="Replace an existing pack")
+    args = p.parse_args()
+    log_to_stdout()
+
+    paths = discover_sessions(args.inputs)
+    report = pack_sessions(paths, args.out_dir, shard_bytes=int(args.shard_size_gb * (1 << 30)),
+                           processes=args.processes, overwrite=args.overwrite)
+    print(report)
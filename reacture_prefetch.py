@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+ReActure Prefetching
+====================
+
+Background read-ahead for plain Python consumers (no torch or tf needed).
+
+A ``Prefetcher`` runs a load function over a stream of tasks on a few
+reader threads and yields the results in task order. Read-ahead is bounded
+twice: at most ``depth`` tasks are loaded but not yet consumed, and no new
+task starts while the loaded-but-unconsumed results hold ``max_bytes`` or
+more. A load error is re-raised in the consumer at the position of the
+failed task (earlier results are still delivered); closing the prefetcher,
+or abandoning a generator built on it, stops the readers.
+
+Frame reads (memory-map page faults, ``.rfz`` decompression, packed shard
+``pread`` calls) happen on the reader threads, so they overlap with the
+consumer's work. Tasks are ranges of global sample indices, which lets a
+``MultiSessionDataset`` read ahead across session boundaries.
+
+Usage:
+    for sample in dataset.prefetch(workers=4):              # sample dicts, frames loaded
+        evaluate(sample)
+
+    for batch in corpus.prefetch(batch_size=256, max_bytes=512 << 20):
+        model.predict(batch['frame'])
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_PREFETCH_BYTES = 256 << 20
+
+
+def result_nbytes(value: Any) -> int:
+    """Bytes held by the NumPy arrays in a (nested) dict/list/tuple result."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(result_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(result_nbytes(item) for item in value)
+    return 0
+
+
+class _ReadAhead:
+    """
+    State shared by a ``Prefetcher`` and its reader threads.
+
+    The threads reference this object, not the ``Prefetcher``, so dropping
+    the prefetcher lets ``Prefetcher.__del__`` run and stop them.
+    """
+
+    def __init__(self, load: Callable[[Any], Any], tasks: Iterable, depth: int,
+                 max_bytes: Optional[int]):
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.peak_bytes = 0
+
+        self.load = load
+        self.tasks = iter(tasks)
+        self.cond = threading.Condition()
+        self.results: Dict[int, tuple] = {}
+        self.next_task = 0           # sequence number of the next task taken
+        self.next_result = 0         # sequence number the consumer waits for
+        self.bytes = 0
+        self.exhausted = False       # no more tasks will be started
+        self.closed = False
+
+    def _may_start(self) -> bool:
+        ahead = self.next_task - self.next_result
+        if ahead >= self.depth:
+            return False
+        return not (self.max_bytes is not None and ahead > 0 and self.bytes >= self.max_bytes)
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not (self.closed or self.exhausted or self._may_start()):
+                    self.cond.wait()
+                if self.closed or self.exhausted:
+                    return
+                seq = self.next_task
+                try:
+                    task = next(self.tasks)
+                except StopIteration:
+                    self.exhausted = True
+                    self.cond.notify_all()
+                    return
+                except BaseException as e:
+                    self.exhausted = True
+                    self.next_task += 1
+                    self.results[seq] = (False, e, 0)
+                    self.cond.notify_all()
+                    return
+                self.next_task += 1
+
+            try:
+                value, ok = self.load(task), True
+                size = result_nbytes(value)
+            except BaseException as e:
+                value, ok, size = e, False, 0
+
+            with self.cond:
+                if self.closed:
+                    return
+                self.results[seq] = (ok, value, size)
+                self.bytes += size
+                self.peak_bytes = max(self.peak_bytes, self.bytes)
+                if not ok:
+                    # Nothing after a failed task will be consumed
+                    self.exhausted = True
+                self.cond.notify_all()
+
+    def next(self) -> tuple:
+        """Next (ok, value) in task order; raises StopIteration when done."""
+        with self.cond:
+            while self.next_result not in self.results:
+                if self.closed or (self.exhausted and self.next_result >= self.next_task):
+                    raise StopIteration
+                self.cond.wait()
+            ok, value, size = self.results.pop(self.next_result)
+            self.next_result += 1
+            self.bytes -= size
+            self.cond.notify_all()
+        return ok, value
+
+    def close(self) -> bool:
+        """Mark closed and wake the readers; False if already closed."""
+        with self.cond:
+            if self.closed:
+                return False
+            self.closed = True
+            self.results.clear()
+            self.bytes = 0
+            self.cond.notify_all()
+        return True
+
+
+class Prefetcher:
+    """
+    Ordered, bounded read-ahead over ``load(task)`` for each task.
+
+    Attributes:
+        workers: Reader threads
+        depth: Maximum tasks loaded (or loading) ahead of the consumer
+        max_bytes: Soft cap on bytes of loaded, unconsumed results
+        peak_bytes: Largest number of such bytes seen
+    """
+
+    def __init__(self, load: Callable[[Any], Any], tasks: Iterable, workers: int = 2,
+                 depth: Optional[int] = None, max_bytes: Optional[int] = DEFAULT_PREFETCH_BYTES,
+                 name: str = 'reacture-prefetch'):
+        """
+        Args:
+            load: Called on a reader thread for every task
+            tasks: Task iterable (consumed lazily, under a lock)
+            workers: Reader threads (at least 1)
+            depth: Tasks kept in flight (default: 2 per worker)
+            max_bytes: Stop starting tasks while this many result bytes wait
+                to be consumed (None: no byte cap); tasks already running may
+                overshoot it, and one task may always run
+            name: Thread name prefix
+        """
+        self.workers = max(int(workers), 1)
+        self.depth = max(int(depth or 2 * self.workers), 1)
+        self.max_bytes = max_bytes
+
+        self._state = _ReadAhead(load, tasks, self.depth, max_bytes)
+        self._threads = [threading.Thread(target=self._state.run, name=f"{name}-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def peak_bytes(self) -> int:
+        return self._state.peak_bytes
+
+    def __iter__(self) -> 'Prefetcher':
+        return self
+
+    def __next__(self):
+        ok, value = self._state.next()
+        if not ok:
+            self.close()
+            raise value
+        return value
+
+    def close(self):
+        """Stop the readers (tasks already loading finish first) and drop buffered results."""
+        if not self._state.close():
+            return
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join()
+
+    def __enter__(self) -> 'Prefetcher':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _chunks(indices: np.ndarray, size: int) -> Iterator[np.ndarray]:
+    for start in range(0, len(indices), size):
+        yield indices[start:start + size]
+
+
+def load_samples(dataset, rows: Sequence[int]) -> List[Dict]:
+    """
+    Sample dicts for ``rows`` with their frames read into memory.
+
+    Samples are rebuilt from the column cache (``get_sample(i,
+    parse_jsonl=False)``), so the first results do not wait for the whole
+    JSONL to be parsed. Frames come back as views of the frame map; copying
+    them here makes the reader thread, not the consumer, pay for the disk read.
+    """
+    samples = [dataset.get_sample(int(i), parse_jsonl=False) for i in rows]
+    for sample in samples:
+        frame = sample.get('frame')
+        if frame is not None:
+            sample['frame'] = np.array(frame)
+    return samples
+
+
+def prefetch(dataset, batch_size: Optional[int] = None, indices: Optional[Sequence[int]] = None,
+             chunk_size: int = 64, workers: int = 2, depth: Optional[int] = None,
+             max_bytes: Optional[int] = DEFAULT_PREFETCH_BYTES, **batch_kwargs) -> Iterator:
+    """
+    Iterate a dataset with background read-ahead.
+
+    Args:
+        dataset: ReActureDataset or MultiSessionDataset
+        batch_size: Yield ``get_batch`` dictionaries of this many samples;
+            None yields sample dictionaries (like ``for sample in dataset``)
+        indices: Sample order (default: all samples in order)
+        chunk_size: Samples loaded per task in sample mode
+        workers: Reader threads
+        depth: Tasks read ahead (default: 2 per worker)
+        max_bytes: Cap on bytes loaded ahead of the consumer
+        **batch_kwargs: Passed to ``get_batch`` (batch mode)
+
+    Yields:
+        Batch dictionaries or sample dictionaries, in ``indices`` order
+    """
+    indices = np.arange(len(dataset)) if indices is None else np.asarray(indices, dtype=np.int64)
+    if batch_size is not None:
+        return _closing(Prefetcher(lambda rows: dataset.get_batch(rows, **batch_kwargs),
+                                   _chunks(indices, batch_size), workers=workers, depth=depth,
+                                   max_bytes=max_bytes))
+    return _flatten(Prefetcher(lambda rows: load_samples(dataset, rows),
+                               _chunks(indices, chunk_size), workers=workers, depth=depth,
+                               max_bytes=max_bytes))
+
+
+def _closing(prefetcher: Prefetcher) -> Iterator:
+    try:
+        yield from prefetcher
+    finally:
+        prefetcher.close()
+
+
+def _flatten(prefetcher: Prefetcher) -> Iterator[Dict]:
+    try:
+        for samples in prefetcher:
+            yield from samples
+    finally:
+        prefetcher.close()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+ReActure Column Queries
+=======================
+
+Field projection and predicate pushdown over a session's columns.
+
+Predicates are evaluated on the columnar layer, one column at a time and
+only over the rows that survived the previous predicates (categorical
+filters compare int16 codes, so they run first). Projection then reads just
+the requested columns at the matching rows; when nothing narrows the rows
+the result is a view, not a copy.
+
+Usage:
+    from reacture_query import select_columns
+
+    result = select_columns(columns, ['robot.position', 'key_presses.W'],
+                            where={'type': 'robot_state', 'zone': ['yellow', 'red'],
+                                   'battery': lambda b: b < 20})
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from reacture_columns import COLUMN_SCHEMA, SessionColumns
+from reacture_index import RowSelector
+
+# Predicate on one field: a value (equality), a list/tuple/set of values
+# (membership) or a callable mapping the column values to a boolean mask
+Predicate = Union[str, int, float, bool, Iterable, Callable[[np.ndarray], np.ndarray]]
+
+GROUP_KINDS: Dict[str, str] = {name: kind for name, kind, _ in COLUMN_SCHEMA}
+LEAF_GROUPS: Dict[str, str] = {leaf: name for name, _, leaves in COLUMN_SCHEMA for leaf in leaves}
+
+
+def field_kind(path: str) -> str:
+    """Storage kind ('f8', 'bool', 'category', ...) of a group or leaf path."""
+    group = path if path in GROUP_KINDS else LEAF_GROUPS.get(path)
+    if group is None:
+        raise KeyError(f"Unknown column field: {path}")
+    return GROUP_KINDS[group]
+
+
+def column_for(columns: SessionColumns, path: str) -> np.ndarray:
+    """Group array for a group name, else the column of a leaf path."""
+    return columns.group(path) if path in columns.arrays else columns.field(path)
+
+
+def _as_indices(rows: RowSelector, n: int) -> np.ndarray:
+    return np.arange(*rows.indices(n)) if isinstance(rows, slice) else rows
+
+
+def predicate_mask(columns: SessionColumns, path: str, values: np.ndarray,
+                   predicate: Predicate) -> np.ndarray:
+    """
+    Evaluate one predicate on already-selected column values.
+
+    Categorical fields are compared on their integer codes; a value the
+    session has never seen matches nothing.
+    """
+    if callable(predicate):
+        if field_kind(path) == 'category':
+            values = columns.decode(LEAF_GROUPS.get(path, path), values)
+        mask = np.asarray(predicate(values), dtype=bool)
+        if mask.shape != (len(values),):
+            raise ValueError(f"Predicate on {path!r} must return one bool per row, "
+                             f"got shape {mask.shape}")
+        return mask
+
+    wanted = list(predicate) if isinstance(predicate, (list, tuple, set, frozenset)) else [predicate]
+    if field_kind(path) == 'category':
+        group = LEAF_GROUPS.get(path, path)
+        wanted = [columns.code_of(group, value) for value in wanted]
+        wanted = [code for code in wanted if code >= 0]
+    if values.ndim != 1:
+        raise ValueError(f"Equality predicates need a single field, {path!r} has {values.shape[1]}")
+    return np.isin(values, wanted)
+
+
+def match_rows(columns: SessionColumns, where: Optional[Dict[str, Predicate]],
+               rows: RowSelector = slice(None)) -> RowSelector:
+    """
+    Narrow a row selector by predicates.
+
+    Args:
+        columns: Session columns
+        where: Field path -> predicate (all must hold)
+        rows: Starting selector (e.g. a time range slice)
+
+    Returns:
+        ``rows`` unchanged when there are no predicates, else a sorted
+        int64 index array of the matching rows
+    """
+    if not where:
+        return rows
+    # Cheap integer-code filters first, so later columns are read at fewer rows
+    ordered = sorted(where.items(), key=lambda item: field_kind(item[0]) != 'category')
+    selected = rows
+    for path, predicate in ordered:
+        values = np.asarray(column_for(columns, path)[selected])
+        keep = predicate_mask(columns, path, values, predicate)
+        selected = _as_indices(selected, len(columns))[keep]
+        if not len(selected):
+            break
+    return selected
+
+
+def project(columns: SessionColumns, fields: Optional[List[str]], rows: RowSelector,
+            decode: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Read the requested fields at the selected rows.
+
+    Args:
+        columns: Session columns
+        fields: Group names or dotted leaf paths (None: every group)
+        rows: Row selector
+        decode: Return categorical fields as strings (None for missing)
+            instead of int16 codes
+
+    Returns:
+        Dictionary mapping each requested path to a NumPy array
+    """
+    fields = columns.group_names if fields is None else fields
+    result = {}
+    for path in fields:
+        values = np.asarray(column_for(columns, path)[rows])
+        if decode and field_kind(path) == 'category':
+            values = columns.decode(LEAF_GROUPS.get(path, path), values)
+        result[path] = values
+    return result
+
+
+def select_columns(columns: SessionColumns, fields: Optional[List[str]] = None,
+                   where: Optional[Dict[str, Predicate]] = None, rows: RowSelector = slice(None),
+                   decode: bool = True, return_index: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Project fields of the rows matching ``where`` (see ``match_rows``/``project``).
+
+    Args:
+        return_index: Add 'index' with the matching row numbers
+
+    Returns:
+        Dictionary of NumPy arrays, one per requested field
+    """
+    selected = match_rows(columns, where, rows)
+    result = project(columns, fields, selected, decode=decode)
+    if return_index:
+        result['index'] = _as_indices(selected, len(columns))
+    return result
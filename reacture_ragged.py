@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+ReActure Ragged Arrays
+======================
+
+Variable-length per-sample lists (``sensors.victims``) stored as one
+offsets array plus flat value arrays: the items of row ``i`` are
+``values[leaf][offsets[i]:offsets[i + 1]]``.
+
+All accessors are vectorised over rows; nothing is converted to Python
+lists per sample.
+
+Usage:
+    victims = dataset.victims()                   # Ragged over every sample
+    near = nearest_k(victims, rows, k=4)          # padded (B, 4) arrays + 'mask'
+"""
+
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+class Ragged(NamedTuple):
+    """
+    Ragged rows of named fields.
+
+    Attributes:
+        offsets: int64 (N + 1,) start of each row in the flat arrays
+        values: Field name -> flat (M,) array
+    """
+    offsets: np.ndarray
+    values: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Items per row."""
+        return np.diff(self.offsets)
+
+    def row(self, i: int) -> Dict[str, np.ndarray]:
+        """Items of one row (views)."""
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        return {name: values[lo:hi] for name, values in self.values.items()}
+
+    def flat_index(self, rows: Sequence[int]):
+        """
+        Flat item positions of the given rows, concatenated.
+
+        Returns:
+            Tuple of (positions (M,), owner (M,) position of the row in ``rows``,
+            lengths (B,))
+        """
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        # Position within each row: running index minus the row's first slot
+        first = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(rows) else lengths
+        within = np.arange(int(lengths.sum())) - np.repeat(first, lengths)
+        return np.repeat(starts, lengths) + within, owner, lengths
+
+    def take(self, rows: Sequence[int]) -> 'Ragged':
+        """Ragged subset of rows (one gather per field)."""
+        positions, _, lengths = self.flat_index(rows)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        return Ragged(offsets, {name: values[positions] for name, values in self.values.items()})
+
+
+def nearest_k(ragged: Ragged, rows: Sequence[int], k: int, key: str = 'distance',
+              fields: Optional[Sequence[str]] = None, fill: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    The ``k`` items with the smallest ``key`` per row, padded to a fixed size.
+
+    Args:
+        ragged: Source rows
+        rows: Row indices (B,)
+        k: Items kept per row
+        key: Field to sort by (ascending; NaN sorts last)
+        fields: Fields to return (default: all)
+        fill: Value for padded slots
+
+    Returns:
+        Dictionary with each field as (B, k) float32, 'mask' (B, k) bool for
+        real items and 'count' (B,) int64 items per row before truncation
+    """
+    rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+    fields = list(fields or ragged.values)
+    positions, owner, lengths = ragged.flat_index(rows)
+
+    # Sort items by (row, key) and keep the first k of each row
+    order = np.lexsort((ragged.values[key][positions], owner))
+    positions, owner = positions[order], owner[order]
+    first = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(rows) else lengths
+    rank = np.arange(len(positions)) - np.repeat(first, lengths)
+    keep = rank < k
+
+    out = {name: np.full((len(rows), k), fill, dtype=np.float32) for name in fields}
+    for name in fields:
+        out[name][owner[keep], rank[keep]] = ragged.values[name][positions[keep]]
+    mask = np.zeros((len(rows), k), dtype=bool)
+    mask[owner[keep], rank[keep]] = True
+    out['mask'] = mask
+    out['count'] = lengths
+    return out
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+ReActure Sample Records
+=======================
+
+Compact, read-only sample records backed by a session's columns.
+
+A parsed JSONL line is a tree of dicts costing several KB per sample. A
+``SampleRecord`` is a ``__slots__`` object holding only the columns, a row
+number and its place in the schema tree (``COLUMN_SCHEMA``); fields are
+decoded from the column arrays when read. Nested groups are records of
+their own, so both mapping and attribute access work:
+
+    record = dataset[120]                      # with record_mode='view'
+    record['robot']['position']['x']
+    record.robot.position.x
+    record.get('event'), 'victims' in record.sensors
+    record.to_dict()                           # plain nested dict
+
+A record equals the decoded JSONL line: fields the line lacked are absent
+keys (the columns' presence bits say which flags and timestamps it had),
+and fields outside the schema (e.g. ``finalStats``) come from the row's
+JSON extras. Top-level keys can be added (``record['session_id'] = ...``);
+stored values are read-only.
+"""
+
+import json
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from reacture_columns import (COLUMN_SCHEMA, EXTRAS_GROUP, PRESENCE_FIELDS, PRESENT_GROUP, RAGGED_SCHEMA,
+                              SessionColumns, format_iso_timestamp, presence_bit)
+
+_MISSING = object()
+
+
+class _Leaf:
+    """One schema field: where it is stored and how it is decoded."""
+
+    __slots__ = ('group', 'col', 'kind', 'bit')
+
+    def __init__(self, group: str, col: Optional[int], kind: str, bit: int = 0):
+        self.group = group
+        self.col = col
+        self.kind = kind
+        # Presence bit for fields whose stored value cannot say (see PRESENCE_FIELDS)
+        self.bit = bit
+
+    def has(self, source: 'RecordSource', row: int) -> bool:
+        """True if the field exists in this row (cheaper than decoding it)."""
+        if self.bit:
+            return bool(source.present[row] & self.bit)
+        array = source.arrays[self.group]
+        item = array[row] if self.col is None else array[row, self.col]
+        return item == item if self.kind in ('f8', 'iso') else item >= 0
+
+    def value(self, source: 'RecordSource', row: int):
+        """Decoded value, or _MISSING."""
+        kind = self.kind
+        if self.bit and not source.present[row] & self.bit:
+            return _MISSING
+        if kind == 'ragged':
+            items = source.columns.ragged(self.group).row(row)
+            leaves = list(items)
+            return [{leaf: float(items[leaf][i]) for leaf in leaves if not np.isnan(items[leaf][i])}
+                    for i in range(len(items[leaves[0]]))]
+
+        array = source.arrays[self.group]
+        item = array[row] if self.col is None else array[row, self.col]
+        if kind == 'f8':
+            if item != item:
+                return _MISSING
+            value = float(item)
+            return int(value) if self.group == 'timestamp_ms' and value.is_integer() else value
+        if kind == 'iso':
+            return format_iso_timestamp(item) if item == item else _MISSING
+        if kind == 'bool':
+            return bool(item)
+        if item < 0:
+            return _MISSING
+        if kind == 'category':
+            return source.categories[self.group][item]
+        if kind == 'frame':
+            return f"frames/frame_{int(item):06d}.npy"
+        return int(item)
+
+
+class _Node:
+    """A nested object of the sample (e.g. ``robot``), with its fields in schema order."""
+
+    __slots__ = ('children', 'leaves')
+
+    def __init__(self):
+        self.children: Dict[str, object] = {}
+        self.leaves: List[_Leaf] = []
+
+    def present(self, source: 'RecordSource', row: int) -> bool:
+        for leaf in self.leaves:
+            if leaf.has(source, row):
+                return True
+        return False
+
+
+def _build_schema() -> _Node:
+    root = _Node()
+    fields = [(name, kind, col if len(leaves) > 1 else None, path)
+              for name, kind, leaves in COLUMN_SCHEMA for col, path in enumerate(leaves)]
+    fields += [(name, 'ragged', None, name) for name, _, _ in RAGGED_SCHEMA]
+    for name, kind, col, path in fields:
+        if name == 'visual_frame_index':
+            kind = 'frame'
+        elif name == 'timestamp_utc_ms':
+            kind = 'iso'
+        bit_field = name if kind == 'ragged' else path
+        leaf = _Leaf(name, col, kind, presence_bit(bit_field) if bit_field in PRESENCE_FIELDS else 0)
+        *parents, key = path.split('.')
+        node = root
+        node.leaves.append(leaf)
+        for parent in parents:
+            node = node.children.setdefault(parent, _Node())
+            node.leaves.append(leaf)
+        node.children[key] = leaf
+    return root
+
+
+SCHEMA = _build_schema()
+
+
+class RecordSource:
+    """
+    What records of one session read from: plain ndarray views of the
+    columns (``np.memmap`` indexing goes through Python, ndarray indexing
+    does not) plus the category lists.
+
+    Build one per session and rebuild it when the columns change.
+    """
+
+    __slots__ = ('columns', 'arrays', 'categories', 'present', 'extras_offsets', 'extras_data')
+
+    def __init__(self, columns: SessionColumns):
+        self.columns = columns
+        self.arrays = {name: np.asarray(array).view(np.ndarray) for name, array in columns.arrays.items()}
+        self.categories = columns.categories
+        self.present = self.arrays[PRESENT_GROUP]
+        self.extras_offsets = self.arrays[f"{EXTRAS_GROUP}.offsets"]
+        self.extras_data = self.arrays[f"{EXTRAS_GROUP}.data"]
+
+    def extras(self, row: int) -> Optional[Dict]:
+        """The row's JSON extras (None if it has none)."""
+        start, stop = self.extras_offsets[row], self.extras_offsets[row + 1]
+        if start == stop:
+            return None
+        return json.loads(self.extras_data[start:stop].tobytes())
+
+    def __reduce__(self):
+        # Rebuilt from the columns, which reopen their memory maps when unpickled
+        return RecordSource, (self.columns,)
+
+
+class SampleRecord(Mapping):
+    """
+    Read-only view of one sample (or one nested object of it).
+
+    Behaves like the decoded JSONL record (``SessionColumns.row_dict``):
+    compares equal to it, supports ``[]``, ``get``, ``in``, ``keys``/``items``
+    and attribute access for keys that are valid identifiers.
+    """
+
+    __slots__ = ('_source', '_row', '_node', '_raw', '_store', '_frame', '_extra')
+
+    def __init__(self, source: Union[RecordSource, SessionColumns], row: int, node: _Node = SCHEMA):
+        """
+        Args:
+            source: RecordSource of the session (or its SessionColumns, wrapped per call)
+            row: Sample index (0 <= row < number of rows)
+            node: Schema node this record exposes (the whole sample by default)
+        """
+        self._source = source if isinstance(source, RecordSource) else RecordSource(source)
+        self._row = row
+        self._node = node
+        self._raw = self._source.extras(row) if node is SCHEMA else None
+        self._store = None
+        self._frame = None
+        self._extra = None
+
+    def _child(self, node: _Node, raw: Optional[Dict]) -> 'SampleRecord':
+        record = SampleRecord.__new__(SampleRecord)
+        record._source, record._row, record._node, record._raw = self._source, self._row, node, raw
+        record._store = record._frame = record._extra = None
+        return record
+
+    @property
+    def row(self) -> int:
+        """Sample index within the session."""
+        return self._row
+
+    def attach_frame(self, store, frame_idx: int):
+        """
+        Expose the aligned frame as 'frame' / 'frame_timestamp_ms' (read on access).
+
+        'frame' is None when ``frame_idx`` is -1 or there is no ``store``.
+        """
+        self._store = store
+        self._frame = frame_idx
+
+    def _frame_value(self, key: str):
+        if self._frame is None:
+            return _MISSING
+        has_frame = self._store is not None and self._frame >= 0
+        if key == 'frame':
+            return self._store[self._frame] if has_frame else None
+        if has_frame and self._frame < len(self._store.timestamps):
+            return self._store.timestamps[self._frame]
+        return _MISSING
+
+    def _lookup(self, key: str):
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        child = self._node.children.get(key)
+        raw = self._raw
+        if raw is not None and key in raw:
+            # Extras replace a field, or add to a nested object's fields
+            value = raw[key]
+            if isinstance(child, _Node) and isinstance(value, dict) and value:
+                return self._child(child, value)
+            return value
+        if isinstance(child, _Node):
+            if child.present(self._source, self._row):
+                return self._child(child, None)
+            return _MISSING
+        if child is not None:
+            return child.value(self._source, self._row)
+        if key in ('frame', 'frame_timestamp_ms'):
+            return self._frame_value(key)
+        return _MISSING
+
+    def __getitem__(self, key: str):
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __setitem__(self, key: str, value):
+        if self._node is not SCHEMA:
+            raise TypeError("Nested record fields are read-only")
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self):
+        source, row, children = self._source, self._row, self._node.children
+        extra = self._extra or {}
+        raw = self._raw or {}
+        for key, child in children.items():
+            if key in extra or key in raw:
+                yield key
+            elif isinstance(child, _Node):
+                if child.present(source, row):
+                    yield key
+            elif child.has(source, row):
+                yield key
+        yield from (key for key in raw if key not in children)
+        for key in ('frame', 'frame_timestamp_ms'):
+            if key not in extra and key not in raw and self._frame_value(key) is not _MISSING:
+                yield key
+        yield from (key for key in extra if key not in children and key not in raw)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict:
+        """Materialise as a plain nested dict."""
+        source, row, children = self._source, self._row, self._node.children
+        extra = self._extra or {}
+        raw = self._raw or {}
+        sample = {}
+        for key, child in children.items():
+            if key in extra or key in raw:
+                value = self._lookup(key)
+            elif type(child) is _Node:
+                value = self._child(child, None) if child.present(source, row) else _MISSING
+            else:
+                value = child.value(source, row)
+            if value is not _MISSING:
+                sample[key] = value.to_dict() if type(value) is SampleRecord else value
+        sample.update((key, value) for key, value in raw.items() if key not in children)
+        for key in ('frame', 'frame_timestamp_ms'):
+            if key not in sample:
+                value = self._frame_value(key)
+                if value is not _MISSING:
+                    sample[key] = value
+        sample.update((key, value) for key, value in extra.items() if key not in children)
+        return sample
+
+    # dict.copy() compatibility: callers that copy a sample get a mutable dict
+    copy = to_dict
+
+    def __repr__(self) -> str:
+        return f"SampleRecord(row={self._row}, {self.to_dict()!r})"
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+ReActure Sequence Windows
+=========================
+
+Fixed-length clips of consecutive samples for temporal models.
+
+A ``SequenceView`` lays windows of ``length`` steps (every ``dilation``-th
+sample, one window every ``stride`` samples) over a session's telemetry
+series and its aligned frames. Windows never cross an episode boundary:
+the series is split at ``game_start`` and rows after a ``game_end`` belong
+to no episode.
+
+A single window is a strided view into the memory-mapped columns, and into
+the frame map whenever its frames are evenly spaced in the frames file
+(the normal case), so nothing is copied until the data is used.
+``get_batch`` gathers many windows with one fancy-indexing operation per
+field and one sorted frame read.
+
+Usage:
+    clips = dataset.sequences(length=16, stride=4, dilation=2)
+    clip = clips[0]                 # {'frame': (16, H, W, 3) view, 'keys': (16, 6), ...}
+    batch = clips.get_batch([0, 5, 9])   # (3, 16, ...) arrays plus 'mask'
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from load_reacture_dataset import BATCH_FIELDS
+
+BOUNDARY_MODES = ('drop', 'pad')
+PADDING_MODES = ('edge', 'zero')
+
+
+def episode_ids(columns) -> np.ndarray:
+    """
+    Episode number of every row (-1 for rows between a game_end and the next game_start).
+
+    Each ``game_start`` opens a new episode; the ``game_end`` row itself
+    still belongs to the episode it closes.
+    """
+    events = np.asarray(columns.group('event'))
+    is_start = events == columns.code_of('event', 'game_start')
+    is_end = events == columns.code_of('event', 'game_end')
+    rows = np.arange(len(events))
+    last_start = np.maximum.accumulate(np.where(is_start, rows, -1)) if len(rows) else rows
+    last_end = np.maximum.accumulate(np.where(is_end, rows, -1)) if len(rows) else rows
+
+    episode = np.cumsum(is_start)
+    episode[(last_end >= 0) & (last_end >= last_start) & (last_end < rows)] = -1
+    return episode
+
+
+def _segments(episode: np.ndarray):
+    """(start, end) position pairs of runs of equal, non-negative episode ids."""
+    if not len(episode):
+        return []
+    cuts = np.flatnonzero(np.diff(episode)) + 1
+    starts = np.concatenate([[0], cuts])
+    ends = np.concatenate([cuts, [len(episode)]])
+    return [(int(s), int(e)) for s, e in zip(starts, ends) if episode[s] >= 0]
+
+
+class SequenceView:
+    """
+    Sliding windows over one session.
+
+    Attributes:
+        dataset: Source ReActureDataset
+        length: Steps per window (T)
+        stride: Samples between consecutive window starts
+        dilation: Samples between steps inside a window
+        rows: Sample index of every position in the windowed series
+        starts: Series position where each window starts
+        ends: Series position where each window's episode ends (exclusive)
+    """
+
+    def __init__(self, dataset, length: int, stride: int = 1, dilation: int = 1,
+                 fields: Optional[List[str]] = None, include_frames: bool = True,
+                 boundary: str = 'drop', padding: str = 'edge',
+                 robot_state_only: bool = True, split_episodes: bool = True):
+        """
+        Args:
+            dataset: ReActureDataset
+            length: Steps per window
+            stride: Samples between window starts
+            dilation: Samples between steps within a window
+            fields: BATCH_FIELDS names to include (default: all)
+            include_frames: Include the aligned frames
+            boundary: 'drop' keeps only windows that fit inside their episode;
+                'pad' also starts windows near the end and pads them
+            padding: For padded steps, 'edge' repeats the last real step,
+                'zero' fills zeros (see 'mask' either way)
+            robot_state_only: Window over 'robot_state' rows only
+            split_episodes: Never let a window cross game_start/game_end
+        """
+        if length < 1 or stride < 1 or dilation < 1:
+            raise ValueError("length, stride and dilation must be >= 1")
+        if boundary not in BOUNDARY_MODES:
+            raise ValueError(f"boundary must be one of {BOUNDARY_MODES}, got {boundary!r}")
+        if padding not in PADDING_MODES:
+            raise ValueError(f"padding must be one of {PADDING_MODES}, got {padding!r}")
+
+        self.dataset = dataset
+        self.length = length
+        self.stride = stride
+        self.dilation = dilation
+        self.span = (length - 1) * dilation + 1
+        self.boundary = boundary
+        self.padding = padding
+        self.fields = list(fields or BATCH_FIELDS)
+        self.include_frames = include_frames and dataset.frame_store is not None
+
+        selection = dataset._robot_state_selection() if robot_state_only else slice(None)
+        self.rows = np.arange(len(dataset))[selection]
+
+        # Series in storage dtype: views of the column maps when the rows are
+        # contiguous, otherwise one gather per field up front
+        self._series: Dict[str, np.ndarray] = {}
+        for name in self.fields:
+            group, cols = BATCH_FIELDS[name]
+            array = dataset.columns.group(group)[selection]
+            array = array if cols is None else array[:, cols]
+            self._series[name] = array.reshape(len(self.rows), -1)
+        self._series['timestamp'] = dataset.columns.group('timestamp_ms')[selection]
+        self.frame_index = dataset.sample_frame_index[selection] if self.include_frames else None
+
+        episode = episode_ids(dataset.columns)[selection] if split_episodes \
+            else np.zeros(len(self.rows), dtype=np.int64)
+        starts, ends = [], []
+        for seg_start, seg_end in _segments(episode):
+            last = seg_end - self.span if boundary == 'drop' else seg_end - 1
+            positions = np.arange(seg_start, last + 1, stride)
+            starts.append(positions)
+            ends.append(np.full(len(positions), seg_end))
+        self.starts = np.concatenate(starts).astype(np.int64) if starts else np.empty(0, np.int64)
+        self.ends = np.concatenate(ends).astype(np.int64) if ends else np.empty(0, np.int64)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def windows(self, name: str) -> np.ndarray:
+        """
+        Zero-copy strided view of every window position of one series.
+
+        Returns:
+            Array of shape (S - span + 1, T, ...) where entry ``p`` is the
+            window starting at series position ``p``; index it with
+            ``self.starts`` (full windows only) to get this view's windows
+        """
+        series = self._series[name]
+        view = sliding_window_view(series, self.span, axis=0)
+        return np.moveaxis(view, -1, 1)[:, ::self.dilation]
+
+    def _frames_view(self, start: int) -> np.ndarray:
+        frame_idx = self.frame_index[start:start + self.span:self.dilation]
+        store = self.dataset.frame_store
+        if (frame_idx >= 0).all():
+            step = frame_idx[1] - frame_idx[0] if len(frame_idx) > 1 else 1
+            if step > 0 and (np.diff(frame_idx) == step).all():
+                # Evenly spaced frames: a strided view into the frame map
+                return store.array[frame_idx[0]:frame_idx[-1] + 1:step]
+        return self._gather_frames(frame_idx[None])[0]
+
+    def _gather_frames(self, frame_idx: np.ndarray) -> np.ndarray:
+        store = self.dataset.frame_store
+        frames = np.zeros(frame_idx.shape + tuple(store.shape[1:]), dtype=store.dtype)
+        has_frame = frame_idx >= 0
+        frames[has_frame] = store.take(frame_idx[has_frame])
+        return frames
+
+    def __getitem__(self, i: int) -> Dict[str, np.ndarray]:
+        """
+        One window; views where possible.
+
+        Returns:
+            Dictionary with each field (T, ...), 'timestamp' (T,), 'index'
+            (T,) sample indices, 'mask' (T,) real (not padded) steps and,
+            with frames, 'frame' (T, H, W, C)
+        """
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"Window {i} out of range for {len(self)} windows")
+        start = int(self.starts[i])
+        if start + self.span > self.ends[i]:
+            return {name: values[0] for name, values in self.get_batch([i]).items()}
+
+        window = {name: series[start:start + self.span:self.dilation]
+                  for name, series in self._series.items()}
+        window['index'] = self.rows[start:start + self.span:self.dilation]
+        window['mask'] = np.ones(self.length, dtype=bool)
+        if self.include_frames:
+            window['frame'] = self._frames_view(start)
+        return window
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def get_batch(self, indices) -> Dict[str, np.ndarray]:
+        """
+        Gather many windows at once.
+
+        Returns:
+            Same keys as ``__getitem__`` with a leading batch axis (B, T, ...)
+        """
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        starts, ends = self.starts[indices], self.ends[indices]
+        positions = starts[:, None] + np.arange(self.length) * self.dilation
+        mask = positions < ends[:, None]
+        clipped = np.minimum(positions, ends[:, None] - 1)
+
+        batch = {name: series[clipped] for name, series in self._series.items()}
+        batch['index'] = np.where(mask, self.rows[clipped], -1)
+        if self.include_frames:
+            frame_idx = self.frame_index[clipped]
+            if self.padding == 'zero':
+                frame_idx = np.where(mask, frame_idx, -1)
+            batch['frame'] = self._gather_frames(frame_idx)
+        if self.padding == 'zero':
+            for name in self._series:
+                batch[name][~mask] = 0
+        batch['mask'] = mask
+        return batch
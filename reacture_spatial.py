@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+ReActure Spatial Index
+======================
+
+Location queries over ``robot.position`` within one session or a corpus.
+
+``SpatialIndex`` buckets points into a uniform grid of cubic cells. Each
+run of points is stored sorted by cell key with a cell directory
+(``keys`` / ``starts``), so a query only touches the cells overlapping
+it: the candidate cells are found with ``np.searchsorted`` and their
+points are filtered exactly, all vectorised.
+
+Sessions are added incrementally: each ``add`` sorts only the new points
+into a run of its own, and runs are merged once there are more than
+``max_runs`` of them (a stable sort over already-sorted runs). A saved
+index is a directory of ``.npy`` arrays plus ``spatial.json``, opened
+memory-mapped; ``MultiSessionDataset.spatial_index`` reopens it and only
+indexes sessions that are new or changed.
+
+Usage:
+    index = corpus.spatial_index('datasets/spatial/')
+    session, sample = index.radius([12.0, 1.5, -4.0], 5.0)
+    session, sample = index.box([0, 0, 0], [10, 3, 10])
+    session, sample, distance = index.nearest([12.0, 1.5, -4.0], k=32)
+
+    rows = dataset.samples_near([12.0, 1.5, -4.0], 5.0)
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SPATIAL_FORMAT_VERSION = 2
+SPATIAL_MANIFEST = 'spatial.json'
+DEFAULT_CELL_SIZE = 2.0
+
+# Cell coordinates are packed into one int64 key, 21 bits per axis
+_CELL_BITS = 21
+_CELL_BIAS = 1 << (_CELL_BITS - 1)
+_CELL_MASK = (1 << _CELL_BITS) - 1
+_RUN_ARRAYS = ('keys', 'starts', 'cells', 'points', 'session', 'rows')
+
+
+def _pack_cells(cells: np.ndarray) -> np.ndarray:
+    cells = np.clip(cells.astype(np.int64) + _CELL_BIAS, 0, _CELL_MASK)
+    return (cells[..., 0] << (2 * _CELL_BITS)) | (cells[..., 1] << _CELL_BITS) | cells[..., 2]
+
+
+class _Run:
+    """Points sorted by grid cell, with a directory of the occupied cells."""
+
+    def __init__(self, keys, starts, cells, points, session, rows):
+        self.keys = keys          # (U,) int64 sorted cell keys
+        self.starts = starts      # (U + 1,) int64 offsets of each cell's points
+        self.cells = cells        # (U, 3) int32 cell coordinates
+        self.points = points      # (N, 3) float32, in cell order
+        self.session = session    # (N,) int32 session code
+        self.rows = rows          # (N,) int64 sample index within the session
+
+    @classmethod
+    def build(cls, points: np.ndarray, session: np.ndarray, rows: np.ndarray,
+              cell_size: float) -> '_Run':
+        cells = np.floor(points / cell_size).astype(np.int64)
+        keys = _pack_cells(cells)
+        # Stable: merging concatenated runs is close to linear, and equal
+        # keys keep (session, row) order
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, np.int64)
+        return cls(keys[first], np.r_[first, len(keys)].astype(np.int64),
+                   cells[order][first].astype(np.int32), points[order],
+                   session[order], rows[order])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def cell_rows(self, lo_cell: np.ndarray, hi_cell: np.ndarray) -> np.ndarray:
+        """Point positions (into this run) in cells ``lo_cell..hi_cell`` inclusive."""
+        extent = hi_cell - lo_cell + 1
+        if np.any(extent <= 0) or not len(self.keys):
+            return np.zeros(0, dtype=np.int64)
+        if int(np.prod(extent)) <= len(self.keys):
+            axes = [np.arange(lo, hi + 1) for lo, hi in zip(lo_cell.tolist(), hi_cell.tolist())]
+            wanted = _pack_cells(np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3))
+            slot = np.clip(np.searchsorted(self.keys, wanted), 0, len(self.keys) - 1)
+            hits = slot[self.keys[slot] == wanted]
+        else:
+            # Query box larger than the occupied cells: scan the directory
+            hits = np.flatnonzero(np.all((self.cells >= lo_cell) & (self.cells <= hi_cell), axis=1))
+        if not len(hits):
+            return np.zeros(0, dtype=np.int64)
+        starts, stops = self.starts[hits], self.starts[hits + 1]
+        lengths = stops - starts
+        # Concatenated aranges starts[i]:stops[i]
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+class SpatialIndex:
+    """
+    Uniform-grid index over sample positions of one or more sessions.
+
+    Sessions are identified by a string key and numbered in insertion
+    order; queries return that session number with the sample index.
+    Samples without a position (NaN) are not indexed.
+
+    Attributes:
+        cell_size: Edge length of a grid cell (m)
+        keys: Session keys in session-number order
+        fingerprints: Per-session change detection values given to ``add``
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE, max_runs: int = 8):
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}")
+        self.cell_size = float(cell_size)
+        self.max_runs = max_runs
+        self.keys: List[str] = []
+        self.fingerprints: List[Optional[Dict]] = []
+        self._numbers: Dict[str, int] = {}
+        self._runs: List[_Run] = []
+        self._removed = np.zeros(0, dtype=bool)
+        self._bounds = None
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._numbers
+
+    @property
+    def num_sessions(self) -> int:
+        return len(self.keys)
+
+    def session_number(self, key: str) -> int:
+        """Session number of ``key`` (-1 if not indexed)."""
+        return self._numbers.get(key, -1)
+
+    def add(self, key: str, positions, fingerprint: Optional[Dict] = None,
+            rows: Optional[np.ndarray] = None) -> int:
+        """
+        Index one session's positions (replacing an earlier entry with the same key).
+
+        Args:
+            key: Session identifier
+            positions: (N, 3) array of x, y, z per sample
+            fingerprint: JSON-serialisable value stored for staleness checks
+            rows: Sample index of each position (default: 0..N-1)
+
+        Returns:
+            The session number used in query results
+        """
+        if key in self:
+            self.remove([key])
+        number = len(self.keys)
+        self._numbers[key] = number
+        self.keys.append(key)
+        self.fingerprints.append(fingerprint)
+        self._removed = np.r_[self._removed, False]
+        self._add_points(number, positions, rows)
+        return self._numbers[key]
+
+    def append(self, key: str, positions, rows) -> int:
+        """
+        Index more samples of an already indexed session (e.g. a followed session that grew).
+
+        Args:
+            key: Session identifier (added if not indexed yet)
+            positions: (M, 3) positions of the new samples
+            rows: Sample index of each position
+
+        Returns:
+            The session number used in query results
+        """
+        if key not in self:
+            return self.add(key, positions, rows=rows)
+        self._add_points(self._numbers[key], positions, rows)
+        return self._numbers[key]
+
+    def _add_points(self, number: int, positions, rows: Optional[np.ndarray]):
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        rows = np.arange(len(positions), dtype=np.int64) if rows is None else np.asarray(rows, np.int64)
+        valid = ~np.isnan(positions).any(axis=1)
+        if not valid.any():
+            return
+        points = positions[valid]
+        self._runs.append(_Run.build(points, np.full(len(points), number, dtype=np.int32),
+                                     rows[valid], self.cell_size))
+        bounds = np.stack([points.min(axis=0), points.max(axis=0)])
+        self._bounds = bounds if self._bounds is None else np.stack(
+            [np.minimum(self._bounds[0], bounds[0]), np.maximum(self._bounds[1], bounds[1])])
+        if len(self._runs) > self.max_runs:
+            self.compact()
+
+    def remove(self, keys: Sequence[str]):
+        """Drop sessions from query results (their points are purged on the next ``compact``)."""
+        for key in keys:
+            if key in self._numbers:
+                self._removed[self._numbers.pop(key)] = True
+
+    def compact(self) -> 'SpatialIndex':
+        """Merge all runs into one, dropping removed sessions (live sessions are renumbered)."""
+        if len(self._runs) <= 1 and not self._removed.any():
+            return self
+        points = np.concatenate([run.points for run in self._runs]) if self._runs else np.zeros((0, 3), np.float32)
+        session = np.concatenate([run.session for run in self._runs]) if self._runs else np.zeros(0, np.int32)
+        rows = np.concatenate([run.rows for run in self._runs]) if self._runs else np.zeros(0, np.int64)
+        keep = ~self._removed[session]
+        points, session, rows = points[keep], session[keep], rows[keep]
+        if self._removed.any():
+            live = ~self._removed
+            session = (np.cumsum(live) - 1)[session].astype(np.int32)
+            self.keys = [key for key, alive in zip(self.keys, live) if alive]
+            self.fingerprints = [fp for fp, alive in zip(self.fingerprints, live) if alive]
+            self._numbers = {key: number for number, key in enumerate(self.keys)}
+            self._removed = np.zeros(len(self.keys), dtype=bool)
+        self._runs = [_Run.build(points, session, rows, self.cell_size)] if len(points) else []
+        self._bounds = np.stack([points.min(axis=0), points.max(axis=0)]) if len(points) else None
+        return self
+
+    def _cell_range(self, lo, hi) -> Tuple[np.ndarray, np.ndarray]:
+        return (np.floor(np.asarray(lo, np.float64) / self.cell_size).astype(np.int64),
+                np.floor(np.asarray(hi, np.float64) / self.cell_size).astype(np.int64))
+
+    def _gather(self, lo, hi, keep) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(session, rows, points) of live points in the box ``lo..hi`` accepted by ``keep(points)``."""
+        lo_cell, hi_cell = self._cell_range(lo, hi)
+        sessions, rows, points = [], [], []
+        for run in self._runs:
+            found = run.cell_rows(lo_cell, hi_cell)
+            mask = keep(run.points[found]) & ~self._removed[run.session[found]]
+            found = found[mask]
+            sessions.append(run.session[found])
+            rows.append(run.rows[found])
+            points.append(run.points[found])
+        if not sessions:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros((0, 3), np.float32)
+        return (np.concatenate(sessions).astype(np.int64), np.concatenate(rows),
+                np.concatenate(points))
+
+    @staticmethod
+    def _sorted(session: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.lexsort((rows, session))
+        return session[order], rows[order]
+
+    def radius(self, center, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples within ``radius`` of ``center`` (inclusive).
+
+        Returns:
+            Tuple of int64 arrays (session, sample), sorted by session then sample
+        """
+        center = np.asarray(center, dtype=np.float64).reshape(3)
+        within = lambda p: np.sum((p - center) ** 2, axis=1) <= radius * radius
+        session, rows, _ = self._gather(center - radius, center + radius, within)
+        return self._sorted(session, rows)
+
+    def box(self, lo, hi) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples with ``lo <= position <= hi`` on every axis.
+
+        Returns:
+            Tuple of int64 arrays (session, sample), sorted by session then sample
+        """
+        lo = np.asarray(lo, dtype=np.float64).reshape(3)
+        hi = np.asarray(hi, dtype=np.float64).reshape(3)
+        inside = lambda p: np.all((p >= lo) & (p <= hi), axis=1)
+        session, rows, _ = self._gather(lo, hi, inside)
+        return self._sorted(session, rows)
+
+    def nearest(self, point, k: int = 1, max_distance: Optional[float] = None
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The ``k`` samples closest to ``point``.
+
+        The search radius starts at one cell and doubles until ``k`` points
+        fall inside it, so only the neighbourhood of ``point`` is scanned.
+
+        Args:
+            point: Query position (x, y, z)
+            k: Number of neighbours
+            max_distance: Ignore samples farther than this
+
+        Returns:
+            Tuple of (session, sample, distance) arrays ordered by distance
+            (fewer than ``k`` entries if the index holds fewer points)
+        """
+        point = np.asarray(point, dtype=np.float64).reshape(3)
+        empty = (np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float64))
+        if self._bounds is None or k <= 0:
+            return empty
+        # Beyond this radius the sphere covers every indexed point
+        reach = float(np.sqrt(np.sum(np.abs(self._bounds - point).max(axis=0) ** 2)))
+        limit = reach if max_distance is None else min(reach, max_distance)
+        radius = min(self.cell_size, limit)
+        while True:
+            within = lambda p: np.sum((p - point) ** 2, axis=1) <= radius * radius
+            session, rows, points = self._gather(point - radius, point + radius, within)
+            if len(rows) >= k or radius >= limit:
+                break
+            radius = min(radius * 2, limit)
+        distance = np.sqrt(np.sum((points - point) ** 2, axis=1))
+        order = np.lexsort((rows, session, distance))[:k]
+        return session[order], rows[order], distance[order]
+
+    def save(self, path) -> Path:
+        """
+        Write the index (compacted) to directory ``path``.
+
+        Each save writes its arrays under a new generation name and then
+        swaps in ``spatial.json`` naming that generation, so an interrupted
+        save leaves the previous manifest and its arrays untouched. The
+        previous generation's arrays are removed afterwards.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.compact()
+        run = self._runs[0] if self._runs else _Run.build(
+            np.zeros((0, 3), np.float32), np.zeros(0, np.int32), np.zeros(0, np.int64), self.cell_size)
+        previous = _manifest_generation(path)
+        generation = f"{os.getpid()}-{time.time_ns()}"
+        for name in _RUN_ARRAYS:
+            tmp_path = path / f"{name}.tmp{os.getpid()}.npy"
+            np.save(tmp_path, np.ascontiguousarray(getattr(run, name)))
+            os.replace(tmp_path, path / f"{name}.{generation}.npy")
+
+        manifest = {
+            'version': SPATIAL_FORMAT_VERSION,
+            'generation': generation,
+            'cell_size': self.cell_size,
+            'num_points': len(run),
+            'num_cells': len(run.keys),
+            'sessions': [{'key': key, 'fingerprint': fingerprint}
+                         for key, fingerprint in zip(self.keys, self.fingerprints)],
+        }
+        tmp_path = path / f"{SPATIAL_MANIFEST}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path / SPATIAL_MANIFEST)
+
+        if previous is not None and previous != generation:
+            for name in _RUN_ARRAYS:
+                try:
+                    (path / f"{name}.{previous}.npy").unlink()
+                except OSError:
+                    pass  # already gone, or still mapped on a platform that forbids it
+        return path
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> 'SpatialIndex':
+        """
+        Open an index written by ``save`` (arrays memory-mapped by default).
+
+        Raises:
+            ValueError: If the manifest version or array sizes do not match
+        """
+        path = Path(path)
+        with open(path / SPATIAL_MANIFEST, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != SPATIAL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported spatial index version {manifest.get('version')} in {path}")
+        generation = manifest['generation']
+        arrays = {name: np.load(path / f"{name}.{generation}.npy", mmap_mode='r' if mmap else None)
+                  for name in _RUN_ARRAYS}
+        if (len(arrays['rows']) != manifest['num_points'] or len(arrays['keys']) != manifest['num_cells']
+                or len(arrays['starts']) != manifest['num_cells'] + 1):
+            raise ValueError(f"Spatial index arrays in {path} do not match {SPATIAL_MANIFEST}")
+
+        index = cls(manifest['cell_size'])
+        sessions = manifest['sessions']
+        index.keys = [entry['key'] for entry in sessions]
+        index.fingerprints = [entry.get('fingerprint') for entry in sessions]
+        index._numbers = {key: number for number, key in enumerate(index.keys)}
+        index._removed = np.zeros(len(index.keys), dtype=bool)
+        if manifest['num_points']:
+            run = _Run(**arrays)
+            index._runs = [run]
+            points = np.asarray(run.points)
+            index._bounds = np.stack([points.min(axis=0), points.max(axis=0)])
+        return index
+
+
+def _manifest_generation(path: Path) -> Optional[str]:
+    """Generation named by the manifest in ``path``, or None if there is no readable one."""
+    try:
+        with open(path / SPATIAL_MANIFEST, 'r') as f:
+            return json.load(f).get('generation')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def session_key(dataset) -> str:
+    """Identifier of a session in a corpus index: its metadata location, else its id."""
+    if dataset.base_path is None:
+        return str(dataset.session_id)
+    return str(Path(dataset.base_path) / dataset.session_id)
+
+
+def session_fingerprint(dataset) -> Dict:
+    """Row count and JSONL fingerprint; a change means the session must be re-indexed."""
+    from reacture_columns import source_fingerprint
+
+    jsonl_path = dataset.jsonl_path
+    return {
+        'num_rows': len(dataset),
+        'jsonl': source_fingerprint(jsonl_path) if jsonl_path is not None else None,
+    }
+
+
+def index_sessions(sessions: Sequence, path=None, cell_size: float = DEFAULT_CELL_SIZE
+                   ) -> Tuple[SpatialIndex, np.ndarray]:
+    """
+    Spatial index over ``sessions``, reusing (and updating) the index saved at ``path``.
+
+    Only sessions missing from the saved index, or whose fingerprint changed,
+    are indexed; entries for other sessions are kept, so several corpora
+    (e.g. shards) can share one index directory.
+
+    Args:
+        sessions: ReActureDataset objects
+        path: Index directory (None: build in memory only)
+        cell_size: Grid cell size (a saved index with another size is rebuilt)
+
+    Returns:
+        Tuple of (index, mapping) where ``mapping[session number]`` is the
+        position in ``sessions`` (-1 for sessions not in this list)
+    """
+    index = None
+    if path is not None and (Path(path) / SPATIAL_MANIFEST).exists():
+        try:
+            index = SpatialIndex.load(path)
+        except (OSError, ValueError, KeyError):
+            index = None
+        if index is not None and index.cell_size != float(cell_size):
+            index = None
+    if index is None:
+        index = SpatialIndex(cell_size)
+
+    changed = False
+    for session in sessions:
+        key = session_key(session)
+        fingerprint = session_fingerprint(session)
+        number = index.session_number(key)
+        if number >= 0 and index.fingerprints[number] == fingerprint:
+            continue
+        index.add(key, session.columns.group('robot.position'), fingerprint)
+        changed = True
+    if changed and path is not None:
+        index.save(path)
+
+    mapping = np.full(index.num_sessions, -1, dtype=np.int64)
+    for position, session in enumerate(sessions):
+        mapping[index.session_number(session_key(session))] = position
+    return index, mapping
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+ReActure Dataset Statistics
+===========================
+
+Single-pass, mergeable statistics over sessions.
+
+Every numeric column group gets running count/mean/M2/min/max accumulators
+(Welford/Chan updates, one chunk at a time, NaN-aware), flags get their
+frequency, categorical columns get value counts, and frames get a per-channel
+256-bin pixel histogram from which exact mean/std follow. Accumulators from
+different sessions merge exactly, so corpus-wide normalisation constants are
+a merge of cached per-session results rather than a rescan of every frame.
+
+Per-session results are cached as ``<session>_stats.json`` (or
+``<session>_stats_noframes.json`` without pixel statistics) beside the
+metadata and rebuilt when the JSONL or frames change.
+
+Usage:
+    from reacture_stats import corpus_statistics
+
+    stats = dataset.compute_statistics()          # one session (cached)
+    corpus = corpus_statistics(metadata_paths, processes=8)
+    mean, std = corpus.frame_mean, corpus.frame_std   # per channel, [0, 1] scale
+"""
+
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from reacture_columns import COLUMN_SCHEMA, source_fingerprint
+
+STATS_FORMAT_VERSION = 2
+
+# Rows (or frames) processed per accumulator update
+DEFAULT_STATS_CHUNK_ROWS = 65536
+DEFAULT_STATS_CHUNK_FRAMES = 256
+
+# Groups summarised with moments (flags give their frequency as the mean);
+# the frame reference index and wall-clock timestamps are bookkeeping, not telemetry
+MOMENT_KINDS = ('f8', 'i2', 'bool')
+SKIPPED_GROUPS = ('visual_frame_index', 'timestamp_utc_ms')
+
+LEAVES = {name: leaves for name, _, leaves in COLUMN_SCHEMA}
+
+
+def _to_json(array: np.ndarray) -> List:
+    return [None if not np.isfinite(v) else float(v) for v in np.asarray(array, dtype=np.float64)]
+
+
+def _from_json(values: List, fill: float) -> np.ndarray:
+    return np.array([fill if v is None else v for v in values], dtype=np.float64)
+
+
+class RunningMoments:
+    """
+    Per-column count, mean, M2, min and max, updated chunk by chunk.
+
+    NaN entries are ignored column by column.
+    """
+
+    def __init__(self, width: int):
+        self.count = np.zeros(width, dtype=np.int64)
+        self.mean = np.zeros(width, dtype=np.float64)
+        self.m2 = np.zeros(width, dtype=np.float64)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+
+    def update(self, values: np.ndarray):
+        """Fold in a chunk of shape (n,) or (n, width)."""
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        if not count.any():
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, values, 0.0).sum(axis=0) / count
+        mean = np.nan_to_num(mean)
+        m2 = (np.where(valid, values - mean, 0.0) ** 2).sum(axis=0)
+        self._combine(count, mean, m2,
+                      np.where(valid, values, np.inf).min(axis=0),
+                      np.where(valid, values, -np.inf).max(axis=0))
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        # Chan et al. pairwise update: exact for any split of the data
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, count / total, 0.0)
+        delta = mean - self.mean
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * weight
+        self.count = total
+        self.min = np.minimum(self.min, minimum)
+        self.max = np.maximum(self.max, maximum)
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def var(self) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.m2 / self.count, np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count.tolist(),
+            'mean': _to_json(self.mean),
+            'm2': _to_json(self.m2),
+            'min': _to_json(self.min),
+            'max': _to_json(self.max),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RunningMoments':
+        moments = cls(len(data['count']))
+        moments.count = np.array(data['count'], dtype=np.int64)
+        moments.mean = _from_json(data['mean'], 0.0)
+        moments.m2 = _from_json(data['m2'], 0.0)
+        moments.min = _from_json(data['min'], np.inf)
+        moments.max = _from_json(data['max'], -np.inf)
+        return moments
+
+
+class DatasetStatistics:
+    """
+    Mergeable statistics for one session or a whole corpus.
+
+    Attributes:
+        num_sessions: Sessions folded in
+        num_rows: JSONL rows (all types)
+        num_frames: Frames
+        duration_s: Summed session duration from metadata
+        moments: Column group -> RunningMoments (robot_state rows)
+        category_counts: Categorical group -> {value: count} (all rows)
+        pixel_histogram: int64 (C, 256) pixel counts per channel, or None
+    """
+
+    def __init__(self):
+        self.num_sessions = 0
+        self.num_rows = 0
+        self.num_frames = 0
+        self.duration_s = 0.0
+        self.sampling_rates: List[float] = []
+        self.moments: Dict[str, RunningMoments] = {}
+        self.category_counts: Dict[str, Dict[str, int]] = {}
+        self.pixel_histogram: Optional[np.ndarray] = None
+
+    def merge(self, other: 'DatasetStatistics') -> 'DatasetStatistics':
+        """Fold another result into this one (in place) and return self."""
+        self.num_sessions += other.num_sessions
+        self.num_rows += other.num_rows
+        self.num_frames += other.num_frames
+        self.duration_s += other.duration_s
+        self.sampling_rates += other.sampling_rates
+        for name, moments in other.moments.items():
+            if name in self.moments:
+                self.moments[name].merge(moments)
+            else:
+                self.moments[name] = RunningMoments.from_dict(moments.to_dict())
+        for name, counts in other.category_counts.items():
+            mine = self.category_counts.setdefault(name, {})
+            for value, count in counts.items():
+                mine[value] = mine.get(value, 0) + count
+        if other.pixel_histogram is not None:
+            if self.pixel_histogram is None:
+                self.pixel_histogram = other.pixel_histogram.copy()
+            elif self.pixel_histogram.shape != other.pixel_histogram.shape:
+                raise ValueError("Cannot merge frame statistics with different channel counts")
+            else:
+                self.pixel_histogram += other.pixel_histogram
+        return self
+
+    @classmethod
+    def combine(cls, parts: Sequence['DatasetStatistics']) -> 'DatasetStatistics':
+        total = cls()
+        for part in parts:
+            total.merge(part)
+        return total
+
+    def _pixel_moments(self):
+        hist = self.pixel_histogram
+        levels = np.arange(hist.shape[1], dtype=np.float64)
+        count = hist.sum(axis=1)
+        mean = hist @ levels / count
+        var = hist @ levels ** 2 / count - mean ** 2
+        return mean, np.sqrt(np.maximum(var, 0.0))
+
+    @property
+    def frame_mean(self) -> Optional[np.ndarray]:
+        """Per-channel pixel mean on the [0, 1] scale."""
+        return None if self.pixel_histogram is None else self._pixel_moments()[0] / 255.0
+
+    @property
+    def frame_std(self) -> Optional[np.ndarray]:
+        """Per-channel pixel standard deviation on the [0, 1] scale."""
+        return None if self.pixel_histogram is None else self._pixel_moments()[1] / 255.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'num_sessions': self.num_sessions,
+            'num_rows': self.num_rows,
+            'num_frames': self.num_frames,
+            'duration_s': self.duration_s,
+            'sampling_rates': self.sampling_rates,
+            'moments': {name: m.to_dict() for name, m in self.moments.items()},
+            'category_counts': self.category_counts,
+            'pixel_histogram': (self.pixel_histogram.tolist()
+                                if self.pixel_histogram is not None else None),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DatasetStatistics':
+        stats = cls()
+        stats.num_sessions = data['num_sessions']
+        stats.num_rows = data['num_rows']
+        stats.num_frames = data['num_frames']
+        stats.duration_s = data['duration_s']
+        stats.sampling_rates = data['sampling_rates']
+        stats.moments = {name: RunningMoments.from_dict(m) for name, m in data['moments'].items()}
+        stats.category_counts = data['category_counts']
+        if data['pixel_histogram'] is not None:
+            stats.pixel_histogram = np.array(data['pixel_histogram'], dtype=np.int64)
+        return stats
+
+    def _group_stats(self, name: str) -> Dict[str, List]:
+        m = self.moments[name]
+        return {
+            'mean': _to_json(m.mean),
+            'std': _to_json(m.std),
+            'min': _to_json(m.min),
+            'max': _to_json(m.max),
+        }
+
+    def _scalar_stats(self, name: str) -> Dict[str, Optional[float]]:
+        return {key: values[0] for key, values in self._group_stats(name).items()}
+
+    def summary(self) -> Dict:
+        """
+        JSON-friendly summary (the ``ReActureDataset.get_statistics`` layout).
+
+        Position, battery, damage and key-press figures keep their original
+        keys; 'columns' covers every numeric group by leaf name, and
+        'frame_stats' holds per-channel normalisation constants.
+        """
+        position = self._group_stats('robot.position')
+        keys = self.moments['key_presses'].mean
+        rates = sorted(set(self.sampling_rates))
+        summary = {
+            'num_samples': self.num_rows,
+            'num_frames': self.num_frames,
+            'num_sessions': self.num_sessions,
+            'duration_s': self.duration_s,
+            'sampling_rate': rates[0] if len(rates) == 1 else rates,
+            'trajectory_stats': {f'{key}_position': values for key, values in position.items()},
+            'key_press_frequency': {
+                leaf.split('.')[-1]: float(np.nan_to_num(keys[i]))
+                for i, leaf in enumerate(LEAVES['key_presses'][:6])
+            },
+            'battery_stats': self._scalar_stats('battery'),
+            'damage_stats': self._scalar_stats('damage'),
+            'columns': {},
+            'category_counts': self.category_counts,
+        }
+        for name, moments in self.moments.items():
+            group = self._group_stats(name)
+            for i, leaf in enumerate(LEAVES[name]):
+                summary['columns'][leaf] = dict(
+                    {key: values[i] for key, values in group.items()},
+                    count=int(moments.count[i]),
+                )
+        if self.pixel_histogram is not None:
+            summary['frame_stats'] = {
+                'mean': self.frame_mean.tolist(),
+                'std': self.frame_std.tolist(),
+            }
+        return summary
+
+
+def stats_cache_path(dataset, include_frames: bool = True) -> Optional[Path]:
+    """``<session>_stats.json`` (``_stats_noframes.json`` without frames) beside the metadata."""
+    if dataset.base_path is None:
+        return None
+    suffix = '_stats.json' if include_frames else '_stats_noframes.json'
+    return Path(dataset.base_path) / f"{dataset.session_id}{suffix}"
+
+
+def stats_params(dataset, include_frames: bool) -> Dict:
+    """Cache key: invalidated when the JSONL, the frames or the options change."""
+    jsonl_path = dataset.jsonl_path
+    return {
+        'version': STATS_FORMAT_VERSION,
+        'session_id': dataset.session_id,
+        'num_rows': len(dataset),
+        'jsonl': source_fingerprint(jsonl_path) if jsonl_path is not None else None,
+        'frames': dataset._frames_fingerprint() if include_frames else None,
+    }
+
+
+def accumulate_rows(stats: DatasetStatistics, columns, start: int = 0, stop: Optional[int] = None,
+                    chunk_rows: int = DEFAULT_STATS_CHUNK_ROWS) -> DatasetStatistics:
+    """
+    Fold telemetry rows ``start:stop`` into ``stats`` (in place).
+
+    Numeric groups are accumulated over the 'robot_state' rows of the
+    range; categorical counts cover every row.
+
+    Returns:
+        ``stats``
+    """
+    stop = len(columns) if stop is None else stop
+    stats.num_rows += stop - start
+    is_robot_state = (np.asarray(columns.group('type')[start:stop])
+                      == columns.code_of('type', 'robot_state'))
+    rows = slice(start, stop) if is_robot_state.all() else np.flatnonzero(is_robot_state) + start
+    num_selected = stop - start if isinstance(rows, slice) else len(rows)
+    for name, kind, leaves in COLUMN_SCHEMA:
+        if name in SKIPPED_GROUPS or name not in columns:
+            continue
+        array = columns.group(name)
+        if kind == 'category':
+            codes = np.asarray(array[start:stop])
+            counts = np.bincount(codes[codes >= 0], minlength=len(columns.categories[name]))
+            mine = stats.category_counts.setdefault(name, {})
+            for value, count in zip(columns.categories[name], counts):
+                if count:
+                    mine[value] = mine.get(value, 0) + int(count)
+            continue
+        if kind not in MOMENT_KINDS:
+            continue
+        moments = stats.moments.get(name)
+        if moments is None:
+            moments = stats.moments[name] = RunningMoments(len(leaves))
+        for lo in range(0, num_selected, chunk_rows):
+            if isinstance(rows, slice):
+                selector = slice(start + lo, min(start + lo + chunk_rows, stop))
+            else:
+                selector = rows[lo:lo + chunk_rows]
+            values = np.asarray(array[selector], dtype=np.float64)
+            if kind == 'i2':
+                values[values < 0] = np.nan          # -1 marks a missing count
+            moments.update(values)
+    return stats
+
+
+def accumulate_frames(stats: DatasetStatistics, store, start: int = 0, stop: Optional[int] = None,
+                      histogram: bool = True,
+                      chunk_frames: int = DEFAULT_STATS_CHUNK_FRAMES) -> DatasetStatistics:
+    """
+    Fold frames ``start:stop`` of a FrameStore into ``stats`` (in place).
+
+    Args:
+        histogram: Also add the frames to the per-channel pixel histogram
+
+    Returns:
+        ``stats``
+    """
+    stop = len(store) if stop is None else stop
+    stats.num_frames += stop - start
+    if not histogram:
+        return stats
+    if store.dtype != np.uint8:
+        raise ValueError(f"Pixel histograms need uint8 frames, got {store.dtype}")
+    channels = store.shape[-1] if len(store.shape) == 4 else 1
+    if stats.pixel_histogram is None:
+        stats.pixel_histogram = np.zeros((channels, 256), dtype=np.int64)
+    hist = stats.pixel_histogram
+    for lo in range(start, stop, chunk_frames):
+        chunk = np.asarray(store[lo:min(lo + chunk_frames, stop)]).reshape(-1, channels)
+        for c in range(channels):
+            hist[c] += np.bincount(chunk[:, c], minlength=256)
+    return stats
+
+
+def compute_session_statistics(dataset, include_frames: bool = True,
+                               chunk_rows: int = DEFAULT_STATS_CHUNK_ROWS,
+                               chunk_frames: int = DEFAULT_STATS_CHUNK_FRAMES) -> DatasetStatistics:
+    """
+    Scan one session once, chunk by chunk.
+
+    Numeric groups are accumulated over 'robot_state' rows; categorical
+    counts cover every row.
+
+    Args:
+        dataset: ReActureDataset
+        include_frames: Also build the per-channel pixel histogram
+        chunk_rows: Telemetry rows per accumulator update
+        chunk_frames: Frames per histogram update
+
+    Returns:
+        DatasetStatistics for this session
+    """
+    stats = DatasetStatistics()
+    stats.num_sessions = 1
+    stats.duration_s = float(dataset.metadata.get('duration_s', 0.0))
+    if 'sampling_rate_hz' in dataset.metadata:
+        stats.sampling_rates = [float(dataset.metadata['sampling_rate_hz'])]
+
+    accumulate_rows(stats, dataset.columns, chunk_rows=chunk_rows)
+    if dataset.frame_store is not None:
+        accumulate_frames(stats, dataset.frame_store, histogram=include_frames,
+                          chunk_frames=chunk_frames)
+    return stats
+
+
+def load_session_statistics(dataset, include_frames: bool = True,
+                            use_cache: bool = True) -> DatasetStatistics:
+    """
+    Session statistics, read from the session's stats cache when up to date.
+
+    Args:
+        dataset: ReActureDataset
+        include_frames: Include the pixel histogram
+        use_cache: Read/write the per-session cache file
+
+    Returns:
+        DatasetStatistics
+    """
+    path = stats_cache_path(dataset, include_frames) if use_cache else None
+    params = stats_params(dataset, include_frames)
+    if path is not None and path.exists():
+        try:
+            with open(path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('params') == params:
+                return DatasetStatistics.from_dict(cached['stats'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    stats = compute_session_statistics(dataset, include_frames=include_frames)
+    if path is not None:
+        tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'params': params, 'stats': stats.to_dict()}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            warnings.warn(f"Could not write {path}: {e}")
+    return stats
+
+
+def _session_statistics(session, include_frames: bool, use_cache: bool) -> DatasetStatistics:
+    """Worker: open (if given a path) and summarise one session."""
+    if not hasattr(session, 'columns'):
+        from load_reacture_dataset import ReActureDataset
+        session = ReActureDataset(session)
+    return load_session_statistics(session, include_frames=include_frames, use_cache=use_cache)
+
+
+def corpus_statistics(sessions: Sequence[Union[str, Path, object]], processes: Optional[int] = None,
+                      include_frames: bool = True, use_cache: bool = True) -> DatasetStatistics:
+    """
+    Merge per-session statistics, computing missing ones in a process pool.
+
+    Args:
+        sessions: ReActureDataset objects or metadata paths
+        processes: Worker processes (None: CPU count, 0 or 1: in this process)
+        include_frames: Include pixel histograms
+        use_cache: Use the per-session stats caches
+
+    Returns:
+        DatasetStatistics over every session
+    """
+    sessions = [str(s) if isinstance(s, Path) else s for s in sessions]
+    if len(sessions) > 1 and processes not in (0, 1):
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_session_statistics, sessions,
+                                  [include_frames] * len(sessions), [use_cache] * len(sessions)))
+    else:
+        parts = [_session_statistics(s, include_frames, use_cache) for s in sessions]
+    return DatasetStatistics.combine(parts)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from reacture_instrument import log_to_stdout
+    from reacture_multi import discover_sessions
+
+    p = argparse.ArgumentParser(description="Compute (and cache) ReActure dataset statistics.")
+    p.add_argument("inputs", nargs="+", help="Session metadata files or directories to search")
+    p.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--no-frames", action="store_true", help="Skip pixel statistics")
+    p.add_argument("--no-cache", action="store_true", help="Ignore and don't write stats caches")
+    args = p.parse_args()
+    log_to_stdout()
+
+    stats = corpus_statistics(discover_sessions(args.inputs), processes=args.processes,
+                              include_frames=not args.no_frames, use_cache=not args.no_cache)
+    print(json.dumps(stats.summary(), indent=2))
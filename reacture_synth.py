@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+ReActure Synthetic Sessions
+===========================
+
+Generate schema-faithful sessions (``DATASET_FORMAT.md``) at any size, for
+benchmarks and tests that need more than the sample data in the repo.
+
+Each session has the files the game exports:
+
+- ``<session>_metadata.json`` - session metadata and ``data_stats``
+- ``<session>_data.jsonl`` - ``game_start``, 10 Hz ``periodic_update_10hz``
+  rows with ``visual_frame_path``, event ``robot_state`` rows (zone changes,
+  zone and collision damage, rubble, rescues, inspect) interleaved with
+  ``player_action`` rows (movement keys, jump, refuel, ...) as ``game.js``
+  logs them, and a final ``game_end``
+- ``<session>_frames.npy`` - uint8 (N, H, W, 3) first-person frames
+- ``<session>_timestamps.npy`` - float32 frame timestamps in ms
+
+Telemetry follows a smooth random walk (so trajectories, zones and battery
+drain look plausible) and frames are smooth synthetic scenes that move with
+the robot's yaw, so compression and decode benchmarks behave like real
+footage rather than noise. Frames are written in chunks through a memory
+map, so sessions of any duration fit in constant memory.
+
+Usage:
+    python reacture_synth.py out/ --sessions 8 --duration 1800 --processes 4
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+SAMPLING_RATE_HZ = 10
+DEFAULT_FRAME_SHAPE = (128, 128, 3)
+FRAME_CHUNK = 256
+
+ENVIRONMENTS = {
+    'earthquake': 'Earthquake Zone',
+    'flood': 'Flood Zone',
+    'fire': 'Fire Zone',
+}
+
+# Mean occurrences per second of gameplay for events that are not tied to
+# the robot's state: (kind, name)
+EVENT_RATES: Dict[Tuple[str, str], float] = {
+    ('player_action', 'move_forward_start'): 0.25,
+    ('player_action', 'move_forward_stop'): 0.25,
+    ('player_action', 'move_left_start'): 0.1,
+    ('player_action', 'move_left_stop'): 0.1,
+    ('player_action', 'move_right_start'): 0.1,
+    ('player_action', 'move_right_stop'): 0.1,
+    ('player_action', 'move_backward_start'): 0.05,
+    ('player_action', 'move_backward_stop'): 0.05,
+    ('player_action', 'jump'): 0.05,
+    ('player_action', 'inspect_start'): 0.02,
+    ('player_action', 'inspect_end'): 0.02,
+    ('player_action', 'refuel'): 0.01,
+    ('robot_state', 'destroy_rubble'): 0.03,
+    ('robot_state', 'collision_damage'): 0.02,
+    ('robot_state', 'rescue'): 0.01,
+    ('robot_state', 'inspect'): 0.02,
+}
+
+
+def _session_name(start_ms: int, rng: np.random.Generator) -> str:
+    suffix = ''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyz0123456789'), 9))
+    return f"reacture_{start_ms}_{suffix}"
+
+
+def _telemetry(n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Vectorised 10 Hz robot state for ``n`` periodic rows."""
+    dt = 1.0 / SAMPLING_RATE_HZ
+    # Yaw drifts; speed switches between driving and standing still
+    yaw = np.cumsum(rng.normal(0, 0.05, n))
+    moving = np.repeat(rng.random(n // 20 + 1) < 0.7, 20)[:n]
+    speed = np.where(moving, 2.0 + rng.normal(0, 0.2, n), 0.0)
+    velocity = np.stack([speed * np.sin(yaw), np.zeros(n), speed * np.cos(yaw)], axis=1)
+    position = np.cumsum(velocity * dt, axis=0) + [0.0, 1.5, 0.0]
+    accel = np.gradient(velocity, dt, axis=0) + rng.normal(0, 0.05, (n, 3))
+
+    # Hazard zones laid out as a smooth field over the map
+    hazard = np.sin(position[:, 0] / 20.0) * np.cos(position[:, 2] / 20.0)
+    zone = np.where(hazard > 0.7, 'red', np.where(hazard > 0.4, 'yellow', 'safe'))
+    fuel = np.clip(100.0 - np.cumsum(np.where(moving, 0.02, 0.005)), 0.0, 100.0)
+    health = np.clip(100.0 - np.cumsum(np.where(zone == 'red', 0.05, 0.0)), 0.0, 100.0)
+
+    keys = {
+        'W': moving & (rng.random(n) < 0.9), 'A': rng.random(n) < 0.1, 'S': rng.random(n) < 0.03,
+        'D': rng.random(n) < 0.1, 'inspect': np.repeat(rng.random(n // 50 + 1) < 0.1, 50)[:n],
+    }
+    victims = rng.poisson(0.6, n)
+    return {'yaw': yaw, 'position': position, 'velocity': velocity, 'accel': accel,
+            'zone': zone, 'fuel': fuel, 'health': health, 'keys': keys,
+            'mouse': rng.normal(0, 3, (n, 2)), 'victims': victims,
+            'proximity': rng.uniform(0.5, 10.0, (n, 4))}
+
+
+def _sensors(tel: Dict, i: int, rng: np.random.Generator) -> Dict:
+    zone = str(tel['zone'][i])
+    count = int(tel['victims'][i])
+    forward, left, right, back = (round(float(v), 2) for v in tel['proximity'][i])
+    return {
+        'proximity': forward,
+        'proximitySensors': {'forward': forward, 'left': left, 'right': right, 'back': back},
+        'victimsDetected': count,
+        'victims': [{'distance': round(float(rng.uniform(1, 15)), 2),
+                     'angle': round(float(rng.uniform(-np.pi, np.pi)), 2),
+                     'health': int(rng.integers(10, 100))} for _ in range(count)],
+        'fuelStationDistance': round(float(np.hypot(*tel['position'][i, [0, 2]] - 20.0)), 2),
+        'zone': zone,
+        'inYellowZone': zone == 'yellow',
+        'inRedZone': zone == 'red',
+    }
+
+
+def _robot_state(tel: Dict, i: int, t_ms: int, start: datetime, event: str,
+                 rng: np.random.Generator, **extra) -> Dict:
+    """A ``logRobotState`` record at telemetry step ``i``."""
+    x, y, z = (round(float(v), 4) for v in tel['position'][i])
+    yaw = round(float(tel['yaw'][i]), 4)
+    keys = tel['keys']
+    inspect = bool(keys['inspect'][i])
+    record = {
+        'timestamp': (start + timedelta(milliseconds=t_ms)).isoformat(timespec='milliseconds')
+                     .replace('+00:00', 'Z'),
+        'timestamp_ms': t_ms,
+        'time_elapsed_s': t_ms / 1000,
+        'type': 'robot_state',
+        'event': event,
+        'key_presses': {
+            'W': bool(keys['W'][i]), 'A': bool(keys['A'][i]), 'S': bool(keys['S'][i]),
+            'D': bool(keys['D'][i]), 'Space': False, 'E': inspect, 'R': False,
+            'mouse_dx': round(float(tel['mouse'][i, 0]), 2),
+            'mouse_dy': round(float(tel['mouse'][i, 1]), 2),
+            'inspect': inspect, 'destroy': False,
+        },
+        'robot': {
+            'position': {'x': x, 'y': y, 'z': z},
+            'rotation': {'x': 0, 'y': yaw, 'z': 0},
+            'velocity': dict(zip('xyz', (round(float(v), 4) for v in tel['velocity'][i]))),
+            'isJumping': False,
+        },
+        'accelerometer': dict(zip('xyz', (round(float(v), 4) for v in tel['accel'][i]))),
+        'battery': round(float(tel['fuel'][i]), 2),
+        'damage': round((100.0 - float(tel['health'][i])) / 100.0, 4),
+        'health': round(float(tel['health'][i]), 2),
+        'fuel': round(float(tel['fuel'][i]), 2),
+        'zone': str(tel['zone'][i]),
+        'camera': {
+            'position': {'x': x, 'y': 3.0, 'z': z},
+            'rotation': {'x': -0.05, 'y': yaw, 'z': 0},
+            'yaw': yaw,
+            'pitch': -0.05,
+        },
+        'sensors': _sensors(tel, i, rng),
+    }
+    record.update(extra)
+    return record
+
+
+def _player_action(tel: Dict, i: int, t_ms: int, action: str, rng: np.random.Generator,
+                   **extra) -> Dict:
+    """A ``logPlayerAction`` record (integer ms ``timestamp``, no ``timestamp_ms``)."""
+    record = {
+        'timestamp': t_ms,
+        'type': 'player_action',
+        'action': action,
+        'robot': {
+            'position': dict(zip('xyz', (round(float(v), 4) for v in tel['position'][i]))),
+            'rotation': {'x': 0, 'y': round(float(tel['yaw'][i]), 4), 'z': 0},
+        },
+        'sensors': _sensors(tel, i, rng),
+    }
+    record.update(extra)
+    return record
+
+
+def render_frames(yaw: np.ndarray, zone: np.ndarray, frame_shape=DEFAULT_FRAME_SHAPE,
+                  rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Smooth synthetic first-person frames: sky, ground and a skyline that pans with yaw.
+
+    Returns:
+        uint8 array (len(yaw), H, W, C)
+    """
+    height, width, channels = frame_shape
+    rows = np.linspace(0.0, 1.0, height, dtype=np.float32)[None, :, None]
+    cols = np.linspace(0.0, 2 * np.pi, width, dtype=np.float32)[None, None, :]
+    pan = (yaw.astype(np.float32) % (2 * np.pi))[:, None, None]
+    skyline = 0.45 + 0.08 * np.sin(3 * (cols + pan)) + 0.04 * np.sin(7 * (cols + pan))
+    ground = rows > skyline                                   # (T, H, W)
+    tint = np.select([zone == 'red', zone == 'yellow'], [60.0, 30.0], 0.0).astype(np.float32)
+
+    frames = np.empty((len(yaw), height, width, channels), dtype=np.uint8)
+    sky = np.array([110, 160, 220], np.float32)[:channels]
+    earth = np.array([120, 100, 80], np.float32)[:channels]
+    shade = 1.0 - 0.4 * rows                                  # (1, H, 1)
+    for c in range(channels):
+        value = np.where(ground, earth[c] * (0.6 + 0.4 * rows), sky[c] * shade)
+        if c == 0:
+            value = value + tint[:, None, None]
+        if rng is not None:
+            value = value + rng.normal(0, 2.0, value.shape).astype(np.float32)
+        frames[..., c] = np.clip(value, 0, 255)
+    return frames
+
+
+def generate_session(out_dir: Union[str, Path], duration_s: float = 60.0, seed: int = 0,
+                     frame_shape: Tuple[int, int, int] = DEFAULT_FRAME_SHAPE,
+                     start_ms: Optional[int] = None, write_frames: bool = True,
+                     event_rate: float = 1.0, environment: str = 'earthquake') -> Path:
+    """
+    Write one synthetic session.
+
+    Args:
+        out_dir: Directory for the session files (created if needed)
+        duration_s: Gameplay duration (10 periodic rows and frames per second)
+        seed: Random seed (same seed, same session)
+        frame_shape: (H, W, C) of the frames
+        start_ms: Session start as epoch ms (default: derived from the seed)
+        write_frames: Write ``_frames.npy``/``_timestamps.npy``
+        event_rate: Multiplier for the non-periodic event rates
+        environment: Key of ``ENVIRONMENTS``
+
+    Returns:
+        Path of the ``_metadata.json`` file
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start_ms = int(start_ms if start_ms is not None else 1731177600000 + seed * 3_600_000)
+    start = datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc)
+    session_id = _session_name(start_ms, rng)
+
+    n = max(int(duration_s * SAMPLING_RATE_HZ), 1)
+    tel = _telemetry(n, rng)
+    # setInterval(100) drifts by a few ms per tick
+    periodic_ms = (np.arange(1, n + 1) * 100 + np.cumsum(rng.integers(0, 4, n))).astype(np.int64)
+    end_ms = int(periodic_ms[-1] + 50)
+
+    # Non-periodic events: (time, order, record factory)
+    events = []
+    for (kind, name), rate in EVENT_RATES.items():
+        times = np.sort(rng.uniform(0, end_ms, rng.poisson(rate * event_rate * end_ms / 1000)))
+        for t in times.astype(np.int64):
+            events.append((int(t), kind, name))
+    zone_changes = np.flatnonzero(tel['zone'][1:] != tel['zone'][:-1]) + 1
+    events += [(int(periodic_ms[i]) + 5, 'robot_state', 'zone_change') for i in zone_changes]
+    red = np.flatnonzero(tel['zone'] == 'red')
+    events += [(int(periodic_ms[i]) + 7, 'robot_state', 'damage_from_zone') for i in red[::10]]
+    events.sort()
+
+    jsonl_path = out_dir / f"{session_id}_data.jsonl"
+    total, actions, saved = 0, 0, 0
+    with open(jsonl_path, 'w') as f:
+        def write(record):
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+
+        write(_robot_state(tel, 0, 0, start, 'game_start', rng))
+        total += 1
+        e = 0
+        for i in range(n):
+            t = int(periodic_ms[i])
+            while e < len(events) and events[e][0] < t:
+                t_event, kind, name = events[e]
+                step = max(i - 1, 0)
+                if kind == 'player_action':
+                    extra = {'fuelLevel': round(float(tel['fuel'][step]), 2)} if name == 'refuel' else {}
+                    write(_player_action(tel, step, t_event, name, rng, **extra))
+                    actions += 1
+                elif name == 'zone_change':
+                    write(_robot_state(tel, i, t_event, start, name, rng, zone=str(tel['zone'][i])))
+                elif name == 'damage_from_zone':
+                    write(_robot_state(tel, i, t_event, start, name, rng, zone='red',
+                                       damage=round(float(rng.uniform(0.5, 2.0)), 2)))
+                elif name == 'rescue':
+                    saved += 1
+                    write(_robot_state(tel, step, t_event, start, name, rng, action='rescue_attempt'))
+                    write(_player_action(tel, step, t_event + 1, 'rescue_victim', rng,
+                                         victimHealth=int(rng.integers(10, 100))))
+                    total += 1
+                    actions += 1
+                elif name == 'destroy_rubble':
+                    write(_robot_state(tel, step, t_event, start, name, rng,
+                                       rubble_position={'x': 0.0, 'y': 0.5, 'z': 0.0}))
+                    write(_player_action(tel, step, t_event + 1, name, rng))
+                    total += 1
+                    actions += 1
+                elif name == 'inspect':
+                    write(_robot_state(tel, step, t_event, start, name, rng, action='inspect_activated'))
+                else:
+                    write(_robot_state(tel, step, t_event, start, name, rng,
+                                       damage=round(float(rng.uniform(0.5, 3.0)), 2)))
+                total += 1
+                e += 1
+            write(_robot_state(tel, i, t, start, 'periodic_update_10hz', rng,
+                               visual_frame_path=f"frames/frame_{i:06d}.npy"))
+            total += 1
+        write(_robot_state(tel, n - 1, end_ms, start, 'game_end', rng, finalStats={
+            'timeElapsed': end_ms / 1000, 'victimsSaved': saved, 'victimsTotal': saved + 2,
+            'robotHealth': round(float(tel['health'][-1]), 2),
+            'robotFuel': round(float(tel['fuel'][-1]), 2), 'finalScore': 250 * saved,
+        }))
+        total += 1
+
+    if write_frames:
+        frames = np.lib.format.open_memmap(out_dir / f"{session_id}_frames.npy", mode='w+',
+                                           dtype=np.uint8, shape=(n,) + tuple(frame_shape))
+        for lo in range(0, n, FRAME_CHUNK):
+            hi = min(lo + FRAME_CHUNK, n)
+            frames[lo:hi] = render_frames(tel['yaw'][lo:hi], tel['zone'][lo:hi], frame_shape, rng)
+        frames.flush()
+        del frames
+        np.save(out_dir / f"{session_id}_timestamps.npy", periodic_ms.astype(np.float32))
+
+    metadata = {
+        'session_id': session_id,
+        'start_time': start.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        'end_time': (start + timedelta(milliseconds=end_ms)).isoformat(timespec='milliseconds')
+                    .replace('+00:00', 'Z'),
+        'duration_s': end_ms / 1000,
+        'sampling_rate_hz': SAMPLING_RATE_HZ,
+        'player_id': f"synthetic_{seed}",
+        'player_name': f"Synthetic Player {seed}",
+        'robot_model': 'ReActure_v1',
+        'environment': environment,
+        'environment_name': ENVIRONMENTS[environment],
+        'game_result': {
+            'victims_total': saved + 2,
+            'victims_saved': saved,
+            'victims_died': 0,
+            'final_score': 250 * saved,
+            'final_health': round(float(tel['health'][-1]), 2),
+            'final_fuel': round(float(tel['fuel'][-1]), 2),
+            'completion_status': 'success' if tel['health'][-1] > 0 else 'failed',
+        },
+        'data_stats': {
+            'total_samples': total,
+            'total_frames': n if write_frames else 0,
+            'actions_logged': actions,
+        },
+    }
+    metadata_path = out_dir / f"{session_id}_metadata.json"
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata_path
+
+
+def _generate_one(kwargs: Dict) -> str:
+    return str(generate_session(**kwargs))
+
+
+def generate_corpus(out_dir: Union[str, Path], sessions: int = 4, duration_s: float = 60.0,
+                    seed: int = 0, processes: Optional[int] = None, **kwargs) -> List[Path]:
+    """
+    Write ``sessions`` synthetic sessions (seeds ``seed``, ``seed + 1``, ...).
+
+    Args:
+        out_dir: Output directory (one subdirectory per session)
+        sessions: Number of sessions
+        duration_s: Duration of each session
+        seed: Seed of the first session
+        processes: Worker processes (None: CPU count, 0 or 1: in this process)
+        **kwargs: Passed to ``generate_session``
+
+    Returns:
+        Metadata paths, in seed order
+    """
+    jobs = [dict(out_dir=Path(out_dir) / f"session_{seed + i:04d}", duration_s=duration_s,
+                 seed=seed + i, **kwargs) for i in range(sessions)]
+    if sessions > 1 and processes not in (0, 1):
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            paths = list(pool.map(_generate_one, jobs))
+    else:
+        paths = [_generate_one(job) for job in jobs]
+    return [Path(path) for path in paths]
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from reacture_instrument import log_to_stdout
+
+    p = argparse.ArgumentParser(description="Generate synthetic ReActure sessions.")
+    p.add_argument("out_dir", help="Output directory")
+    p.add_argument("--sessions", type=int, default=1, help="Number of sessions (default: 1)")
+    p.add_argument("--duration", type=float, default=60.0, help="Seconds per session (default: 60)")
+    p.add_argument("--seed", type=int, default=0, help="Seed of the first session (default: 0)")
+    p.add_argument("--frame-size", type=int, nargs=2, default=DEFAULT_FRAME_SHAPE[:2],
+                   metavar=("H", "W"), help="Frame height and width (default: 128 128)")
+    p.add_argument("--no-frames", action="store_true", help="Only write metadata and JSONL")
+    p.add_argument("--event-rate", type=float, default=1.0, help="Event rate multiplier (default: 1)")
+    p.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = p.parse_args()
+    log_to_stdout()
+
+    start = time.perf_counter()
+    paths = generate_corpus(args.out_dir, sessions=args.sessions, duration_s=args.duration,
+                            seed=args.seed, processes=args.processes,
+                            frame_shape=tuple(args.frame_size) + (3,),
+                            write_frames=not args.no_frames, event_rate=args.event_rate)
+    for path in paths:
+        print(f"✅ {path}")
+    print(f"🎉 Generated {len(paths)} sessions in {time.perf_counter() - start:.1f}s")
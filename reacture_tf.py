@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+ReActure TensorFlow Integration
+===============================
+
+``tf.data`` pipelines built from the sessions' column arrays instead of a
+Python generator. Telemetry lives in constant tensors and is gathered with
+``tf.gather`` inside a parallel ``map``; frames are read from the memory-mapped
+frame stores, one sorted read per batch. Shuffling happens over integer
+indices, so no decoded frames sit in a shuffle buffer.
+
+Requires TensorFlow; imported lazily by ``ReActureDataset.to_tensorflow_dataset``.
+
+Usage:
+    from reacture_tf import make_tf_dataset
+
+    tf_dataset = make_tf_dataset([session_a, session_b], batch_size=64,
+                                 cycle_length=2, num_parallel_calls=tf.data.AUTOTUNE)
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import tensorflow as tf
+
+
+def _common_frame_shape(datasets) -> tuple:
+    shapes = {tuple(ds.frame_shape) for ds in datasets}
+    if len(shapes) != 1:
+        raise ValueError(f"Sessions have different frame shapes: {sorted(shapes)}")
+    return shapes.pop()
+
+
+def _telemetry_table(datasets, victims_k: Optional[int] = None) -> dict:
+    """Concatenate every session's batch fields into one table of NumPy arrays."""
+    tables = [ds.get_batch(slice(None), include_frames=False, victims_k=victims_k)
+              for ds in datasets]
+    return {name: np.concatenate([table[name] for table in tables]) for name in tables[0]}
+
+
+def make_tf_dataset(datasets: Sequence, batch_size: int = 32, shuffle: bool = True,
+                    seed: Optional[int] = None, normalize: bool = True,
+                    num_parallel_calls: Optional[int] = tf.data.AUTOTUNE,
+                    cycle_length: Optional[int] = None, block_length: int = 1,
+                    drop_remainder: bool = False,
+                    deterministic: Optional[bool] = None,
+                    victims_k: Optional[int] = None, transform=None) -> tf.data.Dataset:
+    """
+    Build a batched ``tf.data.Dataset`` over one or more sessions.
+
+    Args:
+        datasets: ReActureDataset objects (all with the same frame shape)
+        batch_size: Batch size
+        shuffle: Shuffle sample indices (and session order) each epoch
+        seed: Shuffle seed
+        normalize: Frames as float32 in [0, 1]; False keeps uint8
+        num_parallel_calls: Parallelism for the batch ``map`` and session ``interleave``
+        cycle_length: Sessions read concurrently (default: all sessions)
+        block_length: Consecutive samples taken from a session per turn
+        drop_remainder: Drop the final incomplete batch
+        deterministic: Passed to ``map``/``interleave`` (None: tf.data default)
+        victims_k: Add the nearest k victims as 'victims' (B, k, 3) and 'victims_mask'
+        transform: ``reacture_transforms.FramePipeline`` applied to each frame
+            batch inside the map (replaces ``normalize``)
+
+    Returns:
+        Dataset of dicts with 'frame', 'keys', 'position', 'velocity',
+        'accelerometer', 'battery', 'damage' and 'timestamp'
+    """
+    datasets = list(datasets)
+    if not datasets:
+        raise ValueError("make_tf_dataset needs at least one session")
+
+    frame_shape = _common_frame_shape(datasets)
+    counts = np.array([len(ds) for ds in datasets], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    table = {name: tf.constant(array) for name, array in _telemetry_table(datasets, victims_k).items()}
+
+    def read_frames(global_idx: np.ndarray) -> np.ndarray:
+        frames = np.zeros((len(global_idx),) + frame_shape, dtype=np.uint8)
+        session = np.searchsorted(offsets, global_idx, side='right') - 1
+        for s in np.unique(session):
+            ds = datasets[s]
+            if ds.frame_store is None:
+                continue
+            rows = np.flatnonzero(session == s)
+            frame_idx = ds.sample_frame_index[global_idx[rows] - offsets[s]]
+            has_frame = frame_idx >= 0
+            frames[rows[has_frame]] = ds.frame_store.take(frame_idx[has_frame])
+        return frames
+
+    if len(datasets) == 1:
+        indices = tf.data.Dataset.range(int(counts[0]))
+        if shuffle:
+            indices = indices.shuffle(max(int(counts[0]), 1), seed=seed,
+                                      reshuffle_each_iteration=True)
+    else:
+        counts_t = tf.constant(counts)
+        offsets_t = tf.constant(offsets[:-1])
+
+        def session_indices(s):
+            local = tf.data.Dataset.range(counts_t[s])
+            if shuffle:
+                local = local.shuffle(tf.maximum(counts_t[s], 1), seed=seed,
+                                      reshuffle_each_iteration=True)
+            return local.map(lambda i: i + offsets_t[s])
+
+        sessions = tf.data.Dataset.range(len(datasets))
+        if shuffle:
+            sessions = sessions.shuffle(len(datasets), seed=seed, reshuffle_each_iteration=True)
+        indices = sessions.interleave(
+            session_indices,
+            cycle_length=cycle_length or len(datasets),
+            block_length=block_length,
+            num_parallel_calls=num_parallel_calls,
+            deterministic=deterministic,
+        )
+
+    indices = indices.batch(batch_size, drop_remainder=drop_remainder)
+
+    def read_transformed(global_idx: np.ndarray) -> np.ndarray:
+        # A fresh output per call: TF may keep aliasing the returned array
+        return transform.apply(read_frames(global_idx))
+
+    def load_batch(idx):
+        batch = {name: tf.gather(column, idx) for name, column in table.items()}
+        if transform is not None:
+            frames = tf.numpy_function(read_transformed, [idx], tf.as_dtype(transform.dtype))
+            frames.set_shape((None,) + transform.output_shape(frame_shape))
+            batch['frame'] = frames
+            return batch
+        frames = tf.numpy_function(read_frames, [idx], tf.uint8)
+        frames.set_shape((None,) + frame_shape)
+        if normalize:
+            frames = tf.cast(frames, tf.float32) / 255.0
+        batch['frame'] = frames
+        return batch
+
+    dataset = indices.map(load_batch, num_parallel_calls=num_parallel_calls,
+                          deterministic=deterministic)
+    return dataset.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+ReActure PyTorch Integration
+============================
+
+Batch-level PyTorch dataset over ``ReActureDataset.get_batch``. The
+DataLoader is driven by a ``BatchSampler`` with automatic batching turned
+off, so each worker call gathers a whole batch with fancy indexing and
+returns ready tensors — no per-sample dicts and no element-wise collate.
+
+Requires PyTorch; imported lazily by ``ReActureDataset.to_pytorch_dataloader``.
+
+Usage:
+    dataloader = dataset.to_pytorch_dataloader(batch_size=64, num_workers=4,
+                                               pin_memory=True, normalize=False)
+    for batch in dataloader:
+        frames = normalize_frames(batch['frame'].cuda(non_blocking=True))
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
+
+
+def normalize_frames(frames: torch.Tensor, channels_first: bool = True) -> torch.Tensor:
+    """
+    Convert a uint8 (B, H, W, C) frame batch to float in [0, 1].
+
+    Call this once per batch, ideally after moving the uint8 batch to the
+    device (4x fewer bytes to transfer than float32).
+
+    Args:
+        frames: uint8 tensor of shape (B, H, W, C)
+        channels_first: Return (B, C, H, W)
+
+    Returns:
+        float32 tensor
+    """
+    if channels_first:
+        frames = frames.permute(0, 3, 1, 2)
+    return frames.float().div_(255.0)
+
+
+class ReActurePyTorchDataset(Dataset):
+    """
+    Map-style dataset whose items are whole batches.
+
+    ``__getitem__`` takes a list of sample indices (as produced by a
+    ``BatchSampler``) and returns a dictionary of batched tensors.
+    """
+
+    def __init__(self, reacture_dataset, normalize: bool = True, channels_first: bool = True,
+                 victims_k: Optional[int] = None, transform=None):
+        """
+        Args:
+            reacture_dataset: ReActureDataset to read from
+            normalize: Return frames as float32 in [0, 1]; False keeps uint8
+                so normalisation can be deferred (see ``normalize_frames``)
+            channels_first: Permute frames to (B, C, H, W) (only when normalising)
+            victims_k: Add the nearest k victims ('victims' (B, k, 3), 'victims_mask')
+            transform: ``reacture_transforms.FramePipeline`` applied to each
+                uint8 frame batch (replaces ``normalize``)
+        """
+        self.dataset = reacture_dataset
+        self.normalize = normalize
+        self.channels_first = channels_first
+        self.victims_k = victims_k
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, indices) -> Dict[str, torch.Tensor]:
+        if isinstance(indices, (int, np.integer)):
+            indices = [indices]
+        batch = self.dataset.get_batch(indices, victims_k=self.victims_k)
+        if self.transform is not None and 'frame' in batch:
+            batch['frame'] = self.transform(batch['frame'])
+
+        tensors = {name: torch.from_numpy(np.ascontiguousarray(array))
+                   for name, array in batch.items()}
+        if self.normalize and self.transform is None:
+            tensors['frame'] = normalize_frames(tensors['frame'], self.channels_first)
+        return tensors
+
+
+def _reseed_transform(worker_init_fn=None):
+    """Worker init that gives each worker's copy of the frame transform its own stream."""
+    def init(worker_id: int):
+        info = torch.utils.data.get_worker_info()
+        info.dataset.transform.reseed(worker_id + 1)
+        if worker_init_fn is not None:
+            worker_init_fn(worker_id)
+    return init
+
+
+def make_dataloader(reacture_dataset, batch_size: int = 32, shuffle: bool = True,
+                    num_workers: int = 0, pin_memory: bool = False, drop_last: bool = False,
+                    normalize: bool = True, seed: Optional[int] = None,
+                    victims_k: Optional[int] = None, transform=None, batch_sampler=None,
+                    **kwargs) -> DataLoader:
+    """
+    Build a DataLoader that fetches whole batches per call.
+
+    Args:
+        reacture_dataset: ReActureDataset to wrap
+        batch_size: Samples per batch
+        shuffle: Shuffle sample order each epoch
+        num_workers: DataLoader worker processes
+        pin_memory: Pin batch tensors for faster host-to-GPU copies
+        drop_last: Drop the final incomplete batch
+        normalize: Convert frames to float CHW in the loader (False: uint8 HWC)
+        seed: Seed for the shuffle order
+        victims_k: Include the nearest k victims per sample (padded, with a mask)
+        transform: ``reacture_transforms.FramePipeline`` for the frame batches;
+            each worker gets its own random stream
+        batch_sampler: Iterable of index lists replacing the shuffled or
+            sequential order (e.g. ``reacture_events.StratifiedSampler``);
+            ``batch_size``, ``shuffle``, ``seed`` and ``drop_last`` are then unused
+        **kwargs: Passed through to ``DataLoader``
+
+    Returns:
+        PyTorch DataLoader yielding dictionaries of batched tensors
+    """
+    torch_dataset = ReActurePyTorchDataset(reacture_dataset, normalize=normalize,
+                                           victims_k=victims_k, transform=transform)
+    if transform is not None:
+        kwargs['worker_init_fn'] = _reseed_transform(kwargs.get('worker_init_fn'))
+
+    if batch_sampler is None:
+        if shuffle:
+            generator = torch.Generator().manual_seed(seed) if seed is not None else None
+            sampler = RandomSampler(torch_dataset, generator=generator)
+        else:
+            sampler = SequentialSampler(torch_dataset)
+        batch_sampler = BatchSampler(sampler, batch_size=batch_size, drop_last=drop_last)
+    kwargs.setdefault('persistent_workers', num_workers > 0)
+
+    return DataLoader(
+        torch_dataset,
+        sampler=batch_sampler,
+        batch_size=None,          # items are already batches
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        **kwargs,
+    )
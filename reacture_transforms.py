@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+ReActure Frame Transforms
+=========================
+
+Batched CPU preprocessing for uint8 ``(B, H, W, 3)`` frame batches.
+
+Geometric transforms (crops, flips, resizing) only describe where each
+output pixel comes from; a ``FramePipeline`` composes them into one row map
+and one column map per sample and samples the batch once, as a row pass and
+a column pass of whole-row gathers (interpolated for bilinear). Photometric
+transforms (colour jitter) then run in float32 over the whole batch, and
+normalisation with a precomputed per-channel scale and bias writes the
+result straight into a reusable output buffer, optionally channels-first.
+
+Nothing is allocated per sample: the output and float work buffers are
+kept per thread and reused, and large batches can be split across a thread
+pool (NumPy releases the GIL for these operations).
+
+Usage:
+    from reacture_transforms import FramePipeline, RandomCrop, RandomFlip, Resize, ColorJitter
+
+    pipeline = FramePipeline([RandomCrop(112), RandomFlip(), Resize(96), ColorJitter(0.2, 0.2, 0.2)],
+                             mean=stats.frame_mean, std=stats.frame_std, workers=4, seed=0)
+    frames = pipeline(batch['frame'])          # (B, 3, 96, 96) float32, reused buffer
+    loader = dataset.to_pytorch_dataloader(batch_size=64, transform=pipeline)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+Size = Union[int, Tuple[int, int]]
+INTERPOLATIONS = ('nearest', 'bilinear')
+
+
+def _pair(size: Size) -> Tuple[int, int]:
+    return (int(size), int(size)) if np.isscalar(size) else (int(size[0]), int(size[1]))
+
+
+class FrameTransform:
+    """
+    Base class for batch transforms.
+
+    Random transforms draw all their per-sample parameters at once in
+    ``sample``; the arrays returned there have a leading batch axis so a
+    pipeline can split them between worker threads.
+    """
+
+    def output_size(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        """(height, width) produced from an input of ``size``."""
+        return size
+
+    def sample(self, rng: np.random.Generator, batch_size: int,
+               size: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        """Per-sample random parameters for a batch whose input is ``size``."""
+        return {}
+
+
+class GeometricTransform(FrameTransform):
+    """A transform that moves pixels without changing their values."""
+
+    def source_coords(self, rows: np.ndarray, cols: np.ndarray, size: Tuple[int, int],
+                      params: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map output pixel coordinates to input coordinates.
+
+        Args:
+            rows: (B, out_h) float row coordinates in this transform's output
+            cols: (B, out_w) float column coordinates
+            size: (height, width) of this transform's input
+            params: This transform's parameters from ``sample``
+
+        Returns:
+            Tuple of (rows, cols) in input coordinates
+        """
+        raise NotImplementedError
+
+
+class CenterCrop(GeometricTransform):
+    """Crop the central ``size`` region."""
+
+    def __init__(self, size: Size):
+        self.size = _pair(size)
+
+    def output_size(self, size):
+        if self.size[0] > size[0] or self.size[1] > size[1]:
+            raise ValueError(f"Crop {self.size} is larger than the frame {size}")
+        return self.size
+
+    def source_coords(self, rows, cols, size, params):
+        return rows + (size[0] - self.size[0]) // 2, cols + (size[1] - self.size[1]) // 2
+
+
+class RandomCrop(CenterCrop):
+    """Crop a ``size`` region at a random position per sample."""
+
+    def sample(self, rng, batch_size, size):
+        return {'top': rng.integers(0, size[0] - self.size[0] + 1, batch_size),
+                'left': rng.integers(0, size[1] - self.size[1] + 1, batch_size)}
+
+    def source_coords(self, rows, cols, size, params):
+        return rows + params['top'][:, None], cols + params['left'][:, None]
+
+
+class RandomFlip(GeometricTransform):
+    """Mirror left-right with probability ``p`` per sample."""
+
+    def __init__(self, p: float = 0.5):
+        self.p = p
+
+    def sample(self, rng, batch_size, size):
+        return {'flip': rng.random(batch_size) < self.p}
+
+    def source_coords(self, rows, cols, size, params):
+        return rows, np.where(params['flip'][:, None], (size[1] - 1) - cols, cols)
+
+
+class Resize(GeometricTransform):
+    """Resize to ``size`` (pixel centres aligned, like ``align_corners=False``)."""
+
+    def __init__(self, size: Size):
+        self.size = _pair(size)
+
+    def output_size(self, size):
+        return self.size
+
+    def source_coords(self, rows, cols, size, params):
+        return ((rows + 0.5) * (size[0] / self.size[0]) - 0.5,
+                (cols + 0.5) * (size[1] / self.size[1]) - 0.5)
+
+
+class ColorJitter(FrameTransform):
+    """
+    Random brightness, contrast and saturation per sample.
+
+    Each factor is drawn uniformly from ``[1 - x, 1 + x]``; pixels are
+    clipped back to [0, 255] afterwards.
+    """
+
+    def __init__(self, brightness: float = 0.0, contrast: float = 0.0, saturation: float = 0.0):
+        self.brightness = brightness
+        self.contrast = contrast
+        self.saturation = saturation
+
+    def sample(self, rng, batch_size, size):
+        def factors(amount):
+            return rng.uniform(1 - amount, 1 + amount, batch_size).astype(np.float32)
+        return {'brightness': factors(self.brightness), 'contrast': factors(self.contrast),
+                'saturation': factors(self.saturation)}
+
+    def apply(self, pixels: np.ndarray, params: Dict[str, np.ndarray]):
+        """Jitter a float32 (B, H, W, 3) batch in place."""
+        luma = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        if self.brightness:
+            pixels *= params['brightness'][:, None, None, None]
+        if self.contrast:
+            mean = (pixels @ luma).mean(axis=(1, 2))[:, None, None, None]
+            pixels -= mean
+            pixels *= params['contrast'][:, None, None, None]
+            pixels += mean
+        if self.saturation:
+            gray = (pixels @ luma)[..., None]
+            pixels -= gray
+            pixels *= params['saturation'][:, None, None, None]
+            pixels += gray
+        np.clip(pixels, 0.0, 255.0, out=pixels)
+
+
+class FramePipeline:
+    """
+    Geometric transforms, then photometric transforms, then normalisation.
+
+    Results are written to per-thread buffers that are reused on later
+    calls: a returned array stays valid for the next ``buffers - 1`` calls
+    from the same thread. Copy it (or use ``apply`` with ``out``) to keep it
+    longer.
+
+    Attributes:
+        transforms: Geometric and photometric transforms, in order
+        mean, std: Per-channel statistics on the [0, 1] scale
+        channels_first: Output (B, C, H, W) instead of (B, H, W, C)
+        interpolation: 'nearest' or 'bilinear' sampling for geometric transforms
+        workers: Threads a batch is split across (0: calling thread only)
+    """
+
+    def __init__(self, transforms: Sequence[FrameTransform] = (),
+                 mean: Optional[Sequence[float]] = None, std: Optional[Sequence[float]] = None,
+                 channels_first: bool = True, interpolation: str = 'bilinear',
+                 dtype=np.float32, workers: int = 0, buffers: int = 2,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            transforms: Transforms in application order; geometric ones must
+                come before photometric ones
+            mean: Per-channel mean subtracted after scaling to [0, 1] (default 0)
+            std: Per-channel standard deviation divided by (default 1)
+            channels_first: Return (B, C, H, W)
+            interpolation: 'nearest' or 'bilinear'
+            dtype: Output dtype (float32 or float16)
+            workers: Threads per batch (0 or 1: no pool)
+            buffers: Output buffers kept per thread and cycled through
+            seed: Seed for the random transforms (see ``reseed``)
+        """
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"interpolation must be one of {INTERPOLATIONS}, got {interpolation!r}")
+        self.transforms = list(transforms)
+        seen_photometric = False
+        for transform in self.transforms:
+            if isinstance(transform, GeometricTransform) and seen_photometric:
+                raise ValueError("Geometric transforms must come before photometric ones")
+            seen_photometric = seen_photometric or not isinstance(transform, GeometricTransform)
+
+        self.mean = np.zeros(3, np.float32) if mean is None else np.asarray(mean, np.float32)
+        self.std = np.ones(3, np.float32) if std is None else np.asarray(std, np.float32)
+        # (x / 255 - mean) / std as a single multiply-add per pixel
+        self.scale = (1.0 / (255.0 * self.std)).astype(np.float32)
+        self.bias = (-self.mean / self.std).astype(np.float32)
+        self.channels_first = channels_first
+        self.interpolation = interpolation
+        self.dtype = np.dtype(dtype)
+        self.workers = workers
+        self.buffers = max(int(buffers), 1)
+        self.seed = seed
+        self._init_runtime()
+
+    @classmethod
+    def from_statistics(cls, stats, transforms: Sequence[FrameTransform] = (),
+                        **kwargs) -> 'FramePipeline':
+        """Pipeline normalised with ``DatasetStatistics.frame_mean``/``frame_std``."""
+        if stats.frame_mean is None:
+            raise ValueError("Statistics have no frame moments (computed without frames)")
+        return cls(transforms, mean=stats.frame_mean, std=np.maximum(stats.frame_std, 1e-6),
+                   **kwargs)
+
+    def _init_runtime(self):
+        self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._rng_lock = threading.Lock()
+        self._rng = np.random.default_rng(self.seed)
+        self._pid = os.getpid()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_local', '_pool', '_rng_lock', '_rng', '_pid'):
+            state.pop(name)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def reseed(self, stream: int):
+        """
+        Give this copy its own random stream (e.g. one per DataLoader worker).
+
+        Seeded pipelines stay reproducible: stream ``i`` always draws the
+        same parameters for the same seed.
+        """
+        with self._rng_lock:
+            self._rng = np.random.default_rng(None if self.seed is None else [self.seed, stream])
+            self._pid = os.getpid()
+
+    def close(self):
+        """Shut down the worker threads."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def output_size(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        for transform in self.transforms:
+            size = transform.output_size(size)
+        return size
+
+    def output_shape(self, frame_shape: Tuple[int, ...]) -> Tuple[int, ...]:
+        """Per-sample output shape for input frames of ``(H, W, C)``."""
+        height, width = self.output_size(tuple(frame_shape[:2]))
+        channels = frame_shape[2]
+        return (channels, height, width) if self.channels_first else (height, width, channels)
+
+    def _sample(self, batch_size: int, size: Tuple[int, int]) -> List[Tuple[Tuple[int, int], Dict]]:
+        """Input size and parameters of every transform, drawn under one lock."""
+        plan = []
+        with self._rng_lock:
+            if self._pid != os.getpid() and self.seed is None:
+                # Forked copy that was never reseeded: don't repeat the parent's stream
+                self._rng, self._pid = np.random.default_rng(), os.getpid()
+            for transform in self.transforms:
+                plan.append((size, transform.sample(self._rng, batch_size, size)))
+                size = transform.output_size(size)
+        return plan
+
+    def _buffers_for(self, shape: Tuple[int, ...], work_shape: Tuple[int, ...]):
+        """Next (output, work) buffer pair of this thread's ring."""
+        local = self._local
+        key = (shape, work_shape)
+        if getattr(local, 'key', None) != key:
+            local.key, local.ring, local.next = key, [], 0
+        if len(local.ring) < self.buffers:
+            local.ring.append((np.empty(shape, dtype=self.dtype),
+                               np.empty(work_shape, dtype=np.float32) if work_shape else None))
+        out, work = local.ring[local.next % len(local.ring)]
+        local.next += 1
+        return out, work
+
+    def __call__(self, frames: np.ndarray) -> np.ndarray:
+        """Transform a uint8 (B, H, W, C) batch into a reused output buffer."""
+        frames = np.asarray(frames)
+        shape = (len(frames),) + self.output_shape(frames.shape[1:])
+        height, width = self.output_size(frames.shape[1:3])
+        needs_work = any(not isinstance(t, GeometricTransform) for t in self.transforms)
+        work_shape = (len(frames), height, width, frames.shape[3]) if needs_work else ()
+        out, work = self._buffers_for(shape, work_shape)
+        return self.apply(frames, out=out, work=work)
+
+    def apply(self, frames: np.ndarray, out: Optional[np.ndarray] = None,
+              work: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Transform a uint8 (B, H, W, C) batch.
+
+        Args:
+            frames: Input batch
+            out: Output array (allocated when None)
+            work: float32 (B, h, w, C) scratch for photometric transforms
+
+        Returns:
+            ``out``
+        """
+        frames = np.asarray(frames)
+        batch_size = len(frames)
+        if out is None:
+            out = np.empty((batch_size,) + self.output_shape(frames.shape[1:]), dtype=self.dtype)
+        if work is None and any(not isinstance(t, GeometricTransform) for t in self.transforms):
+            height, width = self.output_size(frames.shape[1:3])
+            work = np.empty((batch_size, height, width, frames.shape[3]), dtype=np.float32)
+        plan = self._sample(batch_size, tuple(frames.shape[1:3]))
+
+        chunks = min(self.workers, batch_size)
+        if chunks <= 1:
+            self._run(frames, plan, out, work)
+            return out
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='reacture-transform')
+        bounds = np.linspace(0, batch_size, chunks + 1).astype(int)
+        futures = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            part = [(size, {name: values[lo:hi] for name, values in params.items()})
+                    for size, params in plan]
+            futures.append(self._pool.submit(self._run, frames[lo:hi], part, out[lo:hi],
+                                             None if work is None else work[lo:hi]))
+        for future in futures:
+            future.result()
+        return out
+
+    def _run(self, frames: np.ndarray, plan, out: np.ndarray, work: Optional[np.ndarray]):
+        pixels = self._geometry(frames, plan)
+        photometric = [(t, params) for t, (_, params) in zip(self.transforms, plan)
+                       if not isinstance(t, GeometricTransform)]
+        if photometric:
+            work[...] = pixels
+            for transform, params in photometric:
+                transform.apply(work, params)
+            pixels = work
+
+        target = out.transpose(0, 2, 3, 1) if self.channels_first else out
+        np.multiply(pixels, self.scale, out=target, casting='unsafe')
+        np.add(target, self.bias, out=target, casting='unsafe')
+
+    def _geometry(self, frames: np.ndarray, plan) -> np.ndarray:
+        """Sample the composed geometric transforms (the input itself if there are none)."""
+        geometric = [(t, size, params) for t, (size, params) in zip(self.transforms, plan)
+                     if isinstance(t, GeometricTransform)]
+        if not geometric:
+            return frames
+
+        batch_size = len(frames)
+        height, width = self.output_size(frames.shape[1:3])
+        rows = np.broadcast_to(np.arange(height, dtype=np.float32), (batch_size, height))
+        cols = np.broadcast_to(np.arange(width, dtype=np.float32), (batch_size, width))
+        for transform, size, params in reversed(geometric):
+            rows, cols = transform.source_coords(rows, cols, size, params)
+        rows = np.broadcast_to(rows, (batch_size, height))
+        cols = np.broadcast_to(cols, (batch_size, width))
+        batch = np.arange(batch_size)[:, None]
+        src_h, src_w = frames.shape[1:3]
+
+        # Gathers are fastest along axis 1 (whole contiguous rows are copied),
+        # so the column pass runs on a (B, W, h, C) transposed copy
+        if self.interpolation == 'nearest':
+            r = np.clip(np.rint(rows), 0, src_h - 1).astype(np.intp)
+            c = np.clip(np.rint(cols), 0, src_w - 1).astype(np.intp)
+            by_column = np.ascontiguousarray(frames[batch, r].transpose(0, 2, 1, 3))
+            return by_column[batch, c].transpose(0, 2, 1, 3)
+
+        # Bilinear as two separable passes: rows first (B, h, W, C), then columns
+        r0 = np.clip(np.floor(rows), 0, src_h - 1).astype(np.intp)
+        r1 = np.minimum(r0 + 1, src_h - 1)
+        wr = np.clip(rows - r0, 0.0, 1.0).astype(np.float32)[:, :, None, None]
+        top = frames[batch, r0].astype(np.float32)
+        top += (frames[batch, r1] - top) * wr
+        by_column = np.ascontiguousarray(top.transpose(0, 2, 1, 3))
+
+        c0 = np.clip(np.floor(cols), 0, src_w - 1).astype(np.intp)
+        c1 = np.minimum(c0 + 1, src_w - 1)
+        wc = np.clip(cols - c0, 0.0, 1.0).astype(np.float32)[:, :, None, None]
+        left = by_column[batch, c0]
+        left += (by_column[batch, c1] - left) * wc
+        return left.transpose(0, 2, 1, 3)
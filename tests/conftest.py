@@ -0,0 +1,6 @@
+"""The loader modules live at the repository root; make them importable."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,24 @@
+"""Benchmarks must not destroy sessions they cannot rebuild."""
+
+from reacture_bench import bench_construction
+from reacture_columns import columns_dir_for
+from reacture_import import import_session
+
+
+def test_imported_session_skips_cold_construction(tmp_path):
+    doc = {
+        'session_id': 'imported',
+        'sensors': [{'t': t, 'battery': 100.0, 'damage': 0.0} for t in (0, 100, 200)],
+        'trajectory': [{'t': 0, 'x': 0.0, 'y': 1.5, 'z': 0.0}, {'t': 200, 'x': 2.0, 'y': 1.5, 'z': 0.0}],
+        'actions': [],
+    }
+    session_id, rows, written = import_session(doc, 0, tmp_path, {'format': 'ml-ready'})
+    assert written and rows == 3
+    columns_dir = columns_dir_for(tmp_path / f"{session_id}_data.jsonl")
+
+    results = bench_construction(tmp_path / f"{session_id}_metadata.json")
+
+    assert results['construct_cold'].startswith('skipped')
+    assert 'construct_cold_s' not in results
+    assert results['construct_warm_s'] > 0
+    assert columns_dir.is_dir()
@@ -0,0 +1,38 @@
+"""The column cache must hand back the JSON doubles ``logRobotState`` writes."""
+
+import json
+
+import numpy as np
+
+from load_reacture_dataset import ReActureDataset
+from reacture_instrument import quiet
+
+
+def _write_session(directory, rows):
+    (directory / 's_data.jsonl').write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    (directory / 's_metadata.json').write_text(json.dumps(
+        {'session_id': 's', 'duration_s': 1.0, 'sampling_rate_hz': 10, 'data_stats': {'total_frames': 0}}))
+    return directory / 's_metadata.json'
+
+
+def test_extractors_return_exact_doubles(tmp_path):
+    rows = [
+        {'timestamp_ms': 100 * i, 'time_elapsed_s': 0.1 * i, 'type': 'robot_state',
+         'robot': {'position': {'x': 12.345678901234 + i, 'y': 0.1, 'z': -7.000000123}},
+         'accelerometer': {'x': 0.123456789012, 'y': -9.80665, 'z': 1e-9},
+         'battery': 87.123456789, 'damage': 0.333333333333}
+        for i in range(3)
+    ]
+    metadata_path = _write_session(tmp_path, rows)
+
+    for use_cache in (False, True, True):
+        with quiet():
+            dataset = ReActureDataset(str(metadata_path), use_cache=use_cache)
+        trajectory = dataset.extract_trajectory()
+        battery, damage = dataset.extract_battery_damage()
+        assert trajectory.dtype == np.float64
+        assert trajectory[:, 0].tolist() == [row['robot']['position']['x'] for row in rows]
+        assert trajectory[0, 2] == -7.000000123
+        assert dataset.extract_accelerometer()[0].tolist() == [0.123456789012, -9.80665, 1e-9]
+        assert battery.tolist() == [87.123456789] * 3
+        assert damage.tolist() == [0.333333333333] * 3
@@ -0,0 +1,58 @@
+"""Appended event index runs match a full rebuild; sampler streams advance."""
+
+import numpy as np
+
+from load_reacture_dataset import ReActureDataset
+from reacture_events import FACETS, EventIndex, StratifiedSampler
+from reacture_instrument import quiet
+from reacture_synth import generate_session
+
+
+def _columns(tmp_path):
+    metadata_path = generate_session(tmp_path, duration_s=30.0, seed=3, frame_shape=(8, 8, 3))
+    with quiet():
+        return ReActureDataset(str(metadata_path)).columns
+
+
+def test_appended_runs_match_full_rebuild(tmp_path):
+    columns = _columns(tmp_path)
+    n = len(columns)
+    full = EventIndex.build(columns)
+
+    cuts = np.unique(np.concatenate([[0, n], np.random.default_rng(0).integers(1, n, 12)]))
+    index = EventIndex.build(columns, 0, int(cuts[1]))
+    for start, stop in zip(cuts[1:-1], cuts[2:]):
+        index.append(EventIndex.build(columns, int(start), int(stop)))
+    assert len(index._runs) > 1
+    assert index.num_rows == n
+
+    for facet in FACETS:
+        assert index.counts(facet) == full.counts(facet)
+        for value in full.values(facet):
+            assert np.array_equal(index.rows(facet, value), full.rows(facet, value))
+    # Reading the postings merges the runs; labels may be ordered differently
+    def postings(facets):
+        return {facet: {label: rows[offsets[i]:offsets[i + 1]].tolist()
+                        for i, label in enumerate(labels)}
+                for facet, (labels, offsets, rows) in facets.items()}
+
+    assert postings(index.facets) == postings(full.facets)
+    assert len(index._runs) == 1
+
+
+def test_sample_stream_advances_and_seeded_epochs_repeat(tmp_path):
+    index = EventIndex.build(_columns(tmp_path))
+    sampler = StratifiedSampler(index, 'type', batch_size=64, seed=7)
+
+    first, second = sampler.sample(), sampler.sample()
+    assert not np.array_equal(first, second)
+
+    sampler.set_epoch(0)
+    assert np.array_equal(sampler.sample(), first)
+    assert np.array_equal(sampler.sample(), second)
+
+    again = StratifiedSampler(index, 'type', batch_size=64, seed=7)
+    again.set_epoch(1)
+    sampler.set_epoch(1)
+    assert np.array_equal(again.sample(), sampler.sample())
+    assert not np.array_equal(sampler.sample(), first)
@@ -0,0 +1,23 @@
+"""Server sessions become loader columns with the JSONL row types."""
+
+from reacture_import import session_columns
+
+
+def test_decisions_between_sensor_rows_are_player_actions():
+    session = {
+        'sensors': [{'t': t, 'battery': 100.0 - t / 100, 'keys': {'W': t > 0}} for t in (0, 100, 200)],
+        'trajectory': [{'t': 0, 'x': 0.0, 'y': 1.5, 'z': 0.0}, {'t': 1000, 'x': 10.0, 'y': 1.5, 'z': 0.0}],
+        'actions': [
+            {'type': 'inspect', 't': 100, 'x': 1.0, 'y': 1.5, 'z': 0.0},
+            {'type': 'rescue', 't': 150, 'x': 2.0, 'y': 1.5, 'z': 0.0},
+        ],
+    }
+    columns = session_columns(session)
+
+    types = columns.decode('type', columns.group('type')).tolist()
+    events = columns.decode('event', columns.group('event')).tolist()
+    assert columns.group('timestamp_ms').tolist() == [0, 100, 150, 200]
+    # The inspect decision lands on the sensor row at t=100; the rescue gets its own row
+    assert types == ['robot_state', 'robot_state', 'player_action', 'robot_state']
+    assert events[1:3] == ['inspect', 'rescue']
+    assert columns.group('robot.position')[2].tolist() == [2.0, 1.5, 0.0]
@@ -0,0 +1,25 @@
+"""Prefetched samples stream from the columns and match ``dataset[i]``."""
+
+import numpy as np
+
+from load_reacture_dataset import ReActureDataset
+from reacture_instrument import quiet
+from reacture_synth import generate_session
+
+
+def test_prefetch_samples_do_not_parse_jsonl(tmp_path):
+    metadata_path = generate_session(tmp_path, duration_s=10.0, seed=5, frame_shape=(8, 8, 3))
+    with quiet():
+        dataset = ReActureDataset(str(metadata_path))
+        reference = ReActureDataset(str(metadata_path))
+
+    prefetched = list(dataset.prefetch(workers=4, chunk_size=7))
+    assert dataset._samples is None
+    assert len(prefetched) == len(reference)
+    for i, sample in enumerate(prefetched):
+        expected = reference[i]
+        frame, expected_frame = sample.pop('frame'), expected.pop('frame')
+        assert sample == expected
+        assert (frame is None) == (expected_frame is None)
+        if frame is not None:
+            assert np.array_equal(frame, expected_frame)
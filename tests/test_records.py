@@ -0,0 +1,102 @@
+"""``record_mode='view'`` records must equal the ``record_mode='dict'`` samples."""
+
+import json
+
+import numpy as np
+import pytest
+
+from load_reacture_dataset import ReActureDataset
+from reacture_instrument import quiet
+from reacture_synth import generate_session
+
+
+def _load(metadata_path, **kwargs) -> ReActureDataset:
+    with quiet():
+        return ReActureDataset(str(metadata_path), **kwargs)
+
+
+def _without_frame(sample) -> dict:
+    sample = dict(sample)
+    sample.pop('frame', None)
+    return sample
+
+
+@pytest.mark.parametrize('write_frames', [False, True])
+def test_view_records_match_dict_samples(tmp_path, write_frames):
+    metadata_path = generate_session(tmp_path, duration_s=20.0, seed=3, frame_shape=(8, 8, 3),
+                                     write_frames=write_frames)
+    samples = _load(metadata_path)
+    records = _load(metadata_path, record_mode='view')
+
+    assert len(records) == len(samples)
+    for i in range(len(samples)):
+        sample, record = samples[i], records[i]
+        assert records.columns.row_dict(i) == _without_frame(
+            {key: value for key, value in sample.items() if key != 'frame_timestamp_ms'})
+        assert _without_frame(record.to_dict()) == _without_frame(sample)
+        if write_frames and sample['frame'] is not None:
+            assert np.array_equal(record['frame'], sample['frame'])
+
+
+def test_view_records_keep_fields_outside_schema(tmp_path):
+    rows = [
+        {'timestamp': '2025-11-09T14:22:13.200Z', 'timestamp_ms': 200, 'time_elapsed_s': 0.2,
+         'type': 'robot_state', 'event': 'periodic_update_10hz',
+         'key_presses': {'W': True, 'mouse_dx': 1.5},
+         'robot': {'position': {'x': 0.5, 'y': 1.5, 'z': -0.25}, 'extra': {'a': [1, 2]}},
+         'sensors': {'victims': [{'distance': 1.5, 'angle': 0.25}], 'zone': 'safe'},
+         'visual_frame_path': 'frames/frame_000002.npy'},
+        {'timestamp': 300, 'type': 'player_action', 'action': 'refuel', 'fuelLevel': 50,
+         'sensors': {'inYellowZone': True, 'victims': 'n/a'}, 'battery': None},
+        {'timestamp': '2025-11-09 14:22:13', 'timestamp_ms': 400, 'type': 'robot_state',
+         'event': 'game_end', 'finalStats': {'finalScore': 10}, 'robot': {}, 'camera': None,
+         'visual_frame_path': 'img/7.png'},
+    ]
+    (tmp_path / 's_data.jsonl').write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    (tmp_path / 's_metadata.json').write_text(json.dumps(
+        {'session_id': 's', 'duration_s': 0.4, 'sampling_rate_hz': 10, 'data_stats': {'total_frames': 0}}))
+
+    records = _load(tmp_path / 's_metadata.json', record_mode='view')
+    for i, row in enumerate(rows):
+        assert _without_frame(records[i].to_dict()) == row
+        assert records.columns.row_dict(i) == row
+    assert records[0].robot.extra == {'a': [1, 2]}
+    assert 'timestamp_ms' not in records[1] and 'inRedZone' not in records[1]['sensors']
+
+
+def test_view_records_keep_full_precision_and_flag_types(tmp_path):
+    rows = [
+        {'timestamp_ms': 100, 'time_elapsed_s': 0.1, 'type': 'robot_state',
+         'event': 'periodic_update_10hz',
+         'key_presses': {'W': 1, 'A': False, 'mouse_dx': 0.1234567890123},
+         'robot': {'position': {'x': 12.345678901234, 'y': 1.5, 'z': -3.000000001},
+                   'isJumping': 0},
+         'battery': 87.123456789, 'damage': 0.1 + 0.2,
+         'sensors': {'victimsDetected': 1, 'inYellowZone': 1, 'inRedZone': False,
+                     'victims': [{'distance': 5.123456789012, 'angle': 2.2, 'health': 36}]}},
+        {'timestamp_ms': 200.5, 'time_elapsed_s': 0.2005, 'type': 'robot_state',
+         'robot': {'isJumping': True, 'position': {'x': 1e-12, 'y': 2 ** 40 + 0.5, 'z': 0}},
+         'sensors': {'victimsDetected': 2.0, 'inYellowZone': 'no'}},
+    ]
+    (tmp_path / 's_data.jsonl').write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    (tmp_path / 's_metadata.json').write_text(json.dumps(
+        {'session_id': 's', 'duration_s': 0.2, 'sampling_rate_hz': 10, 'data_stats': {'total_frames': 0}}))
+
+    for use_cache in (False, True, True):
+        samples = _load(tmp_path / 's_metadata.json', use_cache=use_cache)
+        records = _load(tmp_path / 's_metadata.json', use_cache=use_cache, record_mode='view')
+        for i, row in enumerate(rows):
+            assert _without_frame(records[i].to_dict()) == _without_frame(samples[i]) == row
+            assert records.columns.row_dict(i) == row
+        assert records[0].robot.position.x == 12.345678901234
+        assert records[0]['battery'] == 87.123456789
+        # Equal is not enough for flags (0 == False): the JSON type must survive
+        assert type(records[0].robot.isJumping) is int and records[1].robot.isJumping is True
+        assert type(records[0].key_presses.W) is int and records[0].key_presses.A is False
+        assert type(records[0].sensors.inYellowZone) is int and records[1].sensors.inYellowZone == 'no'
+        assert type(records[1].sensors.victimsDetected) is float
+        assert type(records[1]['timestamp_ms']) is float
+        assert records[0]['sensors']['victims'][0]['distance'] == 5.123456789012
+        # Flags still reach the columns as booleans
+        assert records.columns.field('robot.isJumping').tolist() == [False, True]
+        assert records.columns.field('key_presses.W').tolist() == [True, False]
@@ -0,0 +1,44 @@
+"""Saved spatial indexes survive reopening and interrupted saves."""
+
+import numpy as np
+import pytest
+
+import reacture_spatial
+from reacture_spatial import SpatialIndex, index_sessions
+
+
+def test_reopened_index_without_points_is_kept(tmp_path):
+    index = SpatialIndex()
+    index.add('shard/empty', np.zeros((0, 3)), {'num_rows': 0, 'jsonl': None})
+    index.save(tmp_path)
+
+    reopened, mapping = index_sessions([], path=tmp_path)
+
+    assert len(reopened) == 0
+    assert 'shard/empty' in reopened
+    assert mapping.tolist() == [-1]
+
+
+def test_interrupted_save_keeps_previous_index(tmp_path, monkeypatch):
+    first = SpatialIndex()
+    first.add('a', np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]))
+    first.save(tmp_path)
+
+    second = SpatialIndex()
+    second.add('b', np.array([[5.0, 5.0, 5.0]]))
+
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(reacture_spatial.json, 'dump', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        second.save(tmp_path)
+    monkeypatch.undo()
+
+    loaded = SpatialIndex.load(tmp_path)
+    assert loaded.keys == ['a']
+    session, rows = loaded.radius([0.0, 0.0, 0.0], 2.0)
+    assert rows.tolist() == [0, 1]
+
+    second.save(tmp_path)
+    assert SpatialIndex.load(tmp_path).keys == ['b']